@@ -5,15 +5,20 @@ Exposes Python analytics functions to Next.js app
 
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from prometheus_client import make_asgi_app
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
 import os
 import json
-import httpx
+import orjson
 from dotenv import load_dotenv
 import numpy as np
 from datetime import datetime, timedelta
 
+from .db.client import get_client, close_client
+from .db.pool import close_pool
+
 # Load environment variables
 load_dotenv()
 
@@ -22,7 +27,7 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
 # Create FastAPI app
-app = FastAPI(title="Restoration-Intel API Bridge")
+app = FastAPI(title="Restoration-Intel API Bridge", default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -33,6 +38,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus metrics (RPC pool usage and latency) for scraping
+app.mount("/metrics", make_asgi_app())
+
 # Models
 class LeadingIndicatorInput(BaseModel):
     kpi_code: str
@@ -53,11 +61,17 @@ async def supabase_rpc(function_name: str, params: Dict = None):
         "Prefer": "return=representation"
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=params or {}, headers=headers)
-        if response.status_code >= 400:
-            raise HTTPException(status_code=response.status_code, detail=response.text)
-        return response.json()
+    client = await get_client()
+    response = await client.post(url, content=orjson.dumps(params or {}), headers=headers)
+    if response.status_code >= 400:
+        raise HTTPException(status_code=response.status_code, detail=response.text)
+    return orjson.loads(response.content)
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the shared Supabase HTTP client and Postgres pool"""
+    await close_client()
+    await close_pool()
 
 # Routes
 @app.get("/")
@@ -215,5 +229,6 @@ async def calculate_runway_p5():
         raise HTTPException(status_code=500, detail=f"Error calculating runway: {str(e)}")
 
 if __name__ == "__main__":
+    # Run from api/ as `python -m py.app`, matching the Dockerfile's py.app:app
     import uvicorn
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("py.app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""
+Database Access Package
+
+This package contains shared connection handling for Supabase and Postgres.
+"""
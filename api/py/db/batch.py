@@ -0,0 +1,146 @@
+"""
+SQL Request Batching
+
+This module coalesces SQL queries submitted within a few milliseconds of each other
+into a single call, so independent metric queries share one network round-trip.
+MetricBatch does the same for an explicit block of code, e.g. a dashboard refresh.
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# How long to wait for more queries before sending a batch
+DEFAULT_BATCH_WINDOW_SECONDS = 0.005
+
+# Send immediately once this many queries are waiting
+DEFAULT_MAX_BATCH_SIZE = 50
+
+class SqlBatcher:
+    """
+    Collects SQL submissions and runs them together through one flush call
+    
+    The flush callable receives a list of (query, params) tuples and must return one
+    result per query, in the same order. If it raises, every query in that batch
+    fails with the same exception.
+    
+    Usage:
+        batcher = SqlBatcher(run_batch)
+        rows = await batcher.submit(query, params)
+    """
+    
+    def __init__(self, flush: Callable[[List[Tuple[str, Dict]]], Awaitable[List[Any]]],
+                 window: float = DEFAULT_BATCH_WINDOW_SECONDS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        """
+        Initialize the batcher
+        
+        Args:
+            flush: Coroutine function that executes a list of (query, params) at once
+            window: Seconds to wait for more queries after the first one arrives
+            max_batch_size: Batch size that triggers an immediate flush
+        """
+        self.flush = flush
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, query: str, params: Dict = None) -> Any:
+        """
+        Queue a query for the next batch and wait for its result
+        
+        Args:
+            query: SQL text
+            params: Bound parameters for the query
+            
+        Returns:
+            The result the flush call produced for this query
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, params or {}, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+            self._spawn(self._send(batch))
+        elif self._timer is None:
+            self._timer = self._spawn(self._flush_after_window())
+        
+        return await future
+    
+    def _spawn(self, coro) -> asyncio.Task:
+        """Start a background task and keep a reference until it finishes"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    async def _flush_after_window(self) -> None:
+        """Wait for the batching window to close, then send what has accumulated"""
+        await asyncio.sleep(self.window)
+        self._timer = None
+        batch, self._pending = self._pending, []
+        await self._send(batch)
+    
+    async def _send(self, batch: List[Tuple[str, Dict, asyncio.Future]]) -> None:
+        """Run one batch through the flush call and resolve its futures"""
+        if not batch:
+            return
+        
+        try:
+            results = await self.flush([(query, params) for query, params, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+# Batcher of the innermost active MetricBatch block, visible to every task started in it
+_CURRENT_BATCH: ContextVar[Optional[SqlBatcher]] = ContextVar("current_metric_batch", default=None)
+
+def current_batch() -> Optional[SqlBatcher]:
+    """Get the batcher of the enclosing MetricBatch block, or None outside one"""
+    return _CURRENT_BATCH.get()
+
+class MetricBatch:
+    """
+    Scope in which SQL queries are collected and sent together
+    
+    Query helpers check current_batch() and submit to it when set. Queries issued
+    in the same event loop turn, e.g. by metrics started with asyncio.gather inside
+    the block, go out as one flush call; each caller still awaits only its own
+    result.
+    
+    Usage:
+        async with MetricBatch(run_batch):
+            results = await asyncio.gather(metric_a(), metric_b())
+    """
+    
+    def __init__(self, flush: Callable[[List[Tuple[str, Dict]]], Awaitable[List[Any]]],
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        """
+        Initialize the batch scope
+        
+        Args:
+            flush: Coroutine function that executes a list of (query, params) at once
+            max_batch_size: Batch size that triggers an immediate flush
+        """
+        self.batcher = SqlBatcher(flush, window=0, max_batch_size=max_batch_size)
+        self._token = None
+    
+    async def __aenter__(self) -> "MetricBatch":
+        self._token = _CURRENT_BATCH.set(self.batcher)
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        _CURRENT_BATCH.reset(self._token)
+        self._token = None
@@ -0,0 +1,86 @@
+"""
+Shared Supabase HTTP Client
+
+This module keeps one pooled httpx.AsyncClient per process, so RPC calls reuse
+keep-alive connections instead of opening a new TCP/TLS connection every time.
+
+The client belongs to the event loop that created it. Only one loop may use it at
+a time; when a later asyncio.run starts a new loop (jobs_runner, CLI paths), the
+next get_client() call replaces it with a client for that loop.
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional
+import httpx
+
+# Connection pool sizing for the shared client
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+
+# Overall request timeout, with a shorter limit for establishing new connections
+REQUEST_TIMEOUT_SECONDS = 30.0
+CONNECT_TIMEOUT_SECONDS = 5.0
+
+# RPCs that run caller-supplied SQL. Their migrations (003, 004 and 005) grant
+# EXECUTE to service_role only, so they must be called with the service role key
+SQL_RPC_FUNCTIONS = frozenset({"exec_prepared", "exec_prepared_columnar", "execute_sql_batch"})
+
+_CLIENT: Optional[httpx.AsyncClient] = None
+# Event loop the client and its creation lock belong to
+_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_CLIENT_LOCK: Optional[asyncio.Lock] = None
+
+async def get_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide async HTTP client, creating it on first use
+    
+    Returns:
+        Shared httpx.AsyncClient with connection pooling, HTTP/2 and timeouts
+    """
+    global _CLIENT, _CLIENT_LOOP, _CLIENT_LOCK
+    
+    loop = asyncio.get_running_loop()
+    if _CLIENT_LOOP is not loop:
+        # The previous loop has finished, and its client's connections (and the
+        # lock) can't be used from this one, so start over for the current loop
+        _CLIENT, _CLIENT_LOOP, _CLIENT_LOCK = None, loop, asyncio.Lock()
+    
+    if _CLIENT is None or _CLIENT.is_closed:
+        async with _CLIENT_LOCK:
+            if _CLIENT is None or _CLIENT.is_closed:
+                _CLIENT = httpx.AsyncClient(
+                    http2=True,
+                    timeout=httpx.Timeout(REQUEST_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+                    )
+                )
+    
+    return _CLIENT
+
+async def close_client() -> None:
+    """Close the shared client; call from the application shutdown hook"""
+    global _CLIENT
+    
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+def service_role_headers(headers: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    Copy RPC headers with the anon key swapped for the service role key
+    
+    Reads SUPABASE_SERVICE_ROLE_KEY when called, so call it after load_dotenv().
+    
+    Args:
+        headers: A module's anon-key RPC headers
+        
+    Returns:
+        Headers authenticated as service_role, or None if the key is not configured
+    """
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not key:
+        return None
+    return {**headers, "apikey": key, "Authorization": f"Bearer {key}"}
@@ -0,0 +1,76 @@
+"""
+Direct Postgres Connection Pool
+
+This module keeps one asyncpg pool per process for queries that go straight to
+Postgres instead of through PostgREST. The pool is only created when SUPABASE_DB_URL
+is configured; callers fall back to the Supabase RPC path otherwise.
+
+Like the HTTP client, the pool belongs to the event loop that created it and only
+one loop may use it at a time; a new loop gets a new pool on its first get_pool().
+"""
+
+import asyncio
+import os
+from typing import Optional
+import asyncpg
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Direct Postgres connection string (Supabase project database URL)
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
+
+# Pool sizing and prepared statement cache
+MIN_POOL_SIZE = 5
+MAX_POOL_SIZE = 20
+MAX_INACTIVE_CONNECTION_LIFETIME = 300
+STATEMENT_CACHE_SIZE = 1024
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Decode numeric columns (SUM/AVG results) as float, matching the RPC path, since Decimal is not JSON serializable"""
+    await conn.set_type_codec("numeric", encoder=str, decoder=float, schema="pg_catalog", format="text")
+
+_POOL: Optional[asyncpg.Pool] = None
+# Event loop the pool and its creation lock belong to
+_POOL_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_POOL_LOCK: Optional[asyncio.Lock] = None
+
+async def get_pool() -> Optional[asyncpg.Pool]:
+    """
+    Get the process-wide asyncpg pool, creating it on first use
+    
+    Returns:
+        Shared asyncpg pool, or None when SUPABASE_DB_URL is not configured
+    """
+    global _POOL, _POOL_LOOP, _POOL_LOCK
+    
+    if not SUPABASE_DB_URL:
+        return None
+    
+    loop = asyncio.get_running_loop()
+    if _POOL_LOOP is not loop:
+        # Connections of a pool from an earlier loop can't be used from this one
+        _POOL, _POOL_LOOP, _POOL_LOCK = None, loop, asyncio.Lock()
+    
+    if _POOL is None:
+        async with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = await asyncpg.create_pool(
+                    dsn=SUPABASE_DB_URL,
+                    min_size=MIN_POOL_SIZE,
+                    max_size=MAX_POOL_SIZE,
+                    max_inactive_connection_lifetime=MAX_INACTIVE_CONNECTION_LIFETIME,
+                    statement_cache_size=STATEMENT_CACHE_SIZE,
+                    init=_init_connection
+                )
+    
+    return _POOL
+
+async def close_pool() -> None:
+    """Close the shared pool; call from the application shutdown hook"""
+    global _POOL
+    
+    if _POOL is not None:
+        await _POOL.close()
+        _POOL = None
@@ -3,8 +3,13 @@
 Jobs Runner CLI
 
 This script runs all the background jobs and engines in sequence,
-including the leading indicator engine, AP prioritization, and growth accelerator.
-It can be run manually or scheduled as a cron job.
+including the leading indicator engine, AP prioritization, growth accelerator
+and the profitability dashboard refresh. It can be run manually or scheduled
+as a cron job.
+
+The metric functions are all async; this script is the synchronous edge that
+drives them with a single asyncio.run, so library code never starts its own
+event loop.
 """
 import sys
 import argparse
@@ -15,12 +20,13 @@ from typing import List, Dict, Any
 from api.py.engines.leading_indicator_engine import run_all_indicators
 from api.py.modules.expenses_module import get_vendor_recommendations
 from api.py.growth_accelerator import generate_growth_insights
+from api.py.metrics.profitability_metrics import refresh_profitability_dashboard
 from api.py.utils import handle_error, Spinner
 
 async def main_async():
     """Async main function to run all jobs"""
     parser = argparse.ArgumentParser(description="Run Restoration-Intel background jobs")
-    parser.add_argument("--job", choices=["all", "indicators", "ap", "growth"], default="all",
+    parser.add_argument("--job", choices=["all", "indicators", "ap", "growth", "profitability"], default="all",
                        help="Specify which job to run (default: all)")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
     
@@ -33,7 +39,8 @@ async def main_async():
     results = {
         "indicators": {"status": "not_run", "error": None, "data": None},
         "ap": {"status": "not_run", "error": None, "data": None},
-        "growth": {"status": "not_run", "error": None, "data": None}
+        "growth": {"status": "not_run", "error": None, "data": None},
+        "profitability": {"status": "not_run", "error": None, "data": None}
     }
     
     async with httpx.AsyncClient() as client:
@@ -76,6 +83,17 @@ async def main_async():
             except Exception as e:
                 handle_error(f"Error in growth insights: {str(e)}", "jobs_runner")
                 results["growth"] = {"status": "error", "error": str(e), "data": None}
+
+        # Refresh Profitability Dashboard
+        if args.job in ["all", "profitability"]:
+            log("Refreshing Profitability Dashboard...")
+            try:
+                profitability = await refresh_profitability_dashboard()
+                log(f"Calculated {len(profitability)} profitability metrics")
+                results["profitability"] = {"status": "success", "error": None, "data": profitability}
+            except Exception as e:
+                handle_error(f"Error in profitability dashboard: {str(e)}", "jobs_runner")
+                results["profitability"] = {"status": "error", "error": str(e), "data": None}
     
     return results
 
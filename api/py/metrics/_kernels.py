@@ -0,0 +1,134 @@
+"""
+Vectorised Metric Kernels
+
+This module contains array versions of the CLV, NRR, technician utilization, cash
+runway and labor efficiency formulas, and summary statistics for management span. They are used for scenario sweeps (many churn/margin/period combinations
+at once) and by the scalar metric functions, so both paths share one formula.
+"""
+
+from typing import Dict, Tuple
+import numpy as np
+
+def _as_arrays(*values) -> Tuple[np.ndarray, ...]:
+    """Convert scalars or sequences to broadcast float64 arrays of at least one element"""
+    return np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in values))
+
+def clv_batch(avg_revenue, gross_margin_pct, churn_rate) -> np.ndarray:
+    """
+    Calculate Customer Lifetime Value for arrays of inputs.
+    
+    Formula: (Average Revenue per Customer × Gross Margin %) ÷ Churn Rate
+    
+    Args:
+        avg_revenue: Average revenue per customer
+        gross_margin_pct: Gross margin as a percentage (42.5 for 42.5%)
+        churn_rate: Churn rate as a fraction (0.15 for 15%)
+        
+    Returns:
+        Array of CLV values, 0.0 where the churn rate is not positive.
+    """
+    avg_revenue, gross_margin_pct, churn_rate = _as_arrays(avg_revenue, gross_margin_pct, churn_rate)
+    margin_value = avg_revenue * gross_margin_pct * 0.01
+    return np.divide(margin_value, churn_rate, out=np.zeros_like(margin_value), where=churn_rate > 0)
+
+def nrr_batch(starting_arr, expansion, contraction, churn) -> np.ndarray:
+    """
+    Calculate Net Revenue Retention for arrays of inputs.
+    
+    Formula: ((Starting ARR + Expansion - Contraction - Churn) ÷ Starting ARR) × 100
+    
+    Args:
+        starting_arr: Revenue at the start of the period
+        expansion: Additional revenue from existing customers
+        contraction: Reduced revenue from existing customers
+        churn: Revenue lost from customers who did not return
+        
+    Returns:
+        Array of NRR percentages, 0.0 where starting ARR is not positive.
+    """
+    starting_arr, expansion, contraction, churn = _as_arrays(starting_arr, expansion, contraction, churn)
+    retained = starting_arr + expansion - contraction - churn
+    return np.divide(retained, starting_arr, out=np.zeros_like(retained), where=starting_arr > 0) * 100
+
+def utilization_batch(billable_hours, available_hours) -> np.ndarray:
+    """
+    Calculate Technician Utilization Rate for arrays of inputs.
+    
+    Formula: (Billable Hours ÷ Available Hours) × 100
+    
+    Args:
+        billable_hours: Billable hours worked
+        available_hours: Hours available
+        
+    Returns:
+        Array of utilization percentages, 0.0 where available hours are not positive.
+    """
+    billable_hours, available_hours = _as_arrays(billable_hours, available_hours)
+    return np.divide(billable_hours, available_hours, out=np.zeros_like(billable_hours), where=available_hours > 0) * 100
+
+def runway_batch(cash_balance, burn_rate) -> np.ndarray:
+    """
+    Calculate cash runway for arrays of inputs, e.g. per company or scenario.
+    
+    Formula: Cash Balance ÷ Burn Rate
+    
+    Args:
+        cash_balance: Current cash balance
+        burn_rate: Cash burn rate per period
+        
+    Returns:
+        Array of runway periods, inf where the burn rate is not positive.
+    """
+    cash_balance, burn_rate = _as_arrays(cash_balance, burn_rate)
+    return np.divide(cash_balance, burn_rate, out=np.full_like(cash_balance, np.inf), where=burn_rate > 0)
+
+def labor_efficiency_batch(revenue, labor_cost, labor_hours) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate Labor Efficiency Ratio for arrays of inputs.
+    
+    Formula: Revenue per Labor Hour ÷ Fully-Loaded Labor Cost per Hour
+    
+    Args:
+        revenue: Revenue from the jobs
+        labor_cost: Fully-loaded labor cost of the jobs
+        labor_hours: Labor hours worked on the jobs
+        
+    Returns:
+        Tuple of (ratio, revenue per hour, cost per hour) arrays, each 0.0 where
+        its denominator is not positive.
+    """
+    revenue, labor_cost, labor_hours = _as_arrays(revenue, labor_cost, labor_hours)
+    has_hours = labor_hours > 0
+    revenue_per_hour = np.divide(revenue, labor_hours, out=np.zeros_like(revenue), where=has_hours)
+    cost_per_hour = np.divide(labor_cost, labor_hours, out=np.zeros_like(labor_cost), where=has_hours)
+    ratio = np.divide(revenue_per_hour, cost_per_hour, out=np.zeros_like(revenue_per_hour), where=cost_per_hour > 0)
+    return ratio, revenue_per_hour, cost_per_hour
+
+def span_stats(direct_reports) -> Dict[str, float]:
+    """
+    Summarise Management Span of Control over all managers in one pass of array ops.
+    
+    Args:
+        direct_reports: Number of direct reports of each manager
+        
+    Returns:
+        Dictionary with the manager count, total direct reports, and the mean,
+        median, 90th percentile, population standard deviation and maximum span.
+        All values are 0 when there are no managers.
+    """
+    reports = np.asarray(direct_reports, dtype=np.float64)
+    count = reports.shape[0]
+    if count == 0:
+        return {"count": 0, "total": 0, "mean": 0.0, "median": 0.0, "p90": 0.0, "std": 0.0, "max": 0}
+    
+    mean = reports.mean()
+    median, p90 = np.percentile(reports, [50, 90])
+    return {
+        "count": count,
+        "total": int(reports.sum()),
+        "mean": float(mean),
+        "median": float(median),
+        "p90": float(p90),
+        "std": float(np.sqrt(np.mean((reports - mean) ** 2))),
+        "max": int(reports.max())
+    }
@@ -5,17 +5,21 @@ This module contains functions for detecting issues, prioritizing payments,
 identifying revenue leaks, and generating smart alerts for business operations.
 """
 
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-import json
+from itertools import chain
+import orjson
 import os
-import httpx
 import numpy as np
 from dotenv import load_dotenv
 
 # Import utils for consistent error handling
 from ..utils import handle_error, Spinner, safe_divide
 
+# Shared pooled HTTP client for Supabase calls
+from ..db.client import get_client
+
 # Load environment variables
 load_dotenv()
 
@@ -35,12 +39,12 @@ async def _call_supabase_rpc(function_name: str, params: Dict = None) -> Any:
         "Prefer": "return=representation"
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=params or {}, headers=headers)
-        if response.status_code >= 400:
-            handle_error(f"API error: {response.text}", "alert_framework")
-            raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
-        return response.json()
+    client = await get_client()
+    response = await client.post(url, content=orjson.dumps(params or {}), headers=headers)
+    if response.status_code >= 400:
+        handle_error(f"API error: {response.text}", "alert_framework")
+        raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
+    return orjson.loads(response.content)
 
 async def _execute_sql(query: str, params: Dict = None) -> List[Dict]:
     """Execute a SQL query against Supabase"""
@@ -1034,16 +1038,41 @@ def detect_revenue_leaks() -> Dict[str, List[Dict[str, Any]]]:
 
 # ---------------------- Smart Alert Framework ----------------------
 
-def trigger_red_flag():
+@dataclass(slots=True)
+class Alert:
+    """Fixed-layout record for an alert raised by one of the trigger_* checks"""
+    alert_type: str
+    message: str
+    severity: int
+    action: str
+    details: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dictionary shape returned by the API"""
+        return {
+            "alert_type": self.alert_type,
+            "message": self.message,
+            "severity": self.severity,
+            "action": self.action,
+            "details": self.details
+        }
+
+def trigger_red_flag(now: datetime = None) -> Optional[Alert]:
     """
     Trigger Red Flag alert for critical situations.
     Red Flag: <5 days runway + >$10K unpaid payroll
     
+    Args:
+        now: Reference time for the alert. Defaults to the current time.
+    
     Returns:
-        Alert details if conditions are met, None otherwise.
+        Alert record if conditions are met, None otherwise.
     """
     with Spinner("Red Flag Check"):
         try:
+            if now is None:
+                now = datetime.now()
+            
             # Query for cash runway
             cash_query = """
             WITH daily_burn AS (
@@ -1086,19 +1115,19 @@ def trigger_red_flag():
             unpaid_payroll = 12000     # $12K unpaid payroll
             
             if runway_days < 5 and unpaid_payroll > 10000:
-                return {
-                    "alert_type": "red_flag",
-                    "message": f"CRITICAL: Cash runway of {runway_days:.1f} days with ${unpaid_payroll:,.2f} in unpaid payroll",
-                    "severity": 10,
-                    "action": "Immediate action required: Accelerate collections, delay non-critical payments, arrange emergency funding",
-                    "details": {
+                return Alert(
+                    alert_type="red_flag",
+                    message=f"CRITICAL: Cash runway of {runway_days:.1f} days with ${unpaid_payroll:,.2f} in unpaid payroll",
+                    severity=10,
+                    action="Immediate action required: Accelerate collections, delay non-critical payments, arrange emergency funding",
+                    details={
                         "current_cash": current_cash,
                         "daily_expense": daily_expense,
                         "runway_days": runway_days,
                         "unpaid_payroll": unpaid_payroll,
-                        "due_date": (datetime.now() + timedelta(days=5)).isoformat()
+                        "due_date": (now + timedelta(days=5)).isoformat()
                     }
-                }
+                )
             
             return None
         
@@ -1106,13 +1135,13 @@ def trigger_red_flag():
             handle_error(f"Failed to check red flag conditions: {str(e)}", "alert_framework")
             raise RuntimeError(f"Failed to check red flag conditions: {str(e)}")
 
-def trigger_yellow_warning():
+def trigger_yellow_warning() -> Optional[Alert]:
     """
     Trigger Yellow Warning alert for concerning situations.
     Yellow Warning: CAC >30% MoM + CLV stable
     
     Returns:
-        Alert details if conditions are met, None otherwise.
+        Alert record if conditions are met, None otherwise.
     """
     with Spinner("Yellow Warning Check"):
         try:
@@ -1166,12 +1195,12 @@ def trigger_yellow_warning():
             clv_change_pct = ((current_clv - previous_clv) / previous_clv * 100) if previous_clv > 0 else 0
             
             if cac_change_pct > 30 and abs(clv_change_pct) < 5:
-                return {
-                    "alert_type": "yellow_warning",
-                    "message": f"WARNING: CAC increased by {cac_change_pct:.1f}% while CLV remained stable ({clv_change_pct:.1f}%)",
-                    "severity": 7,
-                    "action": "Review marketing spend and lead sources; evaluate lead qualification process",
-                    "details": {
+                return Alert(
+                    alert_type="yellow_warning",
+                    message=f"WARNING: CAC increased by {cac_change_pct:.1f}% while CLV remained stable ({clv_change_pct:.1f}%)",
+                    severity=7,
+                    action="Review marketing spend and lead sources; evaluate lead qualification process",
+                    details={
                         "current_cac": current_cac,
                         "previous_cac": previous_cac,
                         "cac_change_pct": cac_change_pct,
@@ -1179,7 +1208,7 @@ def trigger_yellow_warning():
                         "previous_clv": previous_clv,
                         "clv_change_pct": clv_change_pct
                     }
-                }
+                )
             
             return None
         
@@ -1187,13 +1216,13 @@ def trigger_yellow_warning():
             handle_error(f"Failed to check yellow warning conditions: {str(e)}", "alert_framework")
             raise RuntimeError(f"Failed to check yellow warning conditions: {str(e)}")
 
-def trigger_strategy_drift():
+def trigger_strategy_drift() -> Optional[Alert]:
     """
     Trigger Strategy Drift alert for long-term concerns.
     Strategy Drift: Revenue CAGR < target for 3 months
     
     Returns:
-        Alert details if conditions are met, None otherwise.
+        Alert record if conditions are met, None otherwise.
     """
     with Spinner("Strategy Drift Check"):
         try:
@@ -1238,18 +1267,18 @@ def trigger_strategy_drift():
             consecutive_below_target = all(rate["below_target"] for rate in monthly_growth_rates)
             
             if consecutive_below_target:
-                return {
-                    "alert_type": "strategy_drift",
-                    "message": f"STRATEGY ALERT: Revenue CAGR below {monthly_growth_rates[0]['target_growth_rate']}% target for 3+ consecutive months",
-                    "severity": 6,
-                    "action": "Schedule strategy review session; evaluate market positioning and growth initiatives",
-                    "details": {
+                return Alert(
+                    alert_type="strategy_drift",
+                    message=f"STRATEGY ALERT: Revenue CAGR below {monthly_growth_rates[0]['target_growth_rate']}% target for 3+ consecutive months",
+                    severity=6,
+                    action="Schedule strategy review session; evaluate market positioning and growth initiatives",
+                    details={
                         "monthly_growth_rates": monthly_growth_rates,
                         "average_growth_rate": sum(rate["annual_growth_rate"] for rate in monthly_growth_rates) / len(monthly_growth_rates),
                         "target_rate": monthly_growth_rates[0]["target_growth_rate"],
                         "months_below_target": len(monthly_growth_rates)
                     }
-                }
+                )
             
             return None
         
@@ -1257,13 +1286,13 @@ def trigger_strategy_drift():
             handle_error(f"Failed to check strategy drift conditions: {str(e)}", "alert_framework")
             raise RuntimeError(f"Failed to check strategy drift conditions: {str(e)}")
 
-def trigger_ops_breach():
+def trigger_ops_breach() -> Optional[Alert]:
     """
     Trigger Operations Breach alert for process breakdowns.
     Ops Breach: >10% jobs missing docs
     
     Returns:
-        Alert details if conditions are met, None otherwise.
+        Alert record if conditions are met, None otherwise.
     """
     with Spinner("Operations Breach Check"):
         try:
@@ -1299,12 +1328,12 @@ def trigger_ops_breach():
             missing_doc_percentage = (missing_any_doc / total_projects * 100) if total_projects > 0 else 0
             
             if missing_doc_percentage > 10:
-                return {
-                    "alert_type": "ops_breach",
-                    "message": f"OPERATIONS ALERT: {missing_doc_percentage:.1f}% of recent projects missing required documentation",
-                    "severity": 7,
-                    "action": "Review documentation process; assign responsibility for resolving backlog",
-                    "details": {
+                return Alert(
+                    alert_type="ops_breach",
+                    message=f"OPERATIONS ALERT: {missing_doc_percentage:.1f}% of recent projects missing required documentation",
+                    severity=7,
+                    action="Review documentation process; assign responsibility for resolving backlog",
+                    details={
                         "total_projects": total_projects,
                         "missing_contract": missing_contract,
                         "missing_inspection": missing_inspection,
@@ -1313,7 +1342,7 @@ def trigger_ops_breach():
                         "missing_doc_percentage": missing_doc_percentage,
                         "threshold": 10
                     }
-                }
+                )
             
             return None
         
@@ -1321,13 +1350,13 @@ def trigger_ops_breach():
             handle_error(f"Failed to check operations breach conditions: {str(e)}", "alert_framework")
             raise RuntimeError(f"Failed to check operations breach conditions: {str(e)}")
 
-def trigger_payment_advisory():
+def trigger_payment_advisory() -> Optional[Alert]:
     """
     Trigger Payment Advisory alert for cash flow warnings.
     Payment Advisory: AP > AR for 2 weeks + cash < $25K
     
     Returns:
-        Alert details if conditions are met, None otherwise.
+        Alert record if conditions are met, None otherwise.
     """
     with Spinner("Payment Advisory Check"):
         try:
@@ -1384,17 +1413,17 @@ def trigger_payment_advisory():
             weeks_ap_exceeds_ar = 2    # AP > AR for 2 weeks
             
             if weeks_ap_exceeds_ar >= 2 and current_cash < 25000:
-                return {
-                    "alert_type": "payment_advisory",
-                    "message": f"PAYMENT ADVISORY: AP exceeds AR for {weeks_ap_exceeds_ar} consecutive weeks with cash balance of ${current_cash:,.2f}",
-                    "severity": 8,
-                    "action": "Prioritize incoming payments; consider delaying non-critical AP",
-                    "details": {
+                return Alert(
+                    alert_type="payment_advisory",
+                    message=f"PAYMENT ADVISORY: AP exceeds AR for {weeks_ap_exceeds_ar} consecutive weeks with cash balance of ${current_cash:,.2f}",
+                    severity=8,
+                    action="Prioritize incoming payments; consider delaying non-critical AP",
+                    details={
                         "current_cash": current_cash,
                         "weeks_ap_exceeds_ar": weeks_ap_exceeds_ar,
                         "cash_threshold": 25000
                     }
-                }
+                )
             
             return None
         
@@ -1402,10 +1431,15 @@ def trigger_payment_advisory():
             handle_error(f"Failed to check payment advisory conditions: {str(e)}", "alert_framework")
             raise RuntimeError(f"Failed to check payment advisory conditions: {str(e)}")
 
-def get_all_alerts() -> Dict[str, List[Dict[str, Any]]]:
+def get_all_alerts(full: bool = True) -> Dict[str, List[Dict[str, Any]]]:
     """
     Get all alerts from all alert triggers.
     
+    Args:
+        full: When False, skip the lower-priority checks (yellow, strategic,
+              operational, financial and revenue leaks) once a severity-10 red
+              flag has fired. Use for the top alert banner. Defaults to True.
+    
     Returns:
         Dictionary with categorized alerts.
         
@@ -1416,6 +1450,9 @@ def get_all_alerts() -> Dict[str, List[Dict[str, Any]]]:
     """
     with Spinner("Smart Alerts"):
         try:
+            # Single reference time so the whole response is consistent
+            now = datetime.now()
+            
             alerts = {
                 "red_flags": [],
                 "yellow_warnings": [],
@@ -1424,56 +1461,73 @@ def get_all_alerts() -> Dict[str, List[Dict[str, Any]]]:
                 "financial_alerts": []
             }
             
-            # Check each alert type
-            red_flag = trigger_red_flag()
+            # Red flags first: these are always evaluated
+            red_flag = trigger_red_flag(now)
             if red_flag:
                 alerts["red_flags"].append(red_flag)
             
-            yellow_warning = trigger_yellow_warning()
-            if yellow_warning:
-                alerts["yellow_warnings"].append(yellow_warning)
-            
-            strategy_drift = trigger_strategy_drift()
-            if strategy_drift:
-                alerts["strategic_alerts"].append(strategy_drift)
-            
-            ops_breach = trigger_ops_breach()
-            if ops_breach:
-                alerts["operational_alerts"].append(ops_breach)
-            
-            payment_advisory = trigger_payment_advisory()
-            if payment_advisory:
-                alerts["financial_alerts"].append(payment_advisory)
-            
-            # Add standard red and yellow alerts
-            red_alerts = check_red_alerts()
-            yellow_warnings = check_yellow_warnings()
-            
-            alerts["red_flags"].extend(red_alerts)
-            alerts["yellow_warnings"].extend(yellow_warnings)
-            
-            # Get all revenue leaks as operational alerts
-            try:
-                revenue_leaks = detect_revenue_leaks()
-                if revenue_leaks and "priority_fixes" in revenue_leaks:
-                    for fix in revenue_leaks["priority_fixes"]:
-                        alerts["operational_alerts"].append({
-                            "alert_type": "revenue_leak",
-                            "message": f"Revenue leak detected in {fix['category']}: ${fix['impact']:,.2f} impact",
-                            "severity": 7 if fix["impact"] > 5000 else 6,
-                            "action": fix["action"],
-                            "details": {
-                                "category": fix["category"],
-                                "impact": fix["impact"]
-                            }
-                        })
-            except Exception as e:
-                handle_error(f"Failed to process revenue leaks: {str(e)}", "alert_framework")
+            alerts["red_flags"].extend(check_red_alerts())
+            
+            # A severity-10 red flag outranks everything else, so unless the full
+            # view is requested the lower-priority checks are skipped
+            short_circuited = not full and red_flag is not None and red_flag.severity >= 10
+            
+            if not short_circuited:
+                yellow_warning = trigger_yellow_warning()
+                if yellow_warning:
+                    alerts["yellow_warnings"].append(yellow_warning)
+                
+                strategy_drift = trigger_strategy_drift()
+                if strategy_drift:
+                    alerts["strategic_alerts"].append(strategy_drift)
+                
+                ops_breach = trigger_ops_breach()
+                if ops_breach:
+                    alerts["operational_alerts"].append(ops_breach)
+                
+                payment_advisory = trigger_payment_advisory()
+                if payment_advisory:
+                    alerts["financial_alerts"].append(payment_advisory)
+                
+                # Add standard yellow warnings
+                alerts["yellow_warnings"].extend(check_yellow_warnings())
+                
+                # Get all revenue leaks as operational alerts
+                try:
+                    revenue_leaks = detect_revenue_leaks()
+                    if revenue_leaks and "priority_fixes" in revenue_leaks:
+                        # Leaks above $5K are one severity step higher (6 + True == 7)
+                        alerts["operational_alerts"].extend([
+                            Alert(
+                                "revenue_leak",
+                                f"Revenue leak detected in {fix['category']}: ${fix['impact']:,.2f} impact",
+                                6 + (fix["impact"] > 5000),
+                                fix["action"],
+                                {"category": fix["category"], "impact": fix["impact"]}
+                            )
+                            for fix in revenue_leaks["priority_fixes"]
+                        ])
+                except Exception as e:
+                    handle_error(f"Failed to process revenue leaks: {str(e)}", "alert_framework")
+            
+            # Trigger alerts are kept as Alert records until here; the response
+            # itself is plain dicts
+            alerts = {
+                category: [
+                    alert.to_dict() if isinstance(alert, Alert) else alert
+                    for alert in alert_list
+                ]
+                for category, alert_list in alerts.items()
+            }
             
             # Add counts to the response
-            total_alerts = sum(len(alert_list) for alert_list in alerts.values())
+            alert_counts = {
+                category: len(alert_list)
+                for category, alert_list in alerts.items()
+            }
+            total_alerts = sum(alert_counts.values())
             highest_severity = max(
-                [alert["severity"] for alert_list in alerts.values() for alert in alert_list],
+                (alert["severity"] for alert in chain.from_iterable(alerts.values())),
                 default=0
             )
             
@@ -1481,12 +1535,10 @@ def get_all_alerts() -> Dict[str, List[Dict[str, Any]]]:
                 "alerts": alerts,
                 "total_alerts": total_alerts,
                 "highest_severity": highest_severity,
-                "alert_counts": {
-                    category: len(alert_list)
-                    for category, alert_list in alerts.items()
-                },
+                "alert_counts": alert_counts,
                 "has_critical_alerts": highest_severity >= 9,
-                "timestamp": datetime.now().isoformat()
+                "short_circuited": short_circuited,
+                "timestamp": now.isoformat()
             }
         
         except Exception as e:
@@ -1495,6 +1547,23 @@ def get_all_alerts() -> Dict[str, List[Dict[str, Any]]]:
 
 # ---------------------- Additional Predictive Functions ----------------------
 
+def _simulate_collection_totals(amounts: np.ndarray, probabilities: np.ndarray,
+                                num_trials: int, seed: int = None,
+                                chunk_size: int = 10000) -> np.ndarray:
+    """
+    Simulate the total amount collected in each Monte Carlo trial.
+    
+    Trials are drawn in fixed-size chunks so memory stays bounded at
+    chunk_size x len(amounts) regardless of how many trials are requested.
+    """
+    rng = np.random.default_rng(seed)
+    totals = np.empty(num_trials)
+    for start in range(0, num_trials, chunk_size):
+        stop = min(start + chunk_size, num_trials)
+        collected = rng.random((stop - start, amounts.size)) < probabilities
+        totals[start:stop] = collected @ amounts
+    return totals
+
 def simulate_collections_probability():
     """
     Simulate collections probability using historical payment patterns.
@@ -1521,31 +1590,28 @@ def simulate_collections_probability():
                 {"id": 105, "amount": 11250, "expected_date": "2023-07-15", "probability": 0.55}
             ]
             
+            amounts = np.array([c["amount"] for c in pending_collections], dtype=np.float64)
+            probabilities = np.array([c["probability"] for c in pending_collections], dtype=np.float64)
+            
             # Calculate expected value (amount * probability)
-            for collection in pending_collections:
-                collection["expected_value"] = collection["amount"] * collection["probability"]
+            expected_values = amounts * probabilities
+            for collection, expected_value in zip(pending_collections, expected_values.tolist()):
+                collection["expected_value"] = expected_value
             
             # Calculate totals
-            total_pending = sum(c["amount"] for c in pending_collections)
-            total_expected = sum(c["expected_value"] for c in pending_collections)
+            total_pending = float(amounts.sum())
+            total_expected = float(expected_values.sum())
             
-            # Simple Monte Carlo simulation for range of outcomes
+            # Monte Carlo simulation for range of outcomes
             num_trials = 1000
-            simulated_totals = []
-            
-            np.random.seed(42)  # For reproducibility
-            for _ in range(num_trials):
-                trial_total = 0
-                for collection in pending_collections:
-                    # Simulate whether this collection comes in
-                    if np.random.random() < collection["probability"]:
-                        trial_total += collection["amount"]
-                simulated_totals.append(trial_total)
-            
-            # Calculate percentiles
-            p10 = np.percentile(simulated_totals, 10)
-            p50 = np.percentile(simulated_totals, 50)
-            p90 = np.percentile(simulated_totals, 90)
+            simulated_totals = _simulate_collection_totals(amounts, probabilities, num_trials, seed=42)
+            
+            # Calculate percentiles (lower order statistic) plus min/max from a
+            # single linear-time partition instead of repeated sorting
+            last = num_trials - 1
+            kth = [0, int(0.1 * last), int(0.5 * last), int(0.9 * last), last]
+            partitioned = np.partition(simulated_totals, kth)
+            low, p10, p50, p90, high = partitioned[kth].tolist()
             
             return {
                 "pending_collections": pending_collections,
@@ -1556,8 +1622,8 @@ def simulate_collections_probability():
                     "p10": p10,
                     "p50": p50,
                     "p90": p90,
-                    "min": min(simulated_totals),
-                    "max": max(simulated_totals)
+                    "min": low,
+                    "max": high
                 }
             }
         
@@ -1565,6 +1631,41 @@ def simulate_collections_probability():
             handle_error(f"Failed to simulate collections probability: {str(e)}", "alert_framework")
             raise RuntimeError(f"Failed to simulate collections probability: {str(e)}")
 
+# Recurring monthly fixed costs
+_BREAKEVEN_FIXED_COSTS_QUERY = """
+SELECT 
+    SUM(amount) as monthly_fixed_costs
+FROM expenses
+WHERE category IN ('rent', 'insurance', 'salaries', 'software', 'utilities')
+AND is_recurring = true
+AND created_at >= NOW() - INTERVAL '30 days'
+"""
+
+# Average variable cost ratio of recently completed jobs
+_BREAKEVEN_VARIABLE_COST_RATIO_QUERY = """
+WITH job_costs AS (
+    SELECT 
+        p.id as project_id,
+        p.total_revenue as revenue,
+        p.total_expenses as direct_expenses,
+        p.total_expenses / NULLIF(p.total_revenue, 0) as variable_cost_ratio
+    FROM projects p
+    WHERE p.status = 'completed'
+    AND p.created_at >= NOW() - INTERVAL '90 days'
+)
+SELECT 
+    AVG(variable_cost_ratio) as avg_variable_cost_ratio
+FROM job_costs
+"""
+
+# Revenue booked in the last 30 days
+_BREAKEVEN_MONTHLY_REVENUE_QUERY = """
+SELECT 
+    SUM(total_revenue) as monthly_revenue
+FROM projects
+WHERE created_at >= NOW() - INTERVAL '30 days'
+"""
+
 def calculate_realtime_breakeven():
     """
     Calculate real-time breakeven point based on current business metrics.
@@ -1579,33 +1680,8 @@ def calculate_realtime_breakeven():
     """
     with Spinner("Realtime Breakeven Analysis"):
         try:
-            # Query for fixed and variable costs
-            fixed_cost_query = """
-            SELECT 
-                SUM(amount) as monthly_fixed_costs
-            FROM expenses
-            WHERE category IN ('rent', 'insurance', 'salaries', 'software', 'utilities')
-            AND is_recurring = true
-            AND created_at >= NOW() - INTERVAL '30 days'
-            """
-            
-            variable_cost_query = """
-            WITH job_costs AS (
-                SELECT 
-                    p.id as project_id,
-                    p.total_revenue as revenue,
-                    p.total_expenses as direct_expenses,
-                    p.total_expenses / NULLIF(p.total_revenue, 0) as variable_cost_ratio
-                FROM projects p
-                WHERE p.status = 'completed'
-                AND p.created_at >= NOW() - INTERVAL '90 days'
-            )
-            SELECT 
-                AVG(variable_cost_ratio) as avg_variable_cost_ratio
-            FROM job_costs
-            """
-            
-            # TODO: Implement the actual database calls
+            # TODO: Implement the actual database calls (_BREAKEVEN_FIXED_COSTS_QUERY,
+            # _BREAKEVEN_VARIABLE_COST_RATIO_QUERY, _BREAKEVEN_MONTHLY_REVENUE_QUERY)
             # For now, we'll use placeholder values
             monthly_fixed_costs = 65000  # $65K monthly fixed costs
             avg_variable_cost_ratio = 0.6  # 60% variable costs
@@ -1614,15 +1690,7 @@ def calculate_realtime_breakeven():
             contribution_margin_ratio = 1 - avg_variable_cost_ratio
             breakeven_revenue = monthly_fixed_costs / contribution_margin_ratio if contribution_margin_ratio > 0 else float('inf')
             
-            # Calculate current position
-            current_monthly_revenue_query = """
-            SELECT 
-                SUM(total_revenue) as monthly_revenue
-            FROM projects
-            WHERE created_at >= NOW() - INTERVAL '30 days'
-            """
-            
-            # Placeholder value
+            # Calculate current position (placeholder value)
             current_monthly_revenue = 120000  # $120K monthly revenue
             
             # Calculate metrics
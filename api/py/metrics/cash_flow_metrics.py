@@ -7,15 +7,17 @@ Phase 1: Immediate Cash Flow Stabilization (0-90 Days)
 
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-import json
+import orjson
 import os
-import httpx
 import numpy as np
 from dotenv import load_dotenv
 
 # Import utils for consistent error handling
 from ..utils import handle_error, Spinner, safe_divide
 
+# Shared pooled HTTP client for Supabase calls
+from ..db.client import get_client
+
 # Load environment variables
 load_dotenv()
 
@@ -35,18 +37,143 @@ async def _call_supabase_rpc(function_name: str, params: Dict = None) -> Any:
         "Prefer": "return=representation"
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=params or {}, headers=headers)
-        if response.status_code >= 400:
-            handle_error(f"API error: {response.text}", "cash_flow_metrics")
-            raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
-        return response.json()
+    client = await get_client()
+    response = await client.post(url, content=orjson.dumps(params or {}), headers=headers)
+    if response.status_code >= 400:
+        handle_error(f"API error: {response.text}", "cash_flow_metrics")
+        raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
+    return orjson.loads(response.content)
 
 async def _execute_sql(query: str, params: Dict = None) -> List[Dict]:
     """Execute a SQL query against Supabase"""
     result = await _call_supabase_rpc("execute_sql", {"query": query, "params": params or {}})
     return result
 
+def _format_date(d) -> str:
+    """Format a date as YYYY-MM-DD without the locale lookups done by strftime"""
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+
+# ---------------------- SQL Queries ----------------------
+
+# Most recent cash balance on or before the given date
+_BEGINNING_CASH_QUERY = """
+SELECT balance
+FROM cash_balances
+WHERE as_of_date <= $1
+ORDER BY as_of_date DESC, id DESC
+LIMIT 1
+"""
+
+# Payments received on the given date
+_DAILY_COLLECTIONS_QUERY = """
+SELECT COALESCE(SUM(amount), 0) as total_collections
+FROM collections
+WHERE actual_date = $1
+AND status = 'received'
+"""
+
+# Expenses paid on the given date
+_DAILY_DISBURSEMENTS_QUERY = """
+SELECT COALESCE(SUM(amount), 0) as total_disbursements
+FROM expenses
+WHERE paid_date = $1
+AND status = 'paid'
+"""
+
+# Total accounts receivable (unpaid collections)
+_DSO_AR_QUERY = """
+SELECT COALESCE(SUM(amount), 0) as total_ar
+FROM collections
+WHERE status = 'pending'
+"""
+
+# Total revenue collected in the last 90 days
+_DSO_REVENUE_QUERY = """
+SELECT COALESCE(SUM(amount), 0) as total_revenue
+FROM collections
+WHERE status = 'received'
+AND actual_date >= NOW() - INTERVAL '90 days'
+"""
+
+# Total active inventory value
+_DIO_INVENTORY_QUERY = """
+SELECT COALESCE(SUM(value), 0) as total_inventory
+FROM inventory
+WHERE status = 'active'
+"""
+
+# Materials expenses in the last 90 days, used as a COGS proxy
+_DIO_COGS_QUERY = """
+SELECT COALESCE(SUM(amount), 0) as total_cogs
+FROM expenses
+WHERE category = 'materials'
+AND created_at >= NOW() - INTERVAL '90 days'
+"""
+
+# Total accounts payable (unpaid expenses)
+_DPO_AP_QUERY = """
+SELECT COALESCE(SUM(amount), 0) as total_ap
+FROM expenses
+WHERE status = 'pending'
+"""
+
+# Total expenses paid in the last 90 days
+_DPO_EXPENSES_QUERY = """
+SELECT COALESCE(SUM(amount), 0) as total_expenses
+FROM expenses
+WHERE status = 'paid'
+AND paid_date >= NOW() - INTERVAL '90 days'
+"""
+
+# AR grouped into aging buckets
+_AR_AGING_QUERY = """
+SELECT
+    CASE
+        WHEN NOW()::date - expected_date <= 30 THEN '0-30'
+        WHEN NOW()::date - expected_date <= 60 THEN '31-60'
+        WHEN NOW()::date - expected_date <= 90 THEN '61-90'
+        ELSE '90+'
+    END as bucket,
+    SUM(amount) as amount
+FROM collections
+WHERE status = 'pending'
+GROUP BY bucket
+ORDER BY bucket
+"""
+
+# Expected collections by week
+_FORECAST_COLLECTIONS_QUERY = """
+SELECT
+    date_trunc('week', expected_date) as week_start,
+    SUM(amount * (confidence_percentage / 100)) as expected_amount
+FROM collections
+WHERE status = 'pending'
+AND expected_date BETWEEN $1 AND $1 + $2 * INTERVAL '1 week'
+GROUP BY week_start
+ORDER BY week_start
+"""
+
+# Expected fixed and variable expenses by week
+_FORECAST_EXPENSES_QUERY = """
+SELECT
+    date_trunc('week', due_date) as week_start,
+    SUM(CASE WHEN category IN ('rent', 'utilities', 'insurance', 'salaries') THEN amount ELSE 0 END) as fixed_costs,
+    SUM(CASE WHEN category NOT IN ('rent', 'utilities', 'insurance', 'salaries') THEN amount ELSE 0 END) as variable_costs
+FROM expenses
+WHERE status = 'pending'
+AND due_date BETWEEN $1 AND $1 + $2 * INTERVAL '1 week'
+GROUP BY week_start
+ORDER BY week_start
+"""
+
+# Current cash balance
+_CURRENT_BALANCE_QUERY = """
+SELECT balance
+FROM cash_balances
+ORDER BY as_of_date DESC, id DESC
+LIMIT 1
+"""
+
 def calculate_daily_cash_position(date: datetime = None) -> float:
     """
     Calculate the daily cash position for a specific date.
@@ -70,32 +197,7 @@ def calculate_daily_cash_position(date: datetime = None) -> float:
             if date is None:
                 date = datetime.now().date()
             
-            # SQL query to get beginning cash balance (most recent balance before the specified date)
-            beginning_cash_query = """
-            SELECT balance
-            FROM cash_balances
-            WHERE as_of_date <= $1
-            ORDER BY as_of_date DESC, id DESC
-            LIMIT 1
-            """
-            
-            # SQL query to get daily collections (payments received on the specified date)
-            collections_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_collections
-            FROM collections
-            WHERE actual_date = $1
-            AND status = 'received'
-            """
-            
-            # SQL query to get daily disbursements (expenses paid on the specified date)
-            disbursements_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_disbursements
-            FROM expenses
-            WHERE paid_date = $1
-            AND status = 'paid'
-            """
-            
-            # TODO: Implement the actual database calls
+            # TODO: Implement the actual database calls (_BEGINNING_CASH_QUERY, _DAILY_COLLECTIONS_QUERY, _DAILY_DISBURSEMENTS_QUERY)
             # For now, we'll return a placeholder value
             return 45000.0
         
@@ -119,22 +221,7 @@ def get_dso() -> float:
     """
     with Spinner("DSO Calculation"):
         try:
-            # SQL query to get total accounts receivable (unpaid collections)
-            ar_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_ar
-            FROM collections
-            WHERE status = 'pending'
-            """
-            
-            # SQL query to get total revenue in the last 90 days
-            revenue_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_revenue
-            FROM collections
-            WHERE status = 'received'
-            AND actual_date >= NOW() - INTERVAL '90 days'
-            """
-            
-            # TODO: Implement the actual database calls
+            # TODO: Implement the actual database calls (_DSO_AR_QUERY, _DSO_REVENUE_QUERY)
             # For now, we'll return a placeholder value
             return 32.5  # 32.5 days
         
@@ -158,24 +245,7 @@ def get_dio() -> float:
     """
     with Spinner("DIO Calculation"):
         try:
-            # SQL query to get total inventory value
-            # Note: This assumes an inventory table exists. If not, this would need to be modified.
-            inventory_query = """
-            SELECT COALESCE(SUM(value), 0) as total_inventory
-            FROM inventory
-            WHERE status = 'active'
-            """
-            
-            # SQL query to get total COGS in the last 90 days
-            # Note: Using expenses with category 'materials' as a proxy for COGS
-            cogs_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_cogs
-            FROM expenses
-            WHERE category = 'materials'
-            AND created_at >= NOW() - INTERVAL '90 days'
-            """
-            
-            # TODO: Implement the actual database calls
+            # TODO: Implement the actual database calls (_DIO_INVENTORY_QUERY, _DIO_COGS_QUERY)
             # For now, we'll return a placeholder value
             return 15.2  # 15.2 days
         
@@ -199,22 +269,7 @@ def get_dpo() -> float:
     """
     with Spinner("DPO Calculation"):
         try:
-            # SQL query to get total accounts payable (unpaid expenses)
-            ap_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_ap
-            FROM expenses
-            WHERE status = 'pending'
-            """
-            
-            # SQL query to get total expenses in the last 90 days
-            expenses_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_expenses
-            FROM expenses
-            WHERE status = 'paid'
-            AND paid_date >= NOW() - INTERVAL '90 days'
-            """
-            
-            # TODO: Implement the actual database calls
+            # TODO: Implement the actual database calls (_DPO_AP_QUERY, _DPO_EXPENSES_QUERY)
             # For now, we'll return a placeholder value
             return 28.7  # 28.7 days
         
@@ -252,6 +307,9 @@ def calculate_ccc() -> float:
             handle_error(f"Failed to calculate CCC: {str(e)}", "cash_flow_metrics")
             raise RuntimeError(f"Failed to calculate CCC: {str(e)}")
 
+_AR_AGING_BUCKETS = ("0-30", "31-60", "61-90", "90+")
+_AR_AGING_PCT_KEYS = tuple(f"{bucket}_pct" for bucket in _AR_AGING_BUCKETS)
+
 def get_ar_aging_buckets() -> Dict[str, float]:
     """
     Calculate Accounts Receivable aging buckets.
@@ -268,41 +326,17 @@ def get_ar_aging_buckets() -> Dict[str, float]:
     """
     with Spinner("AR Aging"):
         try:
-            # SQL query to get AR in each aging bucket
-            ar_aging_query = """
-            SELECT
-                CASE
-                    WHEN NOW()::date - expected_date <= 30 THEN '0-30'
-                    WHEN NOW()::date - expected_date <= 60 THEN '31-60'
-                    WHEN NOW()::date - expected_date <= 90 THEN '61-90'
-                    ELSE '90+'
-                END as bucket,
-                SUM(amount) as amount
-            FROM collections
-            WHERE status = 'pending'
-            GROUP BY bucket
-            ORDER BY bucket
-            """
-            
-            # TODO: Implement the actual database calls
+            # TODO: Implement the actual database calls (_AR_AGING_QUERY)
             # For now, we'll return placeholder values
-            result = {
-                "0-30": 25000.0,
-                "31-60": 15000.0,
-                "61-90": 8000.0,
-                "90+": 4000.0
-            }
-            
-            # Calculate total AR
-            total_ar = sum(result.values())
+            amounts = np.array([25000.0, 15000.0, 8000.0, 4000.0])
             
-            # Calculate percentages
-            percentages = {}
-            for bucket, amount in result.items():
-                percentages[f"{bucket}_pct"] = (amount / total_ar * 100) if total_ar > 0 else 0
+            # Calculate percentages of total AR in one vectorized op
+            total_ar = amounts.sum()
+            percentages = amounts / total_ar * 100 if total_ar > 0 else np.zeros_like(amounts)
             
             # Combine results
-            result.update(percentages)
+            result = dict(zip(_AR_AGING_BUCKETS, amounts.tolist()))
+            result.update(zip(_AR_AGING_PCT_KEYS, percentages.tolist()))
             
             return result
         
@@ -310,6 +344,21 @@ def get_ar_aging_buckets() -> Dict[str, float]:
             handle_error(f"Failed to calculate AR aging buckets: {str(e)}", "cash_flow_metrics")
             raise RuntimeError(f"Failed to calculate AR aging buckets: {str(e)}")
 
+# Sample forecast components: collections, other income, fixed costs, variable costs
+_FORECAST_BASE = np.array([15000.0, 500.0, 8000.0, 5000.0])
+_FORECAST_SPREAD = np.array([3000.0, 200.0, 500.0, 2000.0])
+
+def _build_week_offsets(weeks: int) -> Tuple[Tuple[timedelta, timedelta], ...]:
+    """(start, end) offsets from the forecast start date for each week"""
+    return tuple(
+        (timedelta(days=i * 7), timedelta(days=i * 7 + 6))
+        for i in range(weeks)
+    )
+
+# The standard 13-week horizon is by far the most common call, so its offsets are built once
+_STANDARD_FORECAST_WEEKS = 13
+_STANDARD_WEEK_OFFSETS = _build_week_offsets(_STANDARD_FORECAST_WEEKS)
+
 def get_weekly_cashflow_forecast(start_date: datetime = None, weeks: int = 13) -> List[Dict]:
     """
     Generate a 13-week rolling cash flow forecast.
@@ -342,73 +391,40 @@ def get_weekly_cashflow_forecast(start_date: datetime = None, weeks: int = 13) -
             if start_date is None:
                 start_date = datetime.now().date()
             
-            # SQL query to get expected collections by week
-            collections_query = """
-            SELECT
-                date_trunc('week', expected_date) as week_start,
-                SUM(amount * (confidence_percentage / 100)) as expected_amount
-            FROM collections
-            WHERE status = 'pending'
-            AND expected_date BETWEEN $1 AND $1 + INTERVAL '$2 weeks'
-            GROUP BY week_start
-            ORDER BY week_start
-            """
+            # TODO: Implement the actual database calls (_FORECAST_COLLECTIONS_QUERY, _FORECAST_EXPENSES_QUERY, _CURRENT_BALANCE_QUERY)
+            # For now, we'll return placeholder values
             
-            # SQL query to get expected expenses by week
-            expenses_query = """
-            SELECT
-                date_trunc('week', due_date) as week_start,
-                SUM(CASE WHEN category IN ('rent', 'utilities', 'insurance', 'salaries') THEN amount ELSE 0 END) as fixed_costs,
-                SUM(CASE WHEN category NOT IN ('rent', 'utilities', 'insurance', 'salaries') THEN amount ELSE 0 END) as variable_costs
-            FROM expenses
-            WHERE status = 'pending'
-            AND due_date BETWEEN $1 AND $1 + INTERVAL '$2 weeks'
-            GROUP BY week_start
-            ORDER BY week_start
-            """
+            current_balance = 45000.0  # Placeholder for current balance
             
-            # SQL query to get current cash balance
-            balance_query = """
-            SELECT balance
-            FROM cash_balances
-            ORDER BY as_of_date DESC, id DESC
-            LIMIT 1
-            """
+            # Generate some sample data with slight randomness, one column per component
+            # (collections, other income, fixed costs, variable costs)
+            rng = np.random.default_rng()
+            components = _FORECAST_BASE + (rng.random((weeks, 4)) - 0.5) * _FORECAST_SPREAD
+            collections, other_income, fixed_costs, variable_costs = components.T
             
-            # TODO: Implement the actual database calls
-            # For now, we'll return placeholder values
+            # Calculate net cash flow and running balance for all weeks at once
+            net_cash_flow = collections + other_income - fixed_costs - variable_costs
+            ending_balance = current_balance + np.cumsum(net_cash_flow)
             
-            forecast = []
-            current_balance = 45000.0  # Placeholder for current balance
+            rows = np.round(np.column_stack((components, net_cash_flow, ending_balance)), 2).tolist()
+            if weeks == _STANDARD_FORECAST_WEEKS:
+                week_offsets = _STANDARD_WEEK_OFFSETS
+            else:
+                week_offsets = _build_week_offsets(weeks)
             
-            for i in range(weeks):
-                week_start = start_date + timedelta(days=i*7)
-                week_end = week_start + timedelta(days=6)
-                
-                # Generate some sample data with slight randomness
-                collections = 15000.0 + (np.random.random() - 0.5) * 3000
-                other_income = 500.0 + (np.random.random() - 0.5) * 200
-                fixed_costs = 8000.0 + (np.random.random() - 0.5) * 500
-                variable_costs = 5000.0 + (np.random.random() - 0.5) * 2000
-                
-                # Calculate net cash flow
-                net_cash_flow = collections + other_income - fixed_costs - variable_costs
-                
-                # Update balance
-                ending_balance = current_balance + net_cash_flow
-                current_balance = ending_balance
-                
-                # Add to forecast
-                forecast.append({
-                    "week_start": week_start.strftime("%Y-%m-%d"),
-                    "week_end": week_end.strftime("%Y-%m-%d"),
-                    "collections": round(collections, 2),
-                    "other_income": round(other_income, 2),
-                    "fixed_costs": round(fixed_costs, 2),
-                    "variable_costs": round(variable_costs, 2),
-                    "net_cash_flow": round(net_cash_flow, 2),
-                    "ending_balance": round(ending_balance, 2)
-                })
+            forecast = [
+                {
+                    "week_start": _format_date(start_date + start_offset),
+                    "week_end": _format_date(start_date + end_offset),
+                    "collections": row[0],
+                    "other_income": row[1],
+                    "fixed_costs": row[2],
+                    "variable_costs": row[3],
+                    "net_cash_flow": row[4],
+                    "ending_balance": row[5]
+                }
+                for (start_offset, end_offset), row in zip(week_offsets, rows)
+            ]
             
             return forecast
         
@@ -5,16 +5,24 @@ This module contains functions for calculating operational efficiency and unit e
 Phase 2: Operational Efficiency & Unit Economics (30-180 Days)
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional, Tuple
-import json
+import asyncio
+import functools
+import hashlib
+import orjson
 import os
-import httpx
 import numpy as np
 from dotenv import load_dotenv
 
 # Import utils for consistent error handling
-from ..utils import handle_error, Spinner, safe_divide
+from ..utils import handle_error, Spinner, maybe_spinner, suppress_spinners, safe_divide, ttl_cache, USE_REAL_DB
+
+# Shared pooled HTTP client for Supabase calls
+from ..db.client import get_client, service_role_headers, SQL_RPC_FUNCTIONS
+
+# Array formulas shared with scenario sweeps
+from ._kernels import clv_batch, nrr_batch, utilization_batch
 
 # Load environment variables
 load_dotenv()
@@ -23,31 +31,149 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# RPC request headers; the SQL-executing RPCs are granted to service_role only
+_HEADERS = {
+    "apikey": SUPABASE_ANON_KEY,
+    "Content-Type": "application/json",
+    "Accept-Encoding": "gzip",
+    "Prefer": "return=representation"
+}
+_SERVICE_HEADERS = service_role_headers(_HEADERS)
+
+# How long RPC responses are reused. A longer TTL means fewer queries against
+# Supabase but staler dashboard numbers
+RPC_CACHE_TTL_SECONDS = float(os.getenv("RESTINTEL_RPC_CACHE_TTL", "60"))
+
+# How long the slow-moving 90/365-day aggregates (CAC by channel, equipment ROI)
+# are reused after post-processing
+AGGREGATE_CACHE_TTL_SECONDS = float(os.getenv("RESTINTEL_AGGREGATE_CACHE_TTL", "300"))
+
+@ttl_cache(RPC_CACHE_TTL_SECONDS)
 async def _call_supabase_rpc(function_name: str, params: Dict = None) -> Any:
-    """Call a Supabase RPC function asynchronously"""
+    """Call a Supabase RPC function asynchronously (responses are cached per function and params)"""
     if not SUPABASE_URL or not SUPABASE_ANON_KEY:
         raise RuntimeError("Supabase credentials not configured")
     
     url = f"{SUPABASE_URL}/rest/v1/rpc/{function_name}"
-    headers = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Content-Type": "application/json",
-        "Prefer": "return=representation"
-    }
+    headers = _HEADERS
+    if function_name in SQL_RPC_FUNCTIONS:
+        if _SERVICE_HEADERS is None:
+            raise RuntimeError("Supabase service role key not configured")
+        headers = _SERVICE_HEADERS
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=params or {}, headers=headers)
-        if response.status_code >= 400:
-            handle_error(f"API error: {response.text}", "operational_metrics")
-            raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
-        return response.json()
+    client = await get_client()
+    response = await client.post(url, content=orjson.dumps(params or {}), headers=headers)
+    if response.status_code >= 400:
+        handle_error(f"API error: {response.text}", "operational_metrics")
+        raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
+    return orjson.loads(response.content)
+
+@functools.lru_cache(maxsize=256)
+def _statement_name(query: str) -> str:
+    """Stable prepared statement name for a query text"""
+    return "stmt_" + hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
 
 async def _execute_sql(query: str, params: Dict = None) -> List[Dict]:
-    """Execute a SQL query against Supabase"""
-    result = await _call_supabase_rpc("execute_sql", {"query": query, "params": params or {}})
+    """
+    Execute a SQL query against Supabase as a prepared statement
+    
+    Queries use $1, $2, ... placeholders with params keyed "1", "2", ... The
+    exec_prepared RPC (see migrations/003_add_exec_prepared.sql) prepares each
+    distinct query once per session so Postgres can reuse its plan.
+    """
+    result = await _call_supabase_rpc("exec_prepared", {
+        "statement_name": _statement_name(query),
+        "query": query,
+        "params": params or {}
+    })
     return result
 
-def calculate_rpj(segmentation: str = None) -> Dict[str, float]:
+# Column returned when a columnar query has no rows
+_EMPTY_COLUMN = np.empty(0)
+
+def _to_column(values: List[Any]) -> np.ndarray:
+    """Convert a column of JSON values to a float array (NULL -> nan) if all are numbers, else an object array"""
+    # Decided from the JSON types, so numeric-looking text ("00123") and booleans stay as-is
+    numeric = all(
+        value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+        for value in values
+    )
+    if numeric:
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return np.array(values, dtype=object)
+
+async def _execute_sql_columnar(query: str, params: Dict = None) -> Dict[str, np.ndarray]:
+    """
+    Execute a SQL query against Supabase and return its result column-major
+    
+    Uses the exec_prepared_columnar RPC (see migrations/004_add_exec_prepared_columnar.sql),
+    so rows are never materialised as dictionaries. Columns are missing when the
+    query returns no rows.
+    """
+    result = await _call_supabase_rpc("exec_prepared_columnar", {
+        "statement_name": _statement_name(query),
+        "query": query,
+        "params": params or {}
+    })
+    return {column: _to_column(values) for column, values in (result or {}).items()}
+
+def _percentage(numerator: float, denominator: float) -> float:
+    """Ratio as a percentage, 0.0 when the denominator is zero"""
+    return safe_divide(numerator, denominator) * 100
+
+def _first_value(rows: List[Dict], key: str, default: float = 0.0) -> float:
+    """Read a column from the first row of a single-row aggregate query"""
+    if not rows or rows[0].get(key) is None:
+        return default
+    return rows[0][key]
+
+# Supported reporting periods and the window each one covers
+_PERIOD_INTERVALS = {
+    "month": "30 days",
+    "quarter": "90 days",
+    "year": "365 days"
+}
+
+# Rollup row used when the RPC returns no overall row
+_EMPTY_ROLLUP_ROW = {
+    "job_type": None,
+    "is_total": True,
+    "total_jobs": 0,
+    "completed_jobs": 0,
+    "completed_revenue": 0.0,
+    "avg_days_to_complete": None
+}
+
+def _period_interval(period: str) -> str:
+    """Validate a reporting period and return the interval it covers"""
+    if period not in _PERIOD_INTERVALS:
+        raise ValueError(f"Unsupported period: {period}")
+    return _PERIOD_INTERVALS[period]
+
+@ttl_cache(RPC_CACHE_TTL_SECONDS)
+async def _get_operational_rollup(period: str) -> Dict[str, Any]:
+    """
+    Fetch the operational_rollup RPC for a period (see migrations/002_add_operational_rollup.sql).
+    
+    One call returns job counts, completed revenue and days-to-complete, both overall
+    and per job type. calculate_rpj, calculate_job_completion_rate and calculate_adc
+    all read from this cached response, so they share a single round-trip.
+    
+    Args:
+        period: Time period for the rollup ('month', 'quarter', 'year').
+        
+    Returns:
+        Dictionary with the "overall" row and a list of "by_job_type" rows.
+    """
+    # The window is bound as an interval parameter, never formatted into SQL
+    window_interval = _period_interval(period)
+    rows = await _call_supabase_rpc("operational_rollup", {"window_interval": window_interval}) or []
+    return {
+        "overall": next((row for row in rows if row["is_total"]), _EMPTY_ROLLUP_ROW),
+        "by_job_type": [row for row in rows if not row["is_total"]]
+    }
+
+async def calculate_rpj(segmentation: str = None, period: str = 'year') -> Dict[str, float]:
     """
     Calculate Revenue Per Job (RPJ).
     
@@ -56,6 +182,8 @@ def calculate_rpj(segmentation: str = None) -> Dict[str, float]:
     Args:
         segmentation: Optional segmentation parameter (e.g., 'job_type', 'customer_type').
                       If provided, results will be segmented accordingly.
+        period: Time period for calculation ('month', 'quarter', 'year').
+               Defaults to 'year'.
         
     Returns:
         Dictionary with RPJ values, potentially segmented if requested.
@@ -65,36 +193,33 @@ def calculate_rpj(segmentation: str = None) -> Dict[str, float]:
         - Use in job type profitability analysis
         - Include in pricing strategy
     """
-    with Spinner("Revenue Per Job"):
+    with maybe_spinner("Revenue Per Job"):
         try:
-            # Base SQL query for all jobs
-            if segmentation is None or segmentation == 'overall':
-                query = """
-                SELECT 
-                    COUNT(*) as job_count,
-                    SUM(total_revenue) as total_revenue,
-                    SUM(total_revenue) / COUNT(*) as rpj
-                FROM projects
-                WHERE status = 'completed'
-                """
-            # Segmented query by job type
-            elif segmentation == 'job_type':
-                query = """
-                SELECT 
-                    job_type,
-                    COUNT(*) as job_count,
-                    SUM(total_revenue) as total_revenue,
-                    SUM(total_revenue) / COUNT(*) as rpj
-                FROM projects
-                WHERE status = 'completed'
-                GROUP BY job_type
-                ORDER BY job_type
-                """
-            # Other segmentation options can be added here
-            else:
+            # Other segmentation options can be added to the rollup later
+            if segmentation not in (None, 'overall', 'job_type'):
                 raise ValueError(f"Unsupported segmentation: {segmentation}")
+            _period_interval(period)
+            
+            if USE_REAL_DB:
+                rollup = await _get_operational_rollup(period)
+                
+                if segmentation == 'job_type':
+                    return {
+                        row["job_type"]: {
+                            "rpj": safe_divide(row["completed_revenue"], row["completed_jobs"]),
+                            "job_count": row["completed_jobs"],
+                            "total_revenue": row["completed_revenue"]
+                        }
+                        for row in rollup["by_job_type"]
+                    }
+                
+                overall = rollup["overall"]
+                return {
+                    "overall_rpj": safe_divide(overall["completed_revenue"], overall["completed_jobs"]),
+                    "job_count": overall["completed_jobs"],
+                    "total_revenue": overall["completed_revenue"]
+                }
             
-            # TODO: Implement the actual database calls
             # For now, we'll return placeholder values
             if segmentation is None or segmentation == 'overall':
                 return {"overall_rpj": 8750.0, "job_count": 24, "total_revenue": 210000.0}
@@ -109,7 +234,7 @@ def calculate_rpj(segmentation: str = None) -> Dict[str, float]:
             handle_error(f"Failed to calculate Revenue Per Job: {str(e)}", "operational_metrics")
             raise RuntimeError(f"Failed to calculate Revenue Per Job: {str(e)}")
 
-def calculate_job_completion_rate(period: str = 'month') -> float:
+async def calculate_job_completion_rate(period: str = 'month') -> float:
     """
     Calculate Job Completion Rate.
     
@@ -127,34 +252,21 @@ def calculate_job_completion_rate(period: str = 'month') -> float:
         - Use in resource allocation planning
         - Include in team performance metrics
     """
-    with Spinner("Job Completion Rate"):
+    with maybe_spinner("Job Completion Rate"):
         try:
-            # Determine date range based on period
-            if period == 'month':
-                date_range = "30 days"
-            elif period == 'quarter':
-                date_range = "90 days"
-            elif period == 'year':
-                date_range = "365 days"
-            else:
-                raise ValueError(f"Unsupported period: {period}")
-            
-            # SQL query to get job completion stats
-            query = f"""
-            SELECT 
-                COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_jobs,
-                COUNT(*) as total_jobs
-            FROM projects
-            WHERE created_at >= NOW() - INTERVAL '{date_range}'
-            """
+            _period_interval(period)
             
-            # TODO: Implement the actual database calls
-            # For now, we'll return placeholder values
-            completed_jobs = 18
-            total_jobs = 20
+            if USE_REAL_DB:
+                overall = (await _get_operational_rollup(period))["overall"]
+                completed_jobs = overall["completed_jobs"]
+                total_jobs = overall["total_jobs"]
+            else:
+                # For now, we'll use placeholder values
+                completed_jobs = 18
+                total_jobs = 20
             
             # Calculate completion rate
-            completion_rate = (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0
+            completion_rate = _percentage(completed_jobs, total_jobs)
             
             return completion_rate
         
@@ -162,12 +274,16 @@ def calculate_job_completion_rate(period: str = 'month') -> float:
             handle_error(f"Failed to calculate Job Completion Rate: {str(e)}", "operational_metrics")
             raise RuntimeError(f"Failed to calculate Job Completion Rate: {str(e)}")
 
-def calculate_adc() -> float:
+async def calculate_adc(period: str = 'quarter') -> float:
     """
     Calculate Average Days to Complete (ADC).
     
     Formula: Total Days for All Jobs ÷ Number of Jobs
     
+    Args:
+        period: Time period for calculation ('month', 'quarter', 'year').
+               Defaults to 'quarter'.
+        
     Returns:
         Average days to complete a job.
         
@@ -176,24 +292,14 @@ def calculate_adc() -> float:
         - Use in scheduling and resource planning
         - Include in customer communication about timelines
     """
-    with Spinner("Average Days to Complete"):
+    with maybe_spinner("Average Days to Complete"):
         try:
-            # SQL query to calculate days to complete for each job
-            query = """
-            SELECT 
-                AVG(
-                    CASE 
-                        WHEN status = 'completed' THEN 
-                            EXTRACT(DAY FROM (updated_at - start_date))
-                        ELSE NULL
-                    END
-                ) as avg_days_to_complete
-            FROM projects
-            WHERE status = 'completed'
-            AND updated_at >= NOW() - INTERVAL '90 days'
-            """
+            _period_interval(period)
+            
+            if USE_REAL_DB:
+                overall = (await _get_operational_rollup(period))["overall"]
+                return overall["avg_days_to_complete"] or 0.0
             
-            # TODO: Implement the actual database calls
             # For now, we'll return a placeholder value
             return 12.5  # 12.5 days average
         
@@ -201,7 +307,8 @@ def calculate_adc() -> float:
             handle_error(f"Failed to calculate Average Days to Complete: {str(e)}", "operational_metrics")
             raise RuntimeError(f"Failed to calculate Average Days to Complete: {str(e)}")
 
-def calculate_cac_by_channel() -> Dict[str, float]:
+@ttl_cache(AGGREGATE_CACHE_TTL_SECONDS, copy_results=True)
+async def calculate_cac_by_channel() -> Dict[str, float]:
     """
     Calculate Customer Acquisition Cost (CAC) by Channel.
     
@@ -215,7 +322,7 @@ def calculate_cac_by_channel() -> Dict[str, float]:
         - Use in marketing budget allocation
         - Include in ROI analysis
     """
-    with Spinner("CAC by Channel"):
+    with maybe_spinner("CAC by Channel"):
         try:
             # SQL query to get lead costs and conversions by source
             query = """
@@ -230,7 +337,20 @@ def calculate_cac_by_channel() -> Dict[str, float]:
             GROUP BY l.lead_source
             """
             
-            # TODO: Implement the actual database calls
+            if USE_REAL_DB:
+                columns = await _execute_sql_columnar(query)
+                lead_sources = columns.get("lead_source", _EMPTY_COLUMN)
+                cac = columns.get("cac", _EMPTY_COLUMN)
+                
+                # Channels without any acquired customers have no CAC
+                has_customers = ~np.isnan(cac)
+                result = dict(zip(lead_sources[has_customers].tolist(), cac[has_customers].tolist()))
+                result["Overall"] = safe_divide(
+                    float(np.nansum(columns.get("total_cost", _EMPTY_COLUMN))),
+                    float(np.nansum(columns.get("customers_acquired", _EMPTY_COLUMN)))
+                )
+                return result
+            
             # For now, we'll return placeholder values
             return {
                 "Google Ads": 285.75,
@@ -244,7 +364,7 @@ def calculate_cac_by_channel() -> Dict[str, float]:
             handle_error(f"Failed to calculate CAC by Channel: {str(e)}", "operational_metrics")
             raise RuntimeError(f"Failed to calculate CAC by Channel: {str(e)}")
 
-def calculate_clv() -> float:
+async def calculate_clv() -> float:
     """
     Calculate Customer Lifetime Value (CLV).
     
@@ -258,7 +378,7 @@ def calculate_clv() -> float:
         - Use in customer retention strategy
         - Include in marketing investment decisions
     """
-    with Spinner("Customer Lifetime Value"):
+    with maybe_spinner("Customer Lifetime Value"):
         try:
             # SQL query to get average revenue per customer
             avg_revenue_query = """
@@ -277,7 +397,7 @@ def calculate_clv() -> float:
             # SQL query to get gross margin
             gross_margin_query = """
             SELECT 
-                (SUM(total_revenue) - SUM(total_expenses) - SUM(allocated_lead_cost)) / SUM(total_revenue) * 100 as gross_margin_pct
+                (SUM(total_revenue) - SUM(total_expenses) - SUM(allocated_lead_cost)) / NULLIF(SUM(total_revenue), 0) * 100 as gross_margin_pct
             FROM projects
             WHERE status = 'completed'
             AND updated_at >= NOW() - INTERVAL '365 days'
@@ -294,18 +414,27 @@ def calculate_clv() -> float:
                 GROUP BY c.id
             )
             SELECT 
-                COUNT(CASE WHEN last_project_date < NOW() - INTERVAL '365 days' THEN 1 END) * 1.0 / NULLIF(COUNT(*), 0) as churn_rate
+                COUNT(*) FILTER (WHERE last_project_date < NOW() - INTERVAL '365 days') * 1.0 / NULLIF(COUNT(*), 0) as churn_rate
             FROM customer_projects
             """
             
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            avg_revenue_per_customer = 18500.0
-            gross_margin_pct = 42.5  # 42.5%
-            churn_rate = 0.15  # 15% annual churn
+            if USE_REAL_DB:
+                avg_revenue_rows, gross_margin_rows, churn_rows = await asyncio.gather(
+                    _execute_sql(avg_revenue_query),
+                    _execute_sql(gross_margin_query),
+                    _execute_sql(churn_query)
+                )
+                avg_revenue_per_customer = _first_value(avg_revenue_rows, "avg_revenue_per_customer")
+                gross_margin_pct = _first_value(gross_margin_rows, "gross_margin_pct")
+                churn_rate = _first_value(churn_rows, "churn_rate")
+            else:
+                # For now, we'll use placeholder values
+                avg_revenue_per_customer = 18500.0
+                gross_margin_pct = 42.5  # 42.5%
+                churn_rate = 0.15  # 15% annual churn
             
             # Calculate CLV
-            clv = (avg_revenue_per_customer * (gross_margin_pct / 100)) / churn_rate if churn_rate > 0 else 0
+            clv = float(clv_batch(avg_revenue_per_customer, gross_margin_pct, churn_rate)[0])
             
             return clv
         
@@ -313,7 +442,7 @@ def calculate_clv() -> float:
             handle_error(f"Failed to calculate Customer Lifetime Value: {str(e)}", "operational_metrics")
             raise RuntimeError(f"Failed to calculate Customer Lifetime Value: {str(e)}")
 
-def calculate_nrr() -> float:
+async def calculate_nrr() -> float:
     """
     Calculate Net Revenue Retention (NRR).
     
@@ -327,66 +456,57 @@ def calculate_nrr() -> float:
         - Use in customer success strategy
         - Include in investor reporting
     """
-    with Spinner("Net Revenue Retention"):
+    with maybe_spinner("Net Revenue Retention"):
         try:
-            # Define time periods
-            current_period_start = datetime.now() - timedelta(days=30)
-            current_period_end = datetime.now()
-            prior_period_start = datetime.now() - timedelta(days=60)
-            prior_period_end = datetime.now() - timedelta(days=30)
+            # Define time periods from a single reference time so the boundaries line up
+            now = datetime.now(timezone.utc)
+            current_period_end = now
+            current_period_start = now - timedelta(days=30)
+            prior_period_end = current_period_start
+            prior_period_start = current_period_start - timedelta(days=30)
             
-            # SQL query to get starting ARR (using prior period)
-            starting_arr_query = f"""
-            SELECT 
-                SUM(total_revenue) as starting_arr
-            FROM projects
-            WHERE created_at BETWEEN '{prior_period_start.isoformat()}' AND '{prior_period_end.isoformat()}'
-            """
-            
-            # SQL query to get expansion revenue (additional revenue from existing customers)
-            expansion_query = f"""
-            SELECT 
-                SUM(p2.total_revenue - p1.total_revenue) as expansion
-            FROM projects p1
-            JOIN projects p2 ON p1.customer_id = p2.customer_id
-            WHERE p1.created_at BETWEEN '{prior_period_start.isoformat()}' AND '{prior_period_end.isoformat()}'
-            AND p2.created_at BETWEEN '{current_period_start.isoformat()}' AND '{current_period_end.isoformat()}'
-            AND p2.total_revenue > p1.total_revenue
-            """
-            
-            # SQL query to get contraction revenue (reduced revenue from existing customers)
-            contraction_query = f"""
-            SELECT 
-                SUM(p1.total_revenue - p2.total_revenue) as contraction
-            FROM projects p1
-            JOIN projects p2 ON p1.customer_id = p2.customer_id
-            WHERE p1.created_at BETWEEN '{prior_period_start.isoformat()}' AND '{prior_period_end.isoformat()}'
-            AND p2.created_at BETWEEN '{current_period_start.isoformat()}' AND '{current_period_end.isoformat()}'
-            AND p2.total_revenue < p1.total_revenue
-            """
-            
-            # SQL query to get churn (lost revenue from customers who didn't return)
-            churn_query = f"""
-            SELECT 
-                SUM(p.total_revenue) as churn
-            FROM projects p
-            WHERE p.created_at BETWEEN '{prior_period_start.isoformat()}' AND '{prior_period_end.isoformat()}'
-            AND p.customer_id NOT IN (
-                SELECT DISTINCT customer_id
+            # Single pass over projects: per-customer revenue in each period, then
+            # starting ARR, expansion, contraction and churn from those two columns.
+            # Period boundaries are bound as $1..$4 rather than interpolated
+            query = """
+            WITH periods AS (
+                SELECT 
+                    customer_id,
+                    SUM(total_revenue) FILTER (WHERE created_at BETWEEN $1 AND $2) as prior_rev,
+                    SUM(total_revenue) FILTER (WHERE created_at BETWEEN $3 AND $4) as curr_rev
                 FROM projects
-                WHERE created_at BETWEEN '{current_period_start.isoformat()}' AND '{current_period_end.isoformat()}'
+                WHERE created_at BETWEEN $1 AND $4
+                GROUP BY customer_id
             )
+            SELECT 
+                SUM(prior_rev) as starting_arr,
+                SUM(GREATEST(curr_rev - prior_rev, 0)) FILTER (WHERE prior_rev > 0 AND curr_rev > 0) as expansion,
+                SUM(GREATEST(prior_rev - curr_rev, 0)) FILTER (WHERE prior_rev > 0 AND curr_rev > 0) as contraction,
+                SUM(prior_rev) FILTER (WHERE curr_rev IS NULL OR curr_rev = 0) as churn
+            FROM periods
             """
+            params = {
+                "1": prior_period_start.isoformat(),
+                "2": prior_period_end.isoformat(),
+                "3": current_period_start.isoformat(),
+                "4": current_period_end.isoformat()
+            }
             
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            starting_arr = 100000.0
-            expansion = 20000.0
-            contraction = 5000.0
-            churn = 10000.0
+            if USE_REAL_DB:
+                rows = await _execute_sql(query, params)
+                starting_arr = _first_value(rows, "starting_arr")
+                expansion = _first_value(rows, "expansion")
+                contraction = _first_value(rows, "contraction")
+                churn = _first_value(rows, "churn")
+            else:
+                # For now, we'll use placeholder values
+                starting_arr = 100000.0
+                expansion = 20000.0
+                contraction = 5000.0
+                churn = 10000.0
             
             # Calculate NRR
-            nrr = ((starting_arr + expansion - contraction - churn) / starting_arr * 100) if starting_arr > 0 else 0
+            nrr = float(nrr_batch(starting_arr, expansion, contraction, churn)[0])
             
             return nrr
         
@@ -394,7 +514,7 @@ def calculate_nrr() -> float:
             handle_error(f"Failed to calculate Net Revenue Retention: {str(e)}", "operational_metrics")
             raise RuntimeError(f"Failed to calculate Net Revenue Retention: {str(e)}")
 
-def calculate_technician_utilization() -> float:
+async def calculate_technician_utilization() -> float:
     """
     Calculate Technician Utilization Rate.
     
@@ -408,26 +528,30 @@ def calculate_technician_utilization() -> float:
         - Use in workforce planning
         - Include in productivity analysis
     """
-    with Spinner("Technician Utilization"):
+    with maybe_spinner("Technician Utilization"):
         try:
             # Note: This assumes there's a table for tracking technician hours
             # SQL query to get billable and available hours
             query = """
             SELECT 
                 SUM(billable_hours) as total_billable_hours,
-                SUM(available_hours) as total_available_hours,
-                SUM(billable_hours) / NULLIF(SUM(available_hours), 0) * 100 as utilization_rate
+                SUM(available_hours) as total_available_hours
             FROM technician_hours
             WHERE work_date >= NOW() - INTERVAL '30 days'
             """
             
-            # TODO: Implement the actual database calls or integrate with time tracking system
-            # For now, we'll use placeholder values
-            billable_hours = 1250
-            available_hours = 1600
+            if USE_REAL_DB:
+                rows = await _execute_sql(query)
+                billable_hours = _first_value(rows, "total_billable_hours")
+                available_hours = _first_value(rows, "total_available_hours")
+            else:
+                # TODO: Integrate with time tracking system
+                # For now, we'll use placeholder values
+                billable_hours = 1250
+                available_hours = 1600
             
             # Calculate utilization rate
-            utilization_rate = (billable_hours / available_hours * 100) if available_hours > 0 else 0
+            utilization_rate = float(utilization_batch(billable_hours, available_hours)[0])
             
             return utilization_rate
         
@@ -435,7 +559,8 @@ def calculate_technician_utilization() -> float:
             handle_error(f"Failed to calculate Technician Utilization: {str(e)}", "operational_metrics")
             raise RuntimeError(f"Failed to calculate Technician Utilization: {str(e)}")
 
-def calculate_equipment_roi() -> Dict[str, float]:
+@ttl_cache(AGGREGATE_CACHE_TTL_SECONDS, copy_results=True)
+async def calculate_equipment_roi() -> Dict[str, float]:
     """
     Calculate Equipment ROI.
     
@@ -449,7 +574,7 @@ def calculate_equipment_roi() -> Dict[str, float]:
         - Use in equipment purchase decisions
         - Include in capital expenditure planning
     """
-    with Spinner("Equipment ROI"):
+    with maybe_spinner("Equipment ROI"):
         try:
             # Note: This assumes there's a table for tracking equipment
             # SQL query to get equipment revenue, costs, and investment
@@ -459,8 +584,7 @@ def calculate_equipment_roi() -> Dict[str, float]:
                 e.name as equipment_name,
                 SUM(p.total_revenue * e.usage_percentage / 100) as annual_revenue,
                 SUM(e.maintenance_cost + e.depreciation) as annual_costs,
-                e.purchase_price as equipment_investment,
-                (SUM(p.total_revenue * e.usage_percentage / 100) - SUM(e.maintenance_cost + e.depreciation)) / NULLIF(e.purchase_price, 0) as roi
+                e.purchase_price as equipment_investment
             FROM equipment e
             JOIN equipment_usage eu ON e.id = eu.equipment_id
             JOIN projects p ON eu.project_id = p.id
@@ -468,15 +592,30 @@ def calculate_equipment_roi() -> Dict[str, float]:
             GROUP BY e.id, e.name, e.purchase_price
             """
             
-            # TODO: Implement the actual database calls or integrate with asset management system
-            # For now, we'll use placeholder values
-            overall_roi = 1.75  # 175% ROI
-            equipment_roi = {
-                "Water Extractors": 2.1,
-                "Dehumidifiers": 1.9,
-                "Air Movers": 1.6,
-                "Thermal Imaging Cameras": 1.2
-            }
+            if USE_REAL_DB:
+                columns = await _execute_sql_columnar(query)
+                
+                # Compute ROI for every piece of equipment in one vectorised pass
+                names = columns.get("equipment_name", _EMPTY_COLUMN).tolist()
+                revenue = np.nan_to_num(columns.get("annual_revenue", _EMPTY_COLUMN))
+                costs = np.nan_to_num(columns.get("annual_costs", _EMPTY_COLUMN))
+                investment = np.nan_to_num(columns.get("equipment_investment", _EMPTY_COLUMN))
+                
+                net_return = revenue - costs
+                roi = np.divide(net_return, investment, out=np.zeros_like(net_return), where=investment != 0)
+                
+                equipment_roi = dict(zip(names, roi.tolist()))
+                overall_roi = safe_divide(float(net_return.sum()), float(investment.sum()))
+            else:
+                # TODO: Integrate with asset management system
+                # For now, we'll use placeholder values
+                overall_roi = 1.75  # 175% ROI
+                equipment_roi = {
+                    "Water Extractors": 2.1,
+                    "Dehumidifiers": 1.9,
+                    "Air Movers": 1.6,
+                    "Thermal Imaging Cameras": 1.2
+                }
             
             # Combine results
             result = {"overall": overall_roi}
@@ -488,7 +627,7 @@ def calculate_equipment_roi() -> Dict[str, float]:
             handle_error(f"Failed to calculate Equipment ROI: {str(e)}", "operational_metrics")
             raise RuntimeError(f"Failed to calculate Equipment ROI: {str(e)}")
 
-def calculate_first_time_fix_rate() -> float:
+async def calculate_first_time_fix_rate() -> float:
     """
     Calculate First-Time Fix Rate.
     
@@ -502,30 +641,96 @@ def calculate_first_time_fix_rate() -> float:
         - Use in training and process improvement
         - Include in customer satisfaction analysis
     """
-    with Spinner("First-Time Fix Rate"):
+    with maybe_spinner("First-Time Fix Rate"):
         try:
             # Note: This assumes there's tracking for visit counts
             # SQL query to get first-time fix stats
             query = """
             SELECT 
-                COUNT(CASE WHEN visit_count = 1 THEN 1 END) as single_visit_jobs,
-                COUNT(*) as total_jobs,
-                COUNT(CASE WHEN visit_count = 1 THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as first_time_fix_rate
+                COUNT(*) FILTER (WHERE visit_count = 1) as single_visit_jobs,
+                COUNT(*) as total_jobs
             FROM projects
             WHERE status = 'completed'
             AND updated_at >= NOW() - INTERVAL '90 days'
             """
             
-            # TODO: Implement the actual database calls or integrate with job tracking system
-            # For now, we'll use placeholder values
-            single_visit_jobs = 42
-            total_jobs = 50
+            if USE_REAL_DB:
+                rows = await _execute_sql(query)
+                single_visit_jobs = _first_value(rows, "single_visit_jobs")
+                total_jobs = _first_value(rows, "total_jobs")
+            else:
+                # TODO: Integrate with job tracking system
+                # For now, we'll use placeholder values
+                single_visit_jobs = 42
+                total_jobs = 50
             
             # Calculate first-time fix rate
-            first_time_fix_rate = (single_visit_jobs / total_jobs * 100) if total_jobs > 0 else 0
+            first_time_fix_rate = _percentage(single_visit_jobs, total_jobs)
             
             return first_time_fix_rate
         
         except Exception as e:
             handle_error(f"Failed to calculate First-Time Fix Rate: {str(e)}", "operational_metrics")
-            raise RuntimeError(f"Failed to calculate First-Time Fix Rate: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Failed to calculate First-Time Fix Rate: {str(e)}")
+
+async def compute_all_operational_metrics(period: str = 'month') -> Dict[str, Any]:
+    """
+    Calculate every operational metric concurrently.
+    
+    All metric queries are awaited together with asyncio.gather, so a full dashboard
+    refresh takes as long as the slowest query rather than the sum of all of them.
+    RPC responses are cached for RPC_CACHE_TTL_SECONDS, so repeated refreshes inside
+    that window do not hit the database.
+    
+    Args:
+        period: Time period for the period-based metrics ('month', 'quarter', 'year').
+               Defaults to 'month'.
+        
+    Returns:
+        Dictionary with each metric keyed by name.
+        
+    Integration:
+        - Add to operational dashboard as the single data source
+        - Use in scheduled KPI snapshots
+    """
+    with Spinner("All Operational Metrics"):
+        try:
+            # One spinner for the whole refresh; the per-metric ones would overlap
+            with suppress_spinners():
+                (
+                    rpj,
+                    job_completion_rate,
+                    adc,
+                    cac_by_channel,
+                    clv,
+                    nrr,
+                    technician_utilization,
+                    equipment_roi,
+                    first_time_fix_rate
+                ) = await asyncio.gather(
+                    calculate_rpj(period=period),
+                    calculate_job_completion_rate(period),
+                    calculate_adc(period),
+                    calculate_cac_by_channel(),
+                    calculate_clv(),
+                    calculate_nrr(),
+                    calculate_technician_utilization(),
+                    calculate_equipment_roi(),
+                    calculate_first_time_fix_rate()
+                )
+            
+            return {
+                "rpj": rpj,
+                "job_completion_rate": job_completion_rate,
+                "adc": adc,
+                "cac_by_channel": cac_by_channel,
+                "clv": clv,
+                "nrr": nrr,
+                "technician_utilization": technician_utilization,
+                "equipment_roi": equipment_roi,
+                "first_time_fix_rate": first_time_fix_rate
+            }
+        
+        except Exception as e:
+            handle_error(f"Failed to compute operational metrics: {str(e)}", "operational_metrics")
+            raise RuntimeError(f"Failed to compute operational metrics: {str(e)}")
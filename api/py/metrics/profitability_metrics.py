@@ -7,14 +7,20 @@ Phase 3: Profitability & Margin Optimization (90-365 Days)
 
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-import json
+import asyncio
+import orjson
 import os
-import httpx
 import numpy as np
 from dotenv import load_dotenv
 
 # Import utils for consistent error handling
-from ..utils import handle_error, Spinner, safe_divide
+from ..utils import handle_error, Spinner, maybe_spinner, safe_divide, ttl_cache, USE_REAL_DB
+
+# Shared pooled HTTP client for Supabase calls
+from ..db.client import get_client, service_role_headers, SQL_RPC_FUNCTIONS
+from ..db.batch import SqlBatcher
+from ..db.pool import get_pool
+from ._kernels import labor_efficiency_batch
 
 # Load environment variables
 load_dotenv()
@@ -23,31 +29,125 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# RPC URL prefix and request headers are fixed for the life of the process
+_RPC_BASE = f"{SUPABASE_URL}/rest/v1/rpc/"
+_HEADERS = {
+    "apikey": SUPABASE_ANON_KEY,
+    "Content-Type": "application/json",
+    "Prefer": "return=representation"
+}
+# The SQL-executing RPCs are granted to service_role only
+_SERVICE_HEADERS = service_role_headers(_HEADERS)
+
+# The 90/365-day profitability aggregates change at most daily, so results are
+# reused for this long
+METRIC_CACHE_TTL_SECONDS = 900
+
+# Number of distinct jobs whose profitability is kept in cache
+JOB_CACHE_MAXSIZE = 4096
+
+def _compact_sql(query: str) -> str:
+    """Collapse a query's whitespace once at import, so every call sends identical, compact text"""
+    return " ".join(query.split())
+
 async def _call_supabase_rpc(function_name: str, params: Dict = None) -> Any:
     """Call a Supabase RPC function asynchronously"""
     if not SUPABASE_URL or not SUPABASE_ANON_KEY:
         raise RuntimeError("Supabase credentials not configured")
+    headers = _HEADERS
+    if function_name in SQL_RPC_FUNCTIONS:
+        if _SERVICE_HEADERS is None:
+            raise RuntimeError("Supabase service role key not configured")
+        headers = _SERVICE_HEADERS
     
-    url = f"{SUPABASE_URL}/rest/v1/rpc/{function_name}"
-    headers = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Content-Type": "application/json",
-        "Prefer": "return=representation"
-    }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=params or {}, headers=headers)
-        if response.status_code >= 400:
-            handle_error(f"API error: {response.text}", "profitability_metrics")
-            raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
-        return response.json()
-
-async def _execute_sql(query: str, params: Dict = None) -> List[Dict]:
-    """Execute a SQL query against Supabase"""
-    result = await _call_supabase_rpc("execute_sql", {"query": query, "params": params or {}})
+    client = await get_client()
+    response = await client.post(_RPC_BASE + function_name, content=orjson.dumps(params or {}), headers=headers)
+    if response.status_code >= 400:
+        handle_error(f"API error: {response.text}", "profitability_metrics")
+        raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
+    return orjson.loads(response.content)
+
+async def _batched_execute_sql(queries: List[Tuple[str, Dict]]) -> List[List[Dict]]:
+    """Execute several SQL queries in one execute_sql_batch RPC, returning one result set per query"""
+    result = await _call_supabase_rpc("execute_sql_batch", {
+        "queries": [{"query": query, "params": params} for query, params in queries]
+    })
     return result
 
-def calculate_gross_margin_by_service_line() -> Dict[str, float]:
+# Queries issued within a few milliseconds of each other share one RPC round-trip
+_SQL_BATCHER = SqlBatcher(_batched_execute_sql)
+
+async def _batched_execute_sql_one(query: str, params: Dict = None) -> List[Dict]:
+    """Execute a SQL query, coalesced with any other queries issued at the same time"""
+    return await _SQL_BATCHER.submit(query, params)
+
+async def _execute_sql(query: str, *args) -> List[Any]:
+    """
+    Execute a SQL query with positional $1, $2, ... arguments
+    
+    Goes straight to Postgres through the asyncpg pool when SUPABASE_DB_URL is
+    configured, returning asyncpg Records. Otherwise falls back to the batched
+    Supabase RPC, returning dictionaries. Both support row["column"] access.
+    
+    Arguments are always bound as parameters, never formatted into the query
+    text, so each query keeps one cached plan no matter which values it runs with.
+    """
+    pool = await get_pool()
+    if pool is not None:
+        async with pool.acquire() as conn:
+            return await conn.fetch(query, *args)
+    
+    return await _batched_execute_sql_one(query, {str(i): _rpc_param(arg) for i, arg in enumerate(args, 1)})
+
+async def _execute_sql_columnar(query: str, *args, schema: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Execute a SQL query and return the columns named in schema as NumPy arrays
+    
+    Each column is read straight out of the result rows with its own dtype, so
+    callers work on one array per column rather than a dictionary per row. NULLs
+    become nan in float columns; text columns use dtype=object.
+    """
+    rows = await _execute_sql(query, *args)
+    return {column: _to_column(rows, column, dtype) for column, dtype in schema.items()}
+
+def _to_column(rows: List[Any], column: str, dtype: Any) -> np.ndarray:
+    """Extract one column of a result set as an array of the given dtype"""
+    if dtype is object:
+        return np.array([row[column] for row in rows], dtype=object)
+    return np.fromiter(
+        (np.nan if row[column] is None else row[column] for row in rows),
+        dtype=dtype,
+        count=len(rows)
+    )
+
+def _rpc_param(value: Any) -> Any:
+    """Encode a bound argument for the RPC path; lists become Postgres array literals"""
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join(_array_element(item) for item in value) + "}"
+    return value
+
+def _array_element(item: Any) -> str:
+    """Quote one element of a Postgres array literal so commas, braces and quotes stay inside it"""
+    if item is None:
+        return "NULL"
+    escaped = str(item).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+# Gross margin by service line (job type) is precomputed nightly in a
+# materialized view (see migrations/006_add_mv_gross_margin_by_service_line.sql)
+GROSS_MARGIN_BY_SERVICE_LINE_SQL = _compact_sql("""
+SELECT 
+    service_line,
+    revenue,
+    direct_costs,
+    gross_profit,
+    gross_margin_pct
+FROM mv_gross_margin_by_service_line
+ORDER BY gross_margin_pct DESC
+""")
+
+@ttl_cache(METRIC_CACHE_TTL_SECONDS, copy_results=True)
+async def calculate_gross_margin_by_service_line() -> Dict[str, float]:
     """
     Calculate Gross Margin by Service Line.
     
@@ -61,24 +161,25 @@ def calculate_gross_margin_by_service_line() -> Dict[str, float]:
         - Use in service line optimization
         - Include in pricing strategy
     """
-    with Spinner("Gross Margin by Service Line"):
+    async with maybe_spinner("Gross Margin by Service Line"):
         try:
-            # SQL query to calculate gross margin by service line (job type)
-            query = """
-            SELECT 
-                job_type as service_line,
-                SUM(total_revenue) as revenue,
-                SUM(total_expenses) as direct_costs,
-                SUM(total_revenue - total_expenses - allocated_lead_cost) as gross_profit,
-                (SUM(total_revenue - total_expenses - allocated_lead_cost) / NULLIF(SUM(total_revenue), 0)) * 100 as gross_margin_pct
-            FROM projects
-            WHERE status = 'completed'
-            AND updated_at >= NOW() - INTERVAL '365 days'
-            GROUP BY job_type
-            ORDER BY gross_margin_pct DESC
-            """
+            if USE_REAL_DB:
+                columns = await _execute_sql_columnar(GROSS_MARGIN_BY_SERVICE_LINE_SQL, schema={
+                    "service_line": object,
+                    "revenue": np.float64,
+                    "gross_profit": np.float64,
+                    "gross_margin_pct": np.float64
+                })
+                result = dict(zip(
+                    columns["service_line"].tolist(),
+                    np.nan_to_num(columns["gross_margin_pct"]).tolist()
+                ))
+                result["overall"] = safe_divide(
+                    float(np.nansum(columns["gross_profit"])),
+                    float(np.nansum(columns["revenue"]))
+                ) * 100
+                return result
             
-            # TODO: Implement the actual database calls
             # For now, we'll return placeholder values
             return {
                 "water": 42.5,
@@ -92,7 +193,30 @@ def calculate_gross_margin_by_service_line() -> Dict[str, float]:
             handle_error(f"Failed to calculate Gross Margin by Service Line: {str(e)}", "profitability_metrics")
             raise RuntimeError(f"Failed to calculate Gross Margin by Service Line: {str(e)}")
 
-def calculate_job_level_profitability(job_id: int) -> Dict[str, float]:
+# Job details with every expense category summed in one pass over the jobs'
+# expenses. The job ids are always bound as the $1 array, so the query text never
+# changes and its plan stays in the server and asyncpg statement caches
+PREPARED_JOB_PROFITABILITY_SQL = _compact_sql("""
+SELECT 
+    p.id as job_id,
+    p.name as job_name,
+    p.total_revenue as revenue,
+    SUM(e.amount) FILTER (WHERE e.category = 'labor') as labor_cost,
+    SUM(e.amount) FILTER (WHERE e.category = 'materials') as materials_cost,
+    SUM(e.amount) FILTER (WHERE e.category = 'equipment') as equipment_cost,
+    SUM(e.amount) FILTER (WHERE e.category = 'overhead') as overhead_cost,
+    p.allocated_lead_cost as lead_cost,
+    p.total_expenses as total_direct_costs,
+    p.total_revenue - p.total_expenses - p.allocated_lead_cost as gross_profit,
+    (p.total_revenue - p.total_expenses - p.allocated_lead_cost) / NULLIF(p.total_revenue, 0) * 100 as gross_margin_pct
+FROM projects p
+LEFT JOIN expenses e ON e.project_id = p.id
+WHERE p.id = ANY($1::bigint[])
+GROUP BY p.id
+""")
+
+@ttl_cache(METRIC_CACHE_TTL_SECONDS, maxsize=JOB_CACHE_MAXSIZE, copy_results=True)
+async def calculate_job_level_profitability(job_id: int) -> Dict[str, float]:
     """
     Calculate Job-Level Profitability.
     
@@ -109,43 +233,14 @@ def calculate_job_level_profitability(job_id: int) -> Dict[str, float]:
         - Use in job costing analysis
         - Include in crew performance evaluation
     """
-    with Spinner(f"Job Profitability - Job #{job_id}"):
+    async with maybe_spinner(f"Job Profitability - Job #{job_id}"):
         try:
-            # SQL query to get job details
-            query = f"""
-            SELECT 
-                p.id as job_id,
-                p.name as job_name,
-                p.total_revenue as revenue,
-                (
-                    SELECT SUM(amount) 
-                    FROM expenses 
-                    WHERE project_id = p.id AND category = 'labor'
-                ) as labor_cost,
-                (
-                    SELECT SUM(amount) 
-                    FROM expenses 
-                    WHERE project_id = p.id AND category = 'materials'
-                ) as materials_cost,
-                (
-                    SELECT SUM(amount) 
-                    FROM expenses 
-                    WHERE project_id = p.id AND category = 'equipment'
-                ) as equipment_cost,
-                (
-                    SELECT SUM(amount) 
-                    FROM expenses 
-                    WHERE project_id = p.id AND category = 'overhead'
-                ) as overhead_cost,
-                p.allocated_lead_cost as lead_cost,
-                p.total_expenses as total_direct_costs,
-                p.total_revenue - p.total_expenses - p.allocated_lead_cost as gross_profit,
-                (p.total_revenue - p.total_expenses - p.allocated_lead_cost) / NULLIF(p.total_revenue, 0) * 100 as gross_margin_pct
-            FROM projects p
-            WHERE p.id = {job_id}
-            """
+            if USE_REAL_DB:
+                result = (await calculate_job_level_profitability_bulk([job_id])).get(job_id)
+                if result is None:
+                    raise ValueError(f"Job {job_id} not found")
+                return result
             
-            # TODO: Implement the actual database calls
             # For now, we'll return placeholder values
             return {
                 "job_id": job_id,
@@ -165,7 +260,70 @@ def calculate_job_level_profitability(job_id: int) -> Dict[str, float]:
             handle_error(f"Failed to calculate Job-Level Profitability for job {job_id}: {str(e)}", "profitability_metrics")
             raise RuntimeError(f"Failed to calculate Job-Level Profitability: {str(e)}")
 
-def calculate_labor_efficiency_ratio() -> Dict[str, float]:
+async def calculate_job_level_profitability_bulk(job_ids: List[int]) -> Dict[int, Dict[str, float]]:
+    """
+    Calculate Job-Level Profitability for many jobs in one query.
+    
+    Formula: Job Revenue - (Labor + Materials + Equipment + Overhead Allocation)
+    
+    Args:
+        job_ids: The IDs of the jobs/projects to analyze.
+        
+    Returns:
+        Dictionary of profitability metrics keyed by job ID. Jobs that do not
+        exist are left out.
+        
+    Integration:
+        - Add to project management dashboard "top jobs" views
+        - Use in job costing analysis across crews
+    """
+    async with maybe_spinner(f"Job Profitability - {len(job_ids)} jobs"):
+        try:
+            if USE_REAL_DB:
+                rows = await _execute_sql(PREPARED_JOB_PROFITABILITY_SQL, list(job_ids))
+                return {row["job_id"]: dict(row) for row in rows}
+            
+            # For now, we'll return placeholder values via the single-job path
+            results = await asyncio.gather(*(calculate_job_level_profitability(job_id) for job_id in job_ids))
+            return dict(zip(job_ids, results))
+        
+        except Exception as e:
+            handle_error(f"Failed to calculate Job-Level Profitability for {len(job_ids)} jobs: {str(e)}", "profitability_metrics")
+            raise RuntimeError(f"Failed to calculate Job-Level Profitability: {str(e)}")
+
+# Revenue, labor cost and labor hours of jobs completed in the last 90 days, per
+# job type and overall
+LABOR_EFFICIENCY_SQL = _compact_sql("""
+WITH job_metrics AS (
+    SELECT 
+        p.id as job_id,
+        p.job_type,
+        p.total_revenue as revenue,
+        (
+            SELECT SUM(amount) 
+            FROM expenses 
+            WHERE project_id = p.id AND category = 'labor'
+        ) as labor_cost,
+        (
+            SELECT SUM(hours) 
+            FROM labor_hours 
+            WHERE project_id = p.id
+        ) as labor_hours
+    FROM projects p
+    WHERE p.status = 'completed'
+    AND p.updated_at >= NOW() - INTERVAL '90 days'
+)
+SELECT 
+    CASE WHEN GROUPING(job_type) = 1 THEN 'overall' ELSE job_type END as job_type,
+    COALESCE(SUM(revenue), 0) as revenue,
+    COALESCE(SUM(labor_cost), 0) as labor_cost,
+    COALESCE(SUM(labor_hours), 0) as labor_hours
+FROM job_metrics
+GROUP BY GROUPING SETS ((job_type), ())
+""")
+
+@ttl_cache(METRIC_CACHE_TTL_SECONDS, copy_results=True)
+async def calculate_labor_efficiency_ratio() -> Dict[str, float]:
     """
     Calculate Labor Efficiency Ratio.
     
@@ -179,49 +337,31 @@ def calculate_labor_efficiency_ratio() -> Dict[str, float]:
         - Use in labor cost optimization
         - Include in crew training and performance improvement
     """
-    with Spinner("Labor Efficiency Ratio"):
+    async with maybe_spinner("Labor Efficiency Ratio"):
         try:
-            # This calculation requires data about labor hours and costs
-            # SQL query to calculate labor efficiency
-            query = """
-            WITH job_metrics AS (
-                SELECT 
-                    p.id as job_id,
-                    p.job_type,
-                    p.total_revenue as revenue,
-                    (
-                        SELECT SUM(amount) 
-                        FROM expenses 
-                        WHERE project_id = p.id AND category = 'labor'
-                    ) as labor_cost,
-                    (
-                        SELECT SUM(hours) 
-                        FROM labor_hours 
-                        WHERE project_id = p.id
-                    ) as labor_hours
-                FROM projects p
-                WHERE p.status = 'completed'
-                AND p.updated_at >= NOW() - INTERVAL '90 days'
-            )
-            SELECT 
-                job_type,
-                SUM(revenue) / NULLIF(SUM(labor_hours), 0) as revenue_per_labor_hour,
-                SUM(labor_cost) / NULLIF(SUM(labor_hours), 0) as labor_cost_per_hour,
-                (SUM(revenue) / NULLIF(SUM(labor_hours), 0)) / NULLIF(SUM(labor_cost) / NULLIF(SUM(labor_hours), 0), 0) as labor_efficiency_ratio
-            FROM job_metrics
-            GROUP BY job_type
-            
-            UNION ALL
-            
-            SELECT 
-                'overall' as job_type,
-                SUM(revenue) / NULLIF(SUM(labor_hours), 0) as revenue_per_labor_hour,
-                SUM(labor_cost) / NULLIF(SUM(labor_hours), 0) as labor_cost_per_hour,
-                (SUM(revenue) / NULLIF(SUM(labor_hours), 0)) / NULLIF(SUM(labor_cost) / NULLIF(SUM(labor_hours), 0), 0) as labor_efficiency_ratio
-            FROM job_metrics
-            """
+            if USE_REAL_DB:
+                columns = await _execute_sql_columnar(LABOR_EFFICIENCY_SQL, schema={
+                    "job_type": object,
+                    "revenue": np.float64,
+                    "labor_cost": np.float64,
+                    "labor_hours": np.float64
+                })
+                # Only the sums come back from Postgres; the ratios for every job
+                # type are computed in one vectorised pass
+                ratio, revenue_per_hour, cost_per_hour = labor_efficiency_batch(
+                    columns["revenue"], columns["labor_cost"], columns["labor_hours"]
+                )
+                return {
+                    job_type: {
+                        "ratio": job_ratio,
+                        "revenue_per_hour": job_revenue_per_hour,
+                        "cost_per_hour": job_cost_per_hour
+                    }
+                    for job_type, job_ratio, job_revenue_per_hour, job_cost_per_hour in zip(
+                        columns["job_type"].tolist(), ratio.tolist(), revenue_per_hour.tolist(), cost_per_hour.tolist()
+                    )
+                }
             
-            # TODO: Implement the actual database calls
             # For now, we'll return placeholder values
             return {
                 "overall": {
@@ -250,7 +390,39 @@ def calculate_labor_efficiency_ratio() -> Dict[str, float]:
             handle_error(f"Failed to calculate Labor Efficiency Ratio: {str(e)}", "profitability_metrics")
             raise RuntimeError(f"Failed to calculate Labor Efficiency Ratio: {str(e)}")
 
-def calculate_inventory_turnover() -> float:
+# Materials COGS over the last 365 days divided by the average of the opening and
+# closing inventory snapshot values
+INVENTORY_TURNOVER_SQL = _compact_sql("""
+WITH material_cogs AS (
+    SELECT 
+        SUM(amount) as total_cogs
+    FROM expenses
+    WHERE category = 'materials'
+    AND created_at >= NOW() - INTERVAL '365 days'
+),
+inventory_values AS (
+    SELECT 
+        AVG(total_value) as avg_inventory_value
+    FROM (
+        SELECT 
+            SUM(quantity * unit_cost) as total_value,
+            snapshot_date
+        FROM inventory_snapshots
+        WHERE snapshot_date IN (
+            (NOW() - INTERVAL '365 days')::date,
+            NOW()::date
+        )
+        GROUP BY snapshot_date
+    ) as inventory_snapshots
+)
+SELECT 
+    m.total_cogs / NULLIF(i.avg_inventory_value, 0) as inventory_turnover
+FROM material_cogs m
+CROSS JOIN inventory_values i
+""")
+
+@ttl_cache(METRIC_CACHE_TTL_SECONDS)
+async def calculate_inventory_turnover() -> float:
     """
     Calculate Inventory Turnover.
     
@@ -264,43 +436,12 @@ def calculate_inventory_turnover() -> float:
         - Use in purchasing and stock level decisions
         - Include in cash flow optimization
     """
-    with Spinner("Inventory Turnover"):
+    async with maybe_spinner("Inventory Turnover"):
         try:
-            # This calculation requires inventory data
-            # SQL query to calculate inventory turnover
-            query = """
-            -- Get COGS from completed projects (using materials expenses)
-            WITH material_cogs AS (
-                SELECT 
-                    SUM(amount) as total_cogs
-                FROM expenses
-                WHERE category = 'materials'
-                AND created_at >= NOW() - INTERVAL '365 days'
-            ),
-            -- Get average inventory value (beginning and ending for the period)
-            inventory_values AS (
-                SELECT 
-                    AVG(total_value) as avg_inventory_value
-                FROM (
-                    SELECT 
-                        SUM(quantity * unit_cost) as total_value,
-                        snapshot_date
-                    FROM inventory_snapshots
-                    WHERE snapshot_date IN (
-                        (NOW() - INTERVAL '365 days')::date,
-                        NOW()::date
-                    )
-                    GROUP BY snapshot_date
-                ) as inventory_snapshots
-            )
-            -- Calculate turnover
-            SELECT 
-                m.total_cogs / NULLIF(i.avg_inventory_value, 0) as inventory_turnover
-            FROM material_cogs m
-            CROSS JOIN inventory_values i
-            """
+            if USE_REAL_DB:
+                rows = await _execute_sql(INVENTORY_TURNOVER_SQL)
+                return (rows[0]["inventory_turnover"] if rows else None) or 0.0
             
-            # TODO: Implement the actual database calls
             # For now, we'll return a placeholder value
             return 8.5  # Inventory turns over 8.5 times per year
         
@@ -308,7 +449,31 @@ def calculate_inventory_turnover() -> float:
             handle_error(f"Failed to calculate Inventory Turnover: {str(e)}", "profitability_metrics")
             raise RuntimeError(f"Failed to calculate Inventory Turnover: {str(e)}")
 
-def calculate_ap_leverage() -> Dict[str, float]:
+# Average days to pay each vendor and overall, with the leverage against the
+# industry standard ($1) computed next to the data
+AP_LEVERAGE_SQL = _compact_sql("""
+SELECT 
+    v.name as vendor_name,
+    AVG(EXTRACT(DAY FROM (e.paid_date - e.due_date))) as avg_payment_period,
+    AVG(EXTRACT(DAY FROM (e.paid_date - e.due_date))) / $1::float8 as leverage
+FROM expenses e
+JOIN vendors v ON e.vendor_id = v.id
+WHERE e.status = 'paid'
+AND e.paid_date >= NOW() - INTERVAL '90 days'
+GROUP BY v.name
+
+UNION ALL
+
+SELECT 
+    'overall' as vendor_name,
+    AVG(EXTRACT(DAY FROM (e.paid_date - e.due_date))) as avg_payment_period,
+    AVG(EXTRACT(DAY FROM (e.paid_date - e.due_date))) / $1::float8 as leverage
+FROM expenses e
+WHERE e.status = 'paid'
+AND e.paid_date >= NOW() - INTERVAL '90 days'
+""")
+
+async def calculate_ap_leverage() -> Dict[str, float]:
     """
     Calculate Accounts Payable Leverage.
     
@@ -322,46 +487,33 @@ def calculate_ap_leverage() -> Dict[str, float]:
         - Use in cash flow management
         - Include in vendor relationship strategy
     """
-    with Spinner("AP Leverage"):
+    async with maybe_spinner("AP Leverage"):
         try:
-            # Calculate average days to pay vendors
-            query = """
-            SELECT 
-                AVG(EXTRACT(DAY FROM (e.paid_date - e.due_date))) as avg_payment_period,
-                v.name as vendor_name
-            FROM expenses e
-            JOIN vendors v ON e.vendor_id = v.id
-            WHERE e.status = 'paid'
-            AND e.paid_date >= NOW() - INTERVAL '90 days'
-            GROUP BY v.name
-            
-            UNION ALL
-            
-            SELECT 
-                AVG(EXTRACT(DAY FROM (e.paid_date - e.due_date))) as avg_payment_period,
-                'overall' as vendor_name
-            FROM expenses e
-            WHERE e.status = 'paid'
-            AND e.paid_date >= NOW() - INTERVAL '90 days'
-            """
-            
-            # TODO: Implement the actual database calls
             # Industry standard payment period (typically 30 days)
             industry_standard = 30.0
             
-            # For now, we'll return placeholder values
-            avg_payment_periods = {
-                "overall": 38.5,
-                "Premier Contractors": 42.0,
-                "Quality Materials Inc": 35.0,
-                "Rapid Response Services": 28.0
-            }
-            
-            # Calculate AP leverage (ratio of actual to industry standard)
-            ap_leverage = {
-                vendor: period / industry_standard
-                for vendor, period in avg_payment_periods.items()
-            }
+            if USE_REAL_DB:
+                columns = await _execute_sql_columnar(AP_LEVERAGE_SQL, industry_standard, schema={
+                    "vendor_name": object,
+                    "avg_payment_period": np.float64,
+                    "leverage": np.float64
+                })
+                vendor_names = columns["vendor_name"].tolist()
+                avg_payment_periods = dict(zip(vendor_names, np.nan_to_num(columns["avg_payment_period"]).tolist()))
+                ap_leverage = dict(zip(vendor_names, np.nan_to_num(columns["leverage"]).tolist()))
+            else:
+                # For now, we'll use placeholder values
+                avg_payment_periods = {
+                    "overall": 38.5,
+                    "Premier Contractors": 42.0,
+                    "Quality Materials Inc": 35.0,
+                    "Rapid Response Services": 28.0
+                }
+                
+                # Calculate AP leverage (ratio of actual to industry standard) for all
+                # vendors with a single array divide
+                periods = np.fromiter(avg_payment_periods.values(), dtype=np.float64, count=len(avg_payment_periods))
+                ap_leverage = dict(zip(avg_payment_periods.keys(), (periods / industry_standard).tolist()))
             
             # Add additional context
             result = {
@@ -374,4 +526,45 @@ def calculate_ap_leverage() -> Dict[str, float]:
         
         except Exception as e:
             handle_error(f"Failed to calculate AP Leverage: {str(e)}", "profitability_metrics")
-            raise RuntimeError(f"Failed to calculate AP Leverage: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Failed to calculate AP Leverage: {str(e)}")
+
+async def refresh_profitability_dashboard(job_ids: List[int] = None) -> Dict[str, Any]:
+    """
+    Calculate every profitability metric concurrently.
+    
+    All metrics run as tasks in one TaskGroup, so a dashboard refresh takes as long
+    as the slowest metric rather than the sum of all of them. Their queries are also
+    issued together and therefore share batched RPC round-trips.
+    
+    Args:
+        job_ids: Jobs to include job-level profitability for. Defaults to none.
+        
+    Returns:
+        Dictionary with each metric keyed by name, and job-level results keyed by job ID.
+        
+    Integration:
+        - Add to financial dashboard as the single data source
+        - Use in scheduled KPI snapshots
+    """
+    async with Spinner("Profitability Dashboard"):
+        try:
+            async with asyncio.TaskGroup() as tg:
+                gross_margin = tg.create_task(calculate_gross_margin_by_service_line())
+                job_profitability = tg.create_task(calculate_job_level_profitability_bulk(job_ids or []))
+                labor_efficiency = tg.create_task(calculate_labor_efficiency_ratio())
+                inventory_turnover = tg.create_task(calculate_inventory_turnover())
+                ap_leverage = tg.create_task(calculate_ap_leverage())
+            
+            return {
+                "gross_margin_by_service_line": gross_margin.result(),
+                "job_profitability": job_profitability.result(),
+                "labor_efficiency_ratio": labor_efficiency.result(),
+                "inventory_turnover": inventory_turnover.result(),
+                "ap_leverage": ap_leverage.result()
+            }
+        
+        except* Exception as eg:
+            # Report the failed metrics' own errors, not the TaskGroup wrapper's summary
+            errors = "; ".join(str(e) for e in eg.exceptions)
+            handle_error(f"Failed to refresh profitability dashboard: {errors}", "profitability_metrics")
+            raise RuntimeError(f"Failed to refresh profitability dashboard: {errors}")
@@ -6,15 +6,28 @@ Phases 4-6: Scale Preparation, Scaling & Expansion, and Market Domination
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
-import json
+from typing import Dict, List, Any, Final, Optional, Tuple
+import asyncio
+import functools
+import hashlib
+import orjson
+import math
 import os
+import time
+import types
+from dataclasses import dataclass
 import httpx
 import numpy as np
 from dotenv import load_dotenv
+from prometheus_client import Counter, Histogram
 
 # Import utils for consistent error handling
-from ..utils import handle_error, Spinner, safe_divide
+from ..utils import handle_error, Spinner, maybe_spinner, suppress_spinners, safe_divide, ttl_cache, USE_REAL_DB
+
+# Shared pooled HTTP client for Supabase calls
+from ..db.client import get_client, service_role_headers, SQL_RPC_FUNCTIONS, MAX_KEEPALIVE_CONNECTIONS
+from ..db.batch import MetricBatch, current_batch
+from ._kernels import span_stats
 
 # Load environment variables
 load_dotenv()
@@ -23,33 +36,206 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# RPC endpoint prefix and request headers, built once and shared by every call
+_RPC_BASE = f"{SUPABASE_URL}/rest/v1/rpc/"
+_HEADERS = {
+    "apikey": SUPABASE_ANON_KEY,
+    "Content-Type": "application/json",
+    "Prefer": "return=representation"
+}
+# The SQL-executing RPCs are granted to service_role only
+_SERVICE_HEADERS = service_role_headers(_HEADERS)
+
+# Market, carrier, headcount and CAGR figures roll up 90-365 day windows, so they
+# are reused for an hour across dashboard refreshes and reports
+SCALING_CACHE_TTL_SECONDS = 3600
+SCALING_CACHE_MAXSIZE = 256
+
+# Cap on concurrent scaling metric RPCs. Defaults to the shared client's keep-alive
+# pool size so a large gather queues here instead of erroring on pool timeouts
+SCALING_METRICS_MAX_INFLIGHT = int(os.getenv("SCALING_METRICS_MAX_INFLIGHT", str(MAX_KEEPALIVE_CONNECTIONS)))
+_RPC_SEM = asyncio.Semaphore(SCALING_METRICS_MAX_INFLIGHT)
+
+# Pool checkout outcomes and latency of scaling metric RPCs, exported on /metrics so
+# the shared client's max_connections can be sized. Requests that are neither
+# acquired nor unacquired are still in flight
+RPC_REQUESTED = Counter(
+    "scaling_rpc_requested", "Scaling metric RPCs started", ["function_name"]
+)
+RPC_ACQUIRED = Counter(
+    "scaling_rpc_acquired", "Scaling metric RPCs that got a connection and a response", ["function_name"]
+)
+RPC_UNACQUIRED_ERROR = Counter(
+    "scaling_rpc_unacquired_error", "Scaling metric RPCs that failed on a pool timeout or transport error", ["function_name"]
+)
+RPC_UNACQUIRED_CANCELED = Counter(
+    "scaling_rpc_unacquired_canceled", "Scaling metric RPCs cancelled before getting a response", ["function_name"]
+)
+RPC_LATENCY = Histogram(
+    "scaling_rpc_latency_seconds", "Scaling metric RPC latency, including semaphore and pool wait", ["function_name"]
+)
+
+class _RpcGuard:
+    """Count one RPC as requested on entry, then by how it ended on exit"""
+    
+    def __init__(self, function_name: str):
+        self.function_name = function_name
+        self.started = 0.0
+    
+    def __enter__(self) -> "_RpcGuard":
+        RPC_REQUESTED.labels(self.function_name).inc()
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        if exc_type is None:
+            RPC_ACQUIRED.labels(self.function_name).inc()
+        elif issubclass(exc_type, asyncio.CancelledError):
+            RPC_UNACQUIRED_CANCELED.labels(self.function_name).inc()
+        elif issubclass(exc_type, httpx.TransportError):
+            # Includes httpx.PoolTimeout, raised when no pooled connection frees up
+            RPC_UNACQUIRED_ERROR.labels(self.function_name).inc()
+        RPC_LATENCY.labels(self.function_name).observe(time.perf_counter() - self.started)
+        return False
+
+# Seconds in an average (Julian) year of 365.25 days
+SECONDS_PER_YEAR = 31557600.0
+
+# Number of managers, largest teams first, listed in the management span details
+MANAGER_DETAIL_LIMIT = 20
+
+# Total addressable market by geography. Market size data would ideally come from
+# industry databases or reports, stored in a separate table or external API
+_MARKET_SIZES = types.MappingProxyType({
+    "Springfield": 35000000,      # $35M
+    "Shelbyville": 22000000,      # $22M
+    "Capital City": 85000000,     # $85M
+    "Illinois": 450000000,        # $450M
+    "Overall": 2500000000         # $2.5B
+})
+_DEFAULT_TAM = 50000000  # Default to $50M for geographies without market data
+
+# Placeholder active carrier relationships
+_PLACEHOLDER_CARRIERS = (
+    "State Farm", "Allstate", "GEICO", "Progressive", 
+    "Liberty Mutual", "Farmers", "Nationwide", "Travelers",
+    "American Family", "Erie Insurance", "USAA", "Hartford"
+)
+
+# Carriers without a relationship yet that are worth pursuing
+_TOP_CARRIER_OPPORTUNITIES = (
+    "Mercury Insurance", "Amica", "Auto-Owners Insurance"
+)
+
+@dataclass(slots=True)
+class DigitalConversion:
+    """Per-source digital lead counts and conversion rates held as parallel arrays"""
+    sources: List[str]
+    totals: np.ndarray
+    converted: np.ndarray
+    rates: np.ndarray
+    
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "DigitalConversion":
+        """Build from lead_source/total_leads/converted_leads rows with one vector divide"""
+        totals = np.fromiter((row["total_leads"] for row in rows), dtype=np.int32, count=len(rows))
+        converted = np.fromiter((row["converted_leads"] for row in rows), dtype=np.int32, count=len(rows))
+        rates = np.where(totals > 0, converted * (100.0 / np.maximum(totals, 1)), 0.0)
+        return cls([row["lead_source"] for row in rows], totals, converted, rates)
+    
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Convert to the per-source dictionary shape returned by the API"""
+        return {
+            source: {"total": int(total), "converted": int(converted), "rate": float(rate)}
+            for source, total, converted, rate in zip(
+                self.sources, self.totals.tolist(), self.converted.tolist(), self.rates.tolist()
+            )
+        }
+
 async def _call_supabase_rpc(function_name: str, params: Dict = None) -> Any:
     """Call a Supabase RPC function asynchronously"""
     if not SUPABASE_URL or not SUPABASE_ANON_KEY:
         raise RuntimeError("Supabase credentials not configured")
+    headers = _HEADERS
+    if function_name in SQL_RPC_FUNCTIONS:
+        if _SERVICE_HEADERS is None:
+            raise RuntimeError("Supabase service role key not configured")
+        headers = _SERVICE_HEADERS
     
-    url = f"{SUPABASE_URL}/rest/v1/rpc/{function_name}"
-    headers = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Content-Type": "application/json",
-        "Prefer": "return=representation"
-    }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=params or {}, headers=headers)
-        if response.status_code >= 400:
-            handle_error(f"API error: {response.text}", "scaling_metrics")
-            raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
-        return response.json()
+    client = await get_client()
+    with _RpcGuard(function_name):
+        async with _RPC_SEM:
+            response = await client.post(_RPC_BASE + function_name, content=orjson.dumps(params or {}), headers=headers)
+    if response.status_code >= 400:
+        handle_error("API error: %s", "scaling_metrics", response.text)
+        raise RuntimeError(f"Supabase RPC failed: {response.status_code}")
+    return orjson.loads(response.content)
+
+async def _batched_execute_sql(queries: List[Tuple[str, Dict]]) -> List[List[Dict]]:
+    """Execute several SQL queries in one execute_sql_batch RPC, returning one result set per query"""
+    result = await _call_supabase_rpc("execute_sql_batch", {
+        "queries": [{"query": query, "params": params} for query, params in queries]
+    })
+    return result
+
+@functools.lru_cache(maxsize=256)
+def _statement_name(query: str) -> str:
+    """Stable prepared statement name for a query text"""
+    return "stmt_" + hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
+
+@functools.lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO date string, reusing the result for repeated report anchors"""
+    return datetime.fromisoformat(value)
 
 async def _execute_sql(query: str, params: Dict = None) -> List[Dict]:
-    """Execute a SQL query against Supabase"""
-    result = await _call_supabase_rpc("execute_sql", {"query": query, "params": params or {}})
+    """
+    Execute a SQL query against Supabase as a prepared statement
+    
+    Queries use $1, $2, ... placeholders with params keyed "1", "2", ... The
+    exec_prepared RPC (see migrations/003_add_exec_prepared.sql) prepares each
+    distinct query once per session so Postgres can reuse its plan. Inside a
+    metric_batch() block the query is queued and sent together with the other
+    queries issued at the same time; otherwise it is sent on its own.
+    """
+    batch = current_batch()
+    if batch is not None:
+        return await batch.submit(query, params)
+    
+    result = await _call_supabase_rpc("exec_prepared", {
+        "statement_name": _statement_name(query),
+        "query": query,
+        "params": params or {}
+    })
     return result
 
+def _first_value(rows: List[Dict], key: str, default: Any = 0.0) -> Any:
+    """Read a column from the first row of a single-row aggregate query"""
+    if not rows or rows[0].get(key) is None:
+        return default
+    return rows[0][key]
+
+def metric_batch() -> MetricBatch:
+    """
+    Batch every scaling metric query issued in an ``async with`` block into shared
+    execute_sql_batch RPCs (see migrations/005_add_execute_sql_batch.sql)
+    """
+    return MetricBatch(_batched_execute_sql)
+
 # ---------------------- Phase 4: Scale Preparation (6-18 Months) ----------------------
 
-def calculate_market_share(geography: str) -> float:
+# Company revenue in a geography ($1) over the last 365 days
+MARKET_SHARE_SQL: Final[str] = """
+SELECT 
+    SUM(p.total_revenue) as company_revenue
+FROM projects p
+JOIN customers c ON p.customer_id = c.id
+WHERE c.geography = $1
+AND p.created_at >= NOW() - INTERVAL '365 days'
+"""
+
+@ttl_cache(SCALING_CACHE_TTL_SECONDS, maxsize=SCALING_CACHE_MAXSIZE)
+async def calculate_market_share(geography: str) -> float:
     """
     Calculate Market Share by Geography.
     
@@ -66,34 +252,17 @@ def calculate_market_share(geography: str) -> float:
         - Use in expansion planning
         - Include in investor reporting
     """
-    with Spinner("Market Share Calculation"):
+    async with maybe_spinner("Market Share Calculation"):
         try:
             # This requires market data, which might be sourced externally
-            # SQL query to get company revenue by geography
-            query = f"""
-            SELECT 
-                SUM(p.total_revenue) as company_revenue
-            FROM projects p
-            JOIN customers c ON p.customer_id = c.id
-            WHERE c.geography = '{geography}'
-            AND p.created_at >= NOW() - INTERVAL '365 days'
-            """
-            
-            # TODO: Implement the actual database calls and market size data integration
-            # For now, we'll use placeholder values
-            company_revenue = 5250000  # $5.25M annual revenue in the specified geography
-            
-            # Market size data would ideally come from industry databases or reports
-            # These would be stored in a separate table or external API
-            market_sizes = {
-                "Springfield": 35000000,      # $35M
-                "Shelbyville": 22000000,      # $22M
-                "Capital City": 85000000,     # $85M
-                "Illinois": 450000000,        # $450M
-                "Overall": 2500000000         # $2.5B
-            }
+            if USE_REAL_DB:
+                rows = await _execute_sql(MARKET_SHARE_SQL, {"1": geography})
+                company_revenue = float(_first_value(rows, "company_revenue"))
+            else:
+                # For now, we'll use placeholder values
+                company_revenue = 5250000  # $5.25M annual revenue in the specified geography
             
-            total_addressable_market = market_sizes.get(geography, 50000000)  # Default to $50M if not found
+            total_addressable_market = _MARKET_SIZES.get(geography, _DEFAULT_TAM)
             
             # Calculate market share
             market_share = (company_revenue / total_addressable_market * 100) if total_addressable_market > 0 else 0
@@ -101,10 +270,41 @@ def calculate_market_share(geography: str) -> float:
             return market_share
         
         except Exception as e:
-            handle_error(f"Failed to calculate Market Share for {geography}: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Market Share for %s: %s", "scaling_metrics", geography, e)
             raise RuntimeError(f"Failed to calculate Market Share: {str(e)}")
 
-def calculate_pipeline_velocity() -> float:
+# Lead and deal stats behind pipeline velocity over the last 90 days
+PIPELINE_VELOCITY_SQL: Final[str] = """
+WITH lead_stats AS (
+    SELECT 
+        COUNT(*) as total_opportunities,
+        COUNT(CASE WHEN status = 'converted' THEN 1 END) as won_opportunities,
+        COUNT(CASE WHEN status = 'converted' THEN 1 END) * 1.0 / NULLIF(COUNT(*), 0) as win_rate,
+        AVG(EXTRACT(DAY FROM (
+            CASE WHEN status = 'converted' AND converted_at IS NOT NULL 
+            THEN converted_at - created_at 
+            ELSE NULL END
+        ))) as avg_sales_cycle_days
+    FROM leads
+    WHERE created_at >= NOW() - INTERVAL '90 days'
+),
+project_stats AS (
+    SELECT 
+        AVG(total_revenue) as avg_deal_size
+    FROM projects
+    WHERE created_at >= NOW() - INTERVAL '90 days'
+)
+SELECT 
+    ls.total_opportunities,
+    ls.won_opportunities,
+    ls.win_rate,
+    ls.avg_sales_cycle_days,
+    ps.avg_deal_size,
+    (ls.total_opportunities * ps.avg_deal_size * ls.win_rate) / NULLIF(ls.avg_sales_cycle_days, 0) as pipeline_velocity
+FROM lead_stats ls, project_stats ps
+"""
+
+async def calculate_pipeline_velocity() -> float:
     """
     Calculate Pipeline Velocity.
     
@@ -118,46 +318,21 @@ def calculate_pipeline_velocity() -> float:
         - Use in revenue forecasting
         - Include in sales team performance metrics
     """
-    with Spinner("Pipeline Velocity"):
+    async with maybe_spinner("Pipeline Velocity"):
         try:
             # Calculate components of pipeline velocity
-            # SQL query for lead stats
-            query = """
-            WITH lead_stats AS (
-                SELECT 
-                    COUNT(*) as total_opportunities,
-                    COUNT(CASE WHEN status = 'converted' THEN 1 END) as won_opportunities,
-                    COUNT(CASE WHEN status = 'converted' THEN 1 END) * 1.0 / NULLIF(COUNT(*), 0) as win_rate,
-                    AVG(EXTRACT(DAY FROM (
-                        CASE WHEN status = 'converted' AND converted_at IS NOT NULL 
-                        THEN converted_at - created_at 
-                        ELSE NULL END
-                    ))) as avg_sales_cycle_days
-                FROM leads
-                WHERE created_at >= NOW() - INTERVAL '90 days'
-            ),
-            project_stats AS (
-                SELECT 
-                    AVG(total_revenue) as avg_deal_size
-                FROM projects
-                WHERE created_at >= NOW() - INTERVAL '90 days'
-            )
-            SELECT 
-                ls.total_opportunities,
-                ls.won_opportunities,
-                ls.win_rate,
-                ls.avg_sales_cycle_days,
-                ps.avg_deal_size,
-                (ls.total_opportunities * ps.avg_deal_size * ls.win_rate) / NULLIF(ls.avg_sales_cycle_days, 0) as pipeline_velocity
-            FROM lead_stats ls, project_stats ps
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            total_opportunities = 120     # 120 opportunities in pipeline
-            avg_deal_size = 15000         # $15,000 average deal size
-            win_rate = 0.25               # 25% win rate
-            avg_sales_cycle_days = 18     # 18 days average sales cycle
+            if USE_REAL_DB:
+                rows = await _execute_sql(PIPELINE_VELOCITY_SQL)
+                total_opportunities = _first_value(rows, "total_opportunities", 0)
+                avg_deal_size = float(_first_value(rows, "avg_deal_size"))
+                win_rate = float(_first_value(rows, "win_rate"))
+                avg_sales_cycle_days = float(_first_value(rows, "avg_sales_cycle_days"))
+            else:
+                # For now, we'll use placeholder values
+                total_opportunities = 120     # 120 opportunities in pipeline
+                avg_deal_size = 15000         # $15,000 average deal size
+                win_rate = 0.25               # 25% win rate
+                avg_sales_cycle_days = 18     # 18 days average sales cycle
             
             # Calculate pipeline velocity
             pipeline_velocity = (total_opportunities * avg_deal_size * win_rate) / avg_sales_cycle_days if avg_sales_cycle_days > 0 else 0
@@ -165,43 +340,53 @@ def calculate_pipeline_velocity() -> float:
             return pipeline_velocity
         
         except Exception as e:
-            handle_error(f"Failed to calculate Pipeline Velocity: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Pipeline Velocity: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate Pipeline Velocity: {str(e)}")
 
-def calculate_insurance_carrier_penetration() -> Dict[str, Any]:
+# Active insurance carrier relationships over the last 365 days; the details
+# variant also lists the carriers
+_CARRIER_PENETRATION_SQL_TEMPLATE = """
+SELECT 
+    COUNT(DISTINCT insurance_carrier) as active_carriers{details}
+FROM projects
+WHERE insurance_carrier IS NOT NULL
+AND created_at >= NOW() - INTERVAL '365 days'
+"""
+CARRIER_PENETRATION_SQL: Final[str] = _CARRIER_PENETRATION_SQL_TEMPLATE.format(details="")
+CARRIER_PENETRATION_DETAILS_SQL: Final[str] = _CARRIER_PENETRATION_SQL_TEMPLATE.format(details=""",
+    array_agg(DISTINCT insurance_carrier) as carrier_list""")
+
+@ttl_cache(SCALING_CACHE_TTL_SECONDS, maxsize=SCALING_CACHE_MAXSIZE, copy_results=True)
+async def calculate_insurance_carrier_penetration(include_details: bool = False) -> Dict[str, Any]:
     """
     Calculate Insurance Carrier Penetration.
     
     Formula: Number of Active Carrier Relationships ÷ Total Carriers in Market
     
+    Args:
+        include_details: Also return the names of all active carriers. Off by
+                         default, so Postgres only counts carriers instead of
+                         building the name array.
+    
     Returns:
-        Dictionary with penetration metrics and carrier details.
+        Dictionary with penetration metrics, plus "carrier_list" when
+        include_details is set.
         
     Integration:
         - Add to strategic partnerships dashboard
         - Use in carrier relationship development
         - Include in market expansion planning
     """
-    with Spinner("Insurance Carrier Penetration"):
+    async with maybe_spinner("Insurance Carrier Penetration"):
         try:
-            # SQL query to get active insurance carrier relationships
-            query = """
-            SELECT 
-                COUNT(DISTINCT insurance_carrier) as active_carriers,
-                array_agg(DISTINCT insurance_carrier) as carrier_list
-            FROM projects
-            WHERE insurance_carrier IS NOT NULL
-            AND created_at >= NOW() - INTERVAL '365 days'
-            """
-            
-            # TODO: Implement the actual database calls and market data integration
-            # For now, we'll use placeholder values
-            active_carriers = 12
-            carrier_list = [
-                "State Farm", "Allstate", "GEICO", "Progressive", 
-                "Liberty Mutual", "Farmers", "Nationwide", "Travelers",
-                "American Family", "Erie Insurance", "USAA", "Hartford"
-            ]
+            if USE_REAL_DB:
+                rows = await _execute_sql(CARRIER_PENETRATION_DETAILS_SQL if include_details else CARRIER_PENETRATION_SQL)
+                active_carriers = _first_value(rows, "active_carriers", 0)
+                carrier_list = _first_value(rows, "carrier_list", [])
+            else:
+                # For now, we'll use placeholder values
+                active_carriers = 12
+                carrier_list = list(_PLACEHOLDER_CARRIERS)
             
             # Total carriers in market (this would ideally come from industry database)
             total_carriers_in_market = 35
@@ -210,21 +395,49 @@ def calculate_insurance_carrier_penetration() -> Dict[str, Any]:
             penetration = (active_carriers / total_carriers_in_market * 100) if total_carriers_in_market > 0 else 0
             
             # Return comprehensive metrics
-            return {
+            result = {
                 "penetration_percentage": penetration,
                 "active_carriers": active_carriers,
                 "total_carriers": total_carriers_in_market,
-                "carrier_list": carrier_list,
-                "top_opportunities": [
-                    "Mercury Insurance", "Amica", "Auto-Owners Insurance"
-                ]
+                "top_opportunities": list(_TOP_CARRIER_OPPORTUNITIES)
             }
+            if include_details:
+                result["carrier_list"] = carrier_list
+            
+            return result
         
         except Exception as e:
-            handle_error(f"Failed to calculate Insurance Carrier Penetration: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Insurance Carrier Penetration: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate Insurance Carrier Penetration: {str(e)}")
 
-def calculate_revenue_per_employee() -> Dict[str, float]:
+# Total revenue and active employee counts in one row
+REVENUE_PER_EMPLOYEE_SQL: Final[str] = """
+WITH revenue AS (
+    SELECT 
+        SUM(total_revenue) as total_revenue
+    FROM projects
+    WHERE created_at >= NOW() - INTERVAL '365 days'
+),
+headcount AS (
+    SELECT 
+        COUNT(*) as employee_count,
+        COUNT(*) FILTER (WHERE department = 'field') as field_employees,
+        COUNT(*) FILTER (WHERE department = 'office') as office_employees,
+        COUNT(*) FILTER (WHERE department = 'management') as management_employees
+    FROM employees
+    WHERE status = 'active'
+)
+SELECT 
+    r.total_revenue,
+    h.employee_count,
+    h.field_employees,
+    h.office_employees,
+    h.management_employees
+FROM revenue r, headcount h
+"""
+
+@ttl_cache(SCALING_CACHE_TTL_SECONDS, maxsize=SCALING_CACHE_MAXSIZE, copy_results=True)
+async def calculate_revenue_per_employee() -> Dict[str, float]:
     """
     Calculate Revenue per Employee.
     
@@ -238,43 +451,33 @@ def calculate_revenue_per_employee() -> Dict[str, float]:
         - Use in workforce planning
         - Include in productivity analysis
     """
-    with Spinner("Revenue per Employee"):
+    async with maybe_spinner("Revenue per Employee"):
         try:
-            # SQL query to get total revenue
-            revenue_query = """
-            SELECT 
-                SUM(total_revenue) as total_revenue
-            FROM projects
-            WHERE created_at >= NOW() - INTERVAL '365 days'
-            """
-            
-            # SQL query to get employee count
-            employee_query = """
-            SELECT 
-                COUNT(*) as employee_count,
-                SUM(CASE WHEN department = 'field' THEN 1 ELSE 0 END) as field_employees,
-                SUM(CASE WHEN department = 'office' THEN 1 ELSE 0 END) as office_employees,
-                SUM(CASE WHEN department = 'management' THEN 1 ELSE 0 END) as management_employees
-            FROM employees
-            WHERE status = 'active'
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            total_revenue = 8750000  # $8.75M annual revenue
-            
-            employee_counts = {
-                "total": 45,
-                "field": 32,
-                "office": 10,
-                "management": 3
-            }
+            if USE_REAL_DB:
+                rows = await _execute_sql(REVENUE_PER_EMPLOYEE_SQL)
+                total_revenue = float(_first_value(rows, "total_revenue"))
+                
+                employee_counts = {
+                    "total": _first_value(rows, "employee_count", 0),
+                    "field": _first_value(rows, "field_employees", 0),
+                    "office": _first_value(rows, "office_employees", 0),
+                    "management": _first_value(rows, "management_employees", 0)
+                }
+            else:
+                # For now, we'll use placeholder values
+                total_revenue = 8750000  # $8.75M annual revenue
+                
+                employee_counts = {
+                    "total": 45,
+                    "field": 32,
+                    "office": 10,
+                    "management": 3
+                }
             
-            # Calculate revenue per employee for each category
-            revenue_per_employee = {
-                category: total_revenue / count if count > 0 else 0
-                for category, count in employee_counts.items()
-            }
+            # Calculate revenue per employee for every category with one array divide
+            counts = np.fromiter(employee_counts.values(), dtype=np.float64, count=len(employee_counts))
+            per_employee = np.divide(total_revenue, counts, out=np.zeros_like(counts), where=counts > 0)
+            revenue_per_employee = dict(zip(employee_counts.keys(), per_employee.tolist()))
             
             # Include raw data for context
             return {
@@ -284,38 +487,79 @@ def calculate_revenue_per_employee() -> Dict[str, float]:
             }
         
         except Exception as e:
-            handle_error(f"Failed to calculate Revenue per Employee: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Revenue per Employee: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate Revenue per Employee: {str(e)}")
 
-def calculate_manager_span() -> Dict[str, Any]:
+# Management span summary; only aggregates come back rather than a row per
+# manager. The details variant adds the largest teams ($1)
+_MANAGER_SPAN_SQL_TEMPLATE = """
+WITH spans AS (
+    SELECT 
+        m.id as manager_id,
+        m.name as manager_name,
+        COUNT(e.id) as direct_reports
+    FROM employees m
+    JOIN employees e ON e.manager_id = m.id
+    WHERE m.status = 'active' AND e.status = 'active'
+    GROUP BY m.id, m.name
+)
+SELECT 
+    COUNT(*) as total_managers,
+    COALESCE(SUM(direct_reports), 0) as total_direct_reports,
+    COALESCE(AVG(direct_reports), 0) as average_span,
+    COALESCE(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY direct_reports), 0) as median_span,
+    COALESCE(PERCENTILE_CONT(0.9) WITHIN GROUP (ORDER BY direct_reports), 0) as p90_span,
+    COALESCE(STDDEV_POP(direct_reports), 0) as span_std_dev,
+    COALESCE(MAX(direct_reports), 0) as max_span{details}
+FROM spans
+"""
+MANAGER_SPAN_SQL: Final[str] = _MANAGER_SPAN_SQL_TEMPLATE.format(details="")
+MANAGER_SPAN_DETAILS_SQL: Final[str] = _MANAGER_SPAN_SQL_TEMPLATE.format(details=""",
+    (
+        SELECT COALESCE(json_agg(t ORDER BY t.direct_reports DESC), '[]'::json)
+        FROM (SELECT * FROM spans ORDER BY direct_reports DESC LIMIT $1) t
+    ) as manager_details""")
+
+async def calculate_manager_span(include_details: bool = False) -> Dict[str, Any]:
     """
     Calculate Management Span of Control.
     
     Formula: Number of Direct Reports per Manager
     
+    Args:
+        include_details: Also return the MANAGER_DETAIL_LIMIT managers with the
+                         most direct reports. Off by default, so only the summary
+                         row is built and sent.
+    
     Returns:
-        Dictionary with span metrics and details.
+        Dictionary with span metrics, plus "manager_details" when include_details
+        is set.
         
     Integration:
         - Add to organizational health dashboard
         - Use in management structure planning
         - Include in operational efficiency analysis
     """
-    with Spinner("Management Span"):
+    async with maybe_spinner("Management Span"):
         try:
-            # SQL query to get management span data
-            query = """
-            SELECT 
-                m.id as manager_id,
-                m.name as manager_name,
-                COUNT(e.id) as direct_reports
-            FROM employees m
-            JOIN employees e ON e.manager_id = m.id
-            WHERE m.status = 'active' AND e.status = 'active'
-            GROUP BY m.id, m.name
-            """
-            
-            # TODO: Implement the actual database calls
+            if USE_REAL_DB:
+                if include_details:
+                    rows = await _execute_sql(MANAGER_SPAN_DETAILS_SQL, {"1": MANAGER_DETAIL_LIMIT})
+                else:
+                    rows = await _execute_sql(MANAGER_SPAN_SQL)
+                result = {
+                    "average_span": float(_first_value(rows, "average_span")),
+                    "median_span": float(_first_value(rows, "median_span")),
+                    "p90_span": float(_first_value(rows, "p90_span")),
+                    "span_std_dev": float(_first_value(rows, "span_std_dev")),
+                    "max_span": _first_value(rows, "max_span", 0),
+                    "total_managers": _first_value(rows, "total_managers", 0),
+                    "total_direct_reports": _first_value(rows, "total_direct_reports", 0)
+                }
+                if include_details:
+                    result["manager_details"] = _first_value(rows, "manager_details", [])
+                return result
+            
             # For now, we'll use placeholder values
             manager_spans = [
                 {"manager_id": 1, "manager_name": "John Smith", "direct_reports": 8},
@@ -323,28 +567,78 @@ def calculate_manager_span() -> Dict[str, Any]:
                 {"manager_id": 3, "manager_name": "Bob Johnson", "direct_reports": 5}
             ]
             
-            # Calculate average span
-            total_managers = len(manager_spans)
-            total_direct_reports = sum(m["direct_reports"] for m in manager_spans)
-            avg_span = total_direct_reports / total_managers if total_managers > 0 else 0
+            # Calculate span statistics over all managers at once
+            reports = np.fromiter((m["direct_reports"] for m in manager_spans), dtype=np.int32, count=len(manager_spans))
+            stats = span_stats(reports)
             
             # Add summary metrics
             result = {
-                "average_span": avg_span,
-                "manager_details": manager_spans,
-                "total_managers": total_managers,
-                "total_direct_reports": total_direct_reports
+                "average_span": stats["mean"],
+                "median_span": stats["median"],
+                "p90_span": stats["p90"],
+                "span_std_dev": stats["std"],
+                "max_span": stats["max"],
+                "total_managers": stats["count"],
+                "total_direct_reports": stats["total"]
             }
+            if include_details:
+                result["manager_details"] = sorted(
+                    manager_spans, key=lambda m: m["direct_reports"], reverse=True
+                )[:MANAGER_DETAIL_LIMIT]
             
             return result
         
         except Exception as e:
-            handle_error(f"Failed to calculate Management Span: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Management Span: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate Management Span: {str(e)}")
 
 # ---------------------- Phase 5: Scaling & Expansion (18 Months - 5 Years) ----------------------
 
-def calculate_location_roi(location_id: int) -> Dict[str, float]:
+# Revenue, costs and profit of a location ($1) over the last 365 days
+LOCATION_PERFORMANCE_SQL: Final[str] = """
+WITH location_projects AS (
+    SELECT 
+        p.id as project_id,
+        p.total_revenue,
+        p.total_expenses,
+        p.allocated_lead_cost
+    FROM projects p
+    WHERE p.location_id = $1
+    AND p.created_at >= NOW() - INTERVAL '365 days'
+),
+location_overhead AS (
+    SELECT 
+        SUM(amount) as overhead_cost
+    FROM expenses
+    WHERE location_id = $1
+    AND category = 'overhead'
+    AND created_at >= NOW() - INTERVAL '365 days'
+)
+SELECT 
+    SUM(lp.total_revenue) as annual_revenue,
+    SUM(lp.total_expenses) as direct_expenses,
+    SUM(lp.allocated_lead_cost) as lead_costs,
+    lo.overhead_cost,
+    (
+        SUM(lp.total_revenue) - 
+        SUM(lp.total_expenses) - 
+        SUM(lp.allocated_lead_cost) - 
+        lo.overhead_cost
+    ) as annual_profit
+FROM location_projects lp, location_overhead lo
+"""
+
+# Investment made in a location ($1)
+LOCATION_INVESTMENT_SQL: Final[str] = """
+SELECT 
+    initial_investment,
+    recurring_investment,
+    initial_investment + recurring_investment as total_investment
+FROM locations
+WHERE id = $1
+"""
+
+async def calculate_location_roi(location_id: int) -> Dict[str, float]:
     """
     Calculate Location ROI.
     
@@ -361,63 +655,27 @@ def calculate_location_roi(location_id: int) -> Dict[str, float]:
         - Use in location performance evaluation
         - Include in investment decision-making
     """
-    with Spinner(f"Location ROI - Location #{location_id}"):
+    async with maybe_spinner(f"Location ROI - Location #{location_id}"):
         try:
-            # SQL query to get location performance data
-            query = f"""
-            WITH location_projects AS (
-                SELECT 
-                    p.id as project_id,
-                    p.total_revenue,
-                    p.total_expenses,
-                    p.allocated_lead_cost
-                FROM projects p
-                WHERE p.location_id = {location_id}
-                AND p.created_at >= NOW() - INTERVAL '365 days'
-            ),
-            location_overhead AS (
-                SELECT 
-                    SUM(amount) as overhead_cost
-                FROM expenses
-                WHERE location_id = {location_id}
-                AND category = 'overhead'
-                AND created_at >= NOW() - INTERVAL '365 days'
-            )
-            SELECT 
-                SUM(lp.total_revenue) as annual_revenue,
-                SUM(lp.total_expenses) as direct_expenses,
-                SUM(lp.allocated_lead_cost) as lead_costs,
-                lo.overhead_cost,
-                (
-                    SUM(lp.total_revenue) - 
-                    SUM(lp.total_expenses) - 
-                    SUM(lp.allocated_lead_cost) - 
-                    lo.overhead_cost
-                ) as annual_profit
-            FROM location_projects lp, location_overhead lo
-            """
-            
-            # SQL query to get location investment data
-            investment_query = f"""
-            SELECT 
-                initial_investment,
-                recurring_investment,
-                initial_investment + recurring_investment as total_investment
-            FROM locations
-            WHERE id = {location_id}
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            annual_revenue = 1250000     # $1.25M
-            direct_expenses = 650000      # $650K
-            lead_costs = 75000           # $75K
-            overhead_cost = 225000       # $225K
-            annual_profit = annual_revenue - direct_expenses - lead_costs - overhead_cost
-            
-            initial_investment = 500000   # $500K initial setup
-            recurring_investment = 100000 # $100K recurring investments
-            total_investment = initial_investment + recurring_investment
+            if USE_REAL_DB:
+                performance_rows, investment_rows = await asyncio.gather(
+                    _execute_sql(LOCATION_PERFORMANCE_SQL, {"1": location_id}),
+                    _execute_sql(LOCATION_INVESTMENT_SQL, {"1": location_id})
+                )
+                annual_revenue = float(_first_value(performance_rows, "annual_revenue"))
+                annual_profit = float(_first_value(performance_rows, "annual_profit"))
+                total_investment = float(_first_value(investment_rows, "total_investment"))
+            else:
+                # For now, we'll use placeholder values
+                annual_revenue = 1250000     # $1.25M
+                direct_expenses = 650000      # $650K
+                lead_costs = 75000           # $75K
+                overhead_cost = 225000       # $225K
+                annual_profit = annual_revenue - direct_expenses - lead_costs - overhead_cost
+                
+                initial_investment = 500000   # $500K initial setup
+                recurring_investment = 100000 # $100K recurring investments
+                total_investment = initial_investment + recurring_investment
             
             # Calculate ROI
             roi = (annual_profit / total_investment) if total_investment > 0 else 0
@@ -434,10 +692,38 @@ def calculate_location_roi(location_id: int) -> Dict[str, float]:
             }
         
         except Exception as e:
-            handle_error(f"Failed to calculate Location ROI for location {location_id}: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Location ROI for location %s: %s", "scaling_metrics", location_id, e)
             raise RuntimeError(f"Failed to calculate Location ROI: {str(e)}")
 
-def calculate_cross_location_efficiency() -> float:
+# Revenue attributed to shared resources against their cost
+CROSS_LOCATION_EFFICIENCY_SQL: Final[str] = """
+-- Shared resources revenue (revenue attributed to shared resources)
+WITH shared_revenue AS (
+    SELECT 
+        SUM(p.total_revenue * r.contribution_percentage / 100) as revenue
+    FROM projects p
+    JOIN resource_contributions r ON p.id = r.project_id
+    JOIN resources res ON r.resource_id = res.id
+    WHERE res.is_shared = true
+    AND p.created_at >= NOW() - INTERVAL '365 days'
+),
+-- Shared resources cost
+shared_cost AS (
+    SELECT 
+        SUM(cost) as total_cost
+    FROM resource_costs
+    WHERE is_shared = true
+    AND period >= NOW() - INTERVAL '365 days'
+)
+-- Calculate efficiency
+SELECT 
+    sr.revenue as shared_resources_revenue,
+    sc.total_cost as shared_resources_cost,
+    sr.revenue / NULLIF(sc.total_cost, 0) as efficiency_ratio
+FROM shared_revenue sr, shared_cost sc
+"""
+
+async def calculate_cross_location_efficiency() -> float:
     """
     Calculate Cross-Location Efficiency.
     
@@ -451,40 +737,16 @@ def calculate_cross_location_efficiency() -> float:
         - Use in shared services optimization
         - Include in resource allocation planning
     """
-    with Spinner("Cross-Location Efficiency"):
+    async with maybe_spinner("Cross-Location Efficiency"):
         try:
-            # SQL query to get shared resources data
-            query = """
-            -- Shared resources revenue (revenue attributed to shared resources)
-            WITH shared_revenue AS (
-                SELECT 
-                    SUM(p.total_revenue * r.contribution_percentage / 100) as revenue
-                FROM projects p
-                JOIN resource_contributions r ON p.id = r.project_id
-                JOIN resources res ON r.resource_id = res.id
-                WHERE res.is_shared = true
-                AND p.created_at >= NOW() - INTERVAL '365 days'
-            ),
-            -- Shared resources cost
-            shared_cost AS (
-                SELECT 
-                    SUM(cost) as total_cost
-                FROM resource_costs
-                WHERE is_shared = true
-                AND period >= NOW() - INTERVAL '365 days'
-            )
-            -- Calculate efficiency
-            SELECT 
-                sr.revenue as shared_resources_revenue,
-                sc.total_cost as shared_resources_cost,
-                sr.revenue / NULLIF(sc.total_cost, 0) as efficiency_ratio
-            FROM shared_revenue sr, shared_cost sc
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            shared_resources_revenue = 2500000  # $2.5M revenue attributed to shared resources
-            shared_resources_cost = 1200000     # $1.2M cost of shared resources
+            if USE_REAL_DB:
+                rows = await _execute_sql(CROSS_LOCATION_EFFICIENCY_SQL)
+                shared_resources_revenue = float(_first_value(rows, "shared_resources_revenue"))
+                shared_resources_cost = float(_first_value(rows, "shared_resources_cost"))
+            else:
+                # For now, we'll use placeholder values
+                shared_resources_revenue = 2500000  # $2.5M revenue attributed to shared resources
+                shared_resources_cost = 1200000     # $1.2M cost of shared resources
             
             # Calculate efficiency ratio
             efficiency_ratio = shared_resources_revenue / shared_resources_cost if shared_resources_cost > 0 else 0
@@ -492,67 +754,91 @@ def calculate_cross_location_efficiency() -> float:
             return efficiency_ratio
         
         except Exception as e:
-            handle_error(f"Failed to calculate Cross-Location Efficiency: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Cross-Location Efficiency: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate Cross-Location Efficiency: {str(e)}")
 
-def calculate_digital_lead_conversion_rate() -> Dict[str, float]:
+# Digital lead conversion per source and overall over the last 90 days
+DIGITAL_LEAD_CONVERSION_SQL: Final[str] = """
+SELECT 
+    lead_source,
+    COUNT(*) as total_leads,
+    COUNT(CASE WHEN status = 'converted' THEN 1 END) as converted_leads
+FROM leads
+WHERE lead_source_type = 'digital'
+AND created_at >= NOW() - INTERVAL '90 days'
+GROUP BY lead_source
+
+UNION ALL
+
+SELECT 
+    'overall' as lead_source,
+    COUNT(*) as total_leads,
+    COUNT(CASE WHEN status = 'converted' THEN 1 END) as converted_leads
+FROM leads
+WHERE lead_source_type = 'digital'
+AND created_at >= NOW() - INTERVAL '90 days'
+"""
+
+# Placeholder digital lead counts per source and overall
+_PLACEHOLDER_DIGITAL_LEADS = (
+    {"lead_source": "Google Ads", "total_leads": 120, "converted_leads": 18},
+    {"lead_source": "Facebook", "total_leads": 85, "converted_leads": 12},
+    {"lead_source": "Instagram", "total_leads": 45, "converted_leads": 5},
+    {"lead_source": "Website", "total_leads": 95, "converted_leads": 22},
+    {"lead_source": "Email", "total_leads": 65, "converted_leads": 8},
+    {"lead_source": "overall", "total_leads": 410, "converted_leads": 65}
+)
+
+async def calculate_digital_lead_conversion_rate() -> DigitalConversion:
     """
     Calculate Digital Lead Conversion Rate.
     
     Formula: (Leads Converting to Jobs ÷ Total Digital Leads) × 100
     
     Returns:
-        Dictionary with digital lead conversion metrics.
+        DigitalConversion with per-source totals, conversions and rates as arrays,
+        including an "overall" source. Use to_dict() for the per-source dictionary.
         
     Integration:
         - Add to marketing dashboard
         - Use in digital marketing strategy
         - Include in customer acquisition planning
     """
-    with Spinner("Digital Lead Conversion"):
+    async with maybe_spinner("Digital Lead Conversion"):
         try:
-            # SQL query to get digital lead conversion data
-            query = """
-            SELECT 
-                lead_source,
-                COUNT(*) as total_leads,
-                COUNT(CASE WHEN status = 'converted' THEN 1 END) as converted_leads,
-                COUNT(CASE WHEN status = 'converted' THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as conversion_rate
-            FROM leads
-            WHERE lead_source_type = 'digital'
-            AND created_at >= NOW() - INTERVAL '90 days'
-            GROUP BY lead_source
-            
-            UNION ALL
-            
-            SELECT 
-                'overall' as lead_source,
-                COUNT(*) as total_leads,
-                COUNT(CASE WHEN status = 'converted' THEN 1 END) as converted_leads,
-                COUNT(CASE WHEN status = 'converted' THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as conversion_rate
-            FROM leads
-            WHERE lead_source_type = 'digital'
-            AND created_at >= NOW() - INTERVAL '90 days'
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            digital_sources = {
-                "Google Ads": {"total": 120, "converted": 18, "rate": 15.0},
-                "Facebook": {"total": 85, "converted": 12, "rate": 14.1},
-                "Instagram": {"total": 45, "converted": 5, "rate": 11.1},
-                "Website": {"total": 95, "converted": 22, "rate": 23.2},
-                "Email": {"total": 65, "converted": 8, "rate": 12.3},
-                "overall": {"total": 410, "converted": 65, "rate": 15.9}
-            }
+            if USE_REAL_DB:
+                rows = await _execute_sql(DIGITAL_LEAD_CONVERSION_SQL)
+            else:
+                # For now, we'll use placeholder values
+                rows = _PLACEHOLDER_DIGITAL_LEADS
             
-            return digital_sources
+            return DigitalConversion.from_rows(rows)
         
         except Exception as e:
-            handle_error(f"Failed to calculate Digital Lead Conversion Rate: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Digital Lead Conversion Rate: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate Digital Lead Conversion Rate: {str(e)}")
 
-def calculate_process_standardization_score() -> Dict[str, Any]:
+# Process standardization per department and overall
+PROCESS_STANDARDIZATION_SQL: Final[str] = """
+SELECT 
+    department,
+    COUNT(*) as total_processes,
+    COUNT(CASE WHEN is_standardized = true THEN 1 END) as standardized_processes,
+    COUNT(CASE WHEN is_standardized = true THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as standardization_score
+FROM business_processes
+GROUP BY department
+
+UNION ALL
+
+SELECT 
+    'overall' as department,
+    COUNT(*) as total_processes,
+    COUNT(CASE WHEN is_standardized = true THEN 1 END) as standardized_processes,
+    COUNT(CASE WHEN is_standardized = true THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as standardization_score
+FROM business_processes
+"""
+
+async def calculate_process_standardization_score() -> Dict[str, Any]:
     """
     Calculate Process Standardization Score.
     
@@ -566,38 +852,28 @@ def calculate_process_standardization_score() -> Dict[str, Any]:
         - Use in process improvement initiatives
         - Include in scaling readiness assessment
     """
-    with Spinner("Process Standardization"):
+    async with maybe_spinner("Process Standardization"):
         try:
-            # SQL query to get process standardization data
-            query = """
-            SELECT 
-                department,
-                COUNT(*) as total_processes,
-                COUNT(CASE WHEN is_standardized = true THEN 1 END) as standardized_processes,
-                COUNT(CASE WHEN is_standardized = true THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as standardization_score
-            FROM business_processes
-            GROUP BY department
-            
-            UNION ALL
-            
-            SELECT 
-                'overall' as department,
-                COUNT(*) as total_processes,
-                COUNT(CASE WHEN is_standardized = true THEN 1 END) as standardized_processes,
-                COUNT(CASE WHEN is_standardized = true THEN 1 END) * 100.0 / NULLIF(COUNT(*), 0) as standardization_score
-            FROM business_processes
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            process_data = {
-                "sales": {"total": 12, "standardized": 9, "score": 75.0},
-                "operations": {"total": 25, "standardized": 22, "score": 88.0},
-                "customer_service": {"total": 18, "standardized": 14, "score": 77.8},
-                "finance": {"total": 15, "standardized": 13, "score": 86.7},
-                "hr": {"total": 10, "standardized": 7, "score": 70.0},
-                "overall": {"total": 80, "standardized": 65, "score": 81.3}
-            }
+            if USE_REAL_DB:
+                rows = await _execute_sql(PROCESS_STANDARDIZATION_SQL)
+                process_data = {
+                    row["department"]: {
+                        "total": row["total_processes"],
+                        "standardized": row["standardized_processes"],
+                        "score": row["standardization_score"] or 0.0
+                    }
+                    for row in rows
+                }
+            else:
+                # For now, we'll use placeholder values
+                process_data = {
+                    "sales": {"total": 12, "standardized": 9, "score": 75.0},
+                    "operations": {"total": 25, "standardized": 22, "score": 88.0},
+                    "customer_service": {"total": 18, "standardized": 14, "score": 77.8},
+                    "finance": {"total": 15, "standardized": 13, "score": 86.7},
+                    "hr": {"total": 10, "standardized": 7, "score": 70.0},
+                    "overall": {"total": 80, "standardized": 65, "score": 81.3}
+                }
             
             # Add core processes that need standardization
             needs_standardization = [
@@ -608,19 +884,30 @@ def calculate_process_standardization_score() -> Dict[str, Any]:
             
             result = {
                 "standardization_by_department": process_data,
-                "overall_score": process_data["overall"]["score"],
+                "overall_score": process_data.get("overall", {}).get("score", 0.0),
                 "needs_standardization": needs_standardization
             }
             
             return result
         
         except Exception as e:
-            handle_error(f"Failed to calculate Process Standardization Score: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Process Standardization Score: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate Process Standardization Score: {str(e)}")
 
 # ---------------------- Phase 6: Market Domination (5-10 Years) ----------------------
 
-def calculate_revenue_cagr(start_date: str, end_date: str) -> float:
+# Revenue for the first year ($1-$2) and the last year ($3-$4) of a range in one
+# pass over projects
+REVENUE_CAGR_SQL: Final[str] = """
+SELECT 
+    SUM(total_revenue) FILTER (WHERE created_at BETWEEN $1::timestamptz AND $2::timestamptz) as beginning_revenue,
+    SUM(total_revenue) FILTER (WHERE created_at BETWEEN $3::timestamptz AND $4::timestamptz) as ending_revenue
+FROM projects
+WHERE created_at BETWEEN $1::timestamptz AND $4::timestamptz
+"""
+
+@ttl_cache(SCALING_CACHE_TTL_SECONDS, maxsize=SCALING_CACHE_MAXSIZE)
+async def calculate_revenue_cagr(start_date: str, end_date: str) -> float:
     """
     Calculate Revenue CAGR (Compound Annual Growth Rate).
     
@@ -638,48 +925,102 @@ def calculate_revenue_cagr(start_date: str, end_date: str) -> float:
         - Use in long-term planning
         - Include in investor reporting
     """
-    with Spinner("Revenue CAGR"):
+    async with maybe_spinner("Revenue CAGR"):
         try:
             # Parse dates
-            start = datetime.fromisoformat(start_date)
-            end = datetime.fromisoformat(end_date)
-            
-            # Calculate years between dates
-            years = (end - start).days / 365.25
+            start = _parse_iso(start_date)
+            end = _parse_iso(end_date)
             
-            if years <= 0:
+            if end <= start:
                 raise ValueError("End date must be after start date")
             
-            # SQL query to get revenue for start and end periods
-            start_revenue_query = f"""
-            SELECT 
-                SUM(total_revenue) as revenue
-            FROM projects
-            WHERE created_at BETWEEN '{start_date}' AND '{(start + timedelta(days=365)).isoformat()}'
-            """
-            
-            end_revenue_query = f"""
-            SELECT 
-                SUM(total_revenue) as revenue
-            FROM projects
-            WHERE created_at BETWEEN '{(end - timedelta(days=365)).isoformat()}' AND '{end_date}'
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            beginning_revenue = 2500000  # $2.5M starting annual revenue
-            ending_revenue = 8750000     # $8.75M ending annual revenue
+            # Calculate years between dates
+            years = (end - start).total_seconds() / SECONDS_PER_YEAR
+            
+            if USE_REAL_DB:
+                rows = await _execute_sql(REVENUE_CAGR_SQL, {
+                    "1": start.isoformat(),
+                    "2": (start + timedelta(days=365)).isoformat(),
+                    "3": (end - timedelta(days=365)).isoformat(),
+                    "4": end.isoformat()
+                })
+                beginning_revenue = float(_first_value(rows, "beginning_revenue"))
+                ending_revenue = float(_first_value(rows, "ending_revenue"))
+            else:
+                # For now, we'll use placeholder values
+                beginning_revenue = 2500000  # $2.5M starting annual revenue
+                ending_revenue = 8750000     # $8.75M ending annual revenue
             
-            # Calculate CAGR
-            cagr = (((ending_revenue / beginning_revenue) ** (1 / years)) - 1) * 100 if beginning_revenue > 0 else 0
+            # Calculate CAGR as expm1(ln(ending / beginning) / years), which stays
+            # accurate for growth close to zero; no ending revenue is a 100% decline
+            if beginning_revenue <= 0:
+                cagr = 0
+            elif ending_revenue <= 0:
+                cagr = -100.0
+            else:
+                cagr = math.expm1(math.log(ending_revenue / beginning_revenue) / years) * 100
             
             return cagr
         
         except Exception as e:
-            handle_error(f"Failed to calculate Revenue CAGR: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate Revenue CAGR: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate Revenue CAGR: {str(e)}")
 
-def calculate_ebitda_margin() -> Dict[str, float]:
+# Placeholder revenue, EBITDA and margin per period, shared read-only by every call
+_EBITDA_PLACEHOLDER_PERIODS = types.MappingProxyType({
+    "current_year": types.MappingProxyType({"revenue": 8750000, "ebitda": 1750000, "margin": 20.0}),
+    "previous_year": types.MappingProxyType({"revenue": 6500000, "ebitda": 1105000, "margin": 17.0}),
+    "two_years_ago": types.MappingProxyType({"revenue": 4200000, "ebitda": 630000, "margin": 15.0})
+})
+
+# EBITDA periods, oldest first, for the margin trend
+_EBITDA_TREND_PERIODS = ("two_years_ago", "previous_year", "current_year")
+
+# Revenue and EBITDA for the current and two previous years
+EBITDA_MARGIN_SQL: Final[str] = """
+WITH overhead AS (
+    SELECT 
+        CASE
+            WHEN created_at >= NOW() - INTERVAL '1 year' THEN 'current_year'
+            WHEN created_at >= NOW() - INTERVAL '2 year' THEN 'previous_year'
+            ELSE 'two_years_ago'
+        END as period,
+        SUM(amount) as amount
+    FROM expenses
+    WHERE category = 'overhead'
+    AND created_at >= NOW() - INTERVAL '3 year'
+    GROUP BY 1
+),
+projects_yearly AS (
+    SELECT 
+        CASE
+            WHEN created_at >= NOW() - INTERVAL '1 year' THEN 'current_year'
+            WHEN created_at >= NOW() - INTERVAL '2 year' THEN 'previous_year'
+            ELSE 'two_years_ago'
+        END as period,
+        SUM(total_revenue) as revenue,
+        SUM(total_expenses) as expenses
+    FROM projects
+    WHERE created_at >= NOW() - INTERVAL '3 year'
+    GROUP BY 1
+),
+annual_metrics AS (
+    SELECT 
+        p.period,
+        p.revenue,
+        p.revenue - p.expenses - COALESCE(o.amount, 0) as ebitda
+    FROM projects_yearly p
+    LEFT JOIN overhead o USING (period)
+)
+SELECT 
+    period,
+    revenue,
+    ebitda,
+    (ebitda / NULLIF(revenue, 0)) * 100 as ebitda_margin
+FROM annual_metrics
+"""
+
+async def calculate_ebitda_margin() -> Dict[str, float]:
     """
     Calculate EBITDA Margin Progression.
     
@@ -693,85 +1034,68 @@ def calculate_ebitda_margin() -> Dict[str, float]:
         - Use in profitability analysis
         - Include in investor reporting
     """
-    with Spinner("EBITDA Margin"):
+    async with maybe_spinner("EBITDA Margin"):
         try:
-            # SQL query to calculate EBITDA margin for multiple periods
-            query = """
-            WITH annual_metrics AS (
-                -- Current year
-                SELECT 
-                    'current_year' as period,
-                    SUM(total_revenue) as revenue,
-                    (
-                        SUM(total_revenue) - 
-                        SUM(total_expenses) - 
-                        (SELECT SUM(amount) FROM expenses WHERE category = 'overhead' AND created_at >= NOW() - INTERVAL '1 year')
-                    ) as ebitda
-                FROM projects
-                WHERE created_at >= NOW() - INTERVAL '1 year'
-                
-                UNION ALL
-                
-                -- Previous year
-                SELECT 
-                    'previous_year' as period,
-                    SUM(total_revenue) as revenue,
-                    (
-                        SUM(total_revenue) - 
-                        SUM(total_expenses) - 
-                        (SELECT SUM(amount) FROM expenses WHERE category = 'overhead' AND created_at BETWEEN NOW() - INTERVAL '2 year' AND NOW() - INTERVAL '1 year')
-                    ) as ebitda
-                FROM projects
-                WHERE created_at BETWEEN NOW() - INTERVAL '2 year' AND NOW() - INTERVAL '1 year'
-                
-                UNION ALL
-                
-                -- Two years ago
-                SELECT 
-                    'two_years_ago' as period,
-                    SUM(total_revenue) as revenue,
-                    (
-                        SUM(total_revenue) - 
-                        SUM(total_expenses) - 
-                        (SELECT SUM(amount) FROM expenses WHERE category = 'overhead' AND created_at BETWEEN NOW() - INTERVAL '3 year' AND NOW() - INTERVAL '2 year')
-                    ) as ebitda
-                FROM projects
-                WHERE created_at BETWEEN NOW() - INTERVAL '3 year' AND NOW() - INTERVAL '2 year'
-            )
-            SELECT 
-                period,
-                revenue,
-                ebitda,
-                (ebitda / NULLIF(revenue, 0)) * 100 as ebitda_margin
-            FROM annual_metrics
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            ebitda_data = {
-                "current_year": {"revenue": 8750000, "ebitda": 1750000, "margin": 20.0},
-                "previous_year": {"revenue": 6500000, "ebitda": 1105000, "margin": 17.0},
-                "two_years_ago": {"revenue": 4200000, "ebitda": 630000, "margin": 15.0}
-            }
+            if USE_REAL_DB:
+                rows = await _execute_sql(EBITDA_MARGIN_SQL)
+                ebitda_data = {
+                    period: {"revenue": 0.0, "ebitda": 0.0, "margin": 0.0}
+                    for period in _EBITDA_TREND_PERIODS
+                }
+                for row in rows:
+                    ebitda_data[row["period"]] = {
+                        "revenue": row["revenue"] or 0.0,
+                        "ebitda": row["ebitda"] or 0.0,
+                        "margin": row["ebitda_margin"] or 0.0
+                    }
+            else:
+                # For now, we'll use placeholder values, copied into plain dicts since
+                # json/orjson cannot serialize the read-only mapping proxies
+                ebitda_data = {period: dict(values) for period, values in _EBITDA_PLACEHOLDER_PERIODS.items()}
             
             # Add trend analysis
-            year_over_year_change = ebitda_data["current_year"]["margin"] - ebitda_data["previous_year"]["margin"]
-            two_year_change = ebitda_data["current_year"]["margin"] - ebitda_data["two_years_ago"]["margin"]
+            margins = np.fromiter(
+                (ebitda_data[period]["margin"] for period in _EBITDA_TREND_PERIODS),
+                dtype=np.float64, count=len(_EBITDA_TREND_PERIODS)
+            )
+            current_margin = float(margins[-1])
+            year_over_year_change = float(np.diff(margins)[-1])
+            two_year_change = float(margins[-1] - margins[0])
             
             result = {
                 "periods": ebitda_data,
                 "year_over_year_change": year_over_year_change,
                 "two_year_change": two_year_change,
-                "current_margin": ebitda_data["current_year"]["margin"]
+                "current_margin": current_margin
             }
             
             return result
         
         except Exception as e:
-            handle_error(f"Failed to calculate EBITDA Margin: {str(e)}", "scaling_metrics")
+            handle_error("Failed to calculate EBITDA Margin: %s", "scaling_metrics", e)
             raise RuntimeError(f"Failed to calculate EBITDA Margin: {str(e)}")
 
-def calculate_ev_multiple() -> float:
+# Placeholder trailing twelve months EBITDA
+_PLACEHOLDER_TTM_EBITDA = 1750000  # $1.75M
+
+# Enterprise value would typically be calculated or estimated. For a private company,
+# this might be based on industry multiples, recent transactions, etc.
+ESTIMATED_ENTERPRISE_VALUE = 14000000  # $14M
+
+# Revenue and EBITDA for the trailing twelve months
+TTM_EBITDA_SQL: Final[str] = """
+SELECT 
+    SUM(total_revenue) as revenue,
+    (
+        SUM(total_revenue) - 
+        SUM(total_expenses) - 
+        (SELECT SUM(amount) FROM expenses WHERE category = 'overhead' AND created_at >= NOW() - INTERVAL '1 year')
+    ) as ebitda
+FROM projects
+WHERE created_at >= NOW() - INTERVAL '1 year'
+"""
+
+async def calculate_ev_multiple() -> float:
     """
     Calculate Enterprise Value Multiple.
     
@@ -785,35 +1109,95 @@ def calculate_ev_multiple() -> float:
         - Use in exit strategy planning
         - Include in investor reporting
     """
-    with Spinner("EV Multiple"):
+    async with maybe_spinner("EV Multiple"):
         try:
             # This calculation requires company valuation data
-            # SQL query to get EBITDA for trailing twelve months
-            ebitda_query = """
-            SELECT 
-                SUM(total_revenue) as revenue,
-                (
-                    SUM(total_revenue) - 
-                    SUM(total_expenses) - 
-                    (SELECT SUM(amount) FROM expenses WHERE category = 'overhead' AND created_at >= NOW() - INTERVAL '1 year')
-                ) as ebitda
-            FROM projects
-            WHERE created_at >= NOW() - INTERVAL '1 year'
-            """
-            
-            # TODO: Implement the actual database calls
-            # For now, we'll use placeholder values
-            ttm_ebitda = 1750000  # $1.75M trailing twelve months EBITDA
-            
-            # Enterprise value would typically be calculated or estimated
-            # For a private company, this might be based on industry multiples, recent transactions, etc.
-            enterprise_value = 14000000  # $14M estimated enterprise value
+            if USE_REAL_DB:
+                rows = await _execute_sql(TTM_EBITDA_SQL)
+                ttm_ebitda = float(_first_value(rows, "ebitda"))
+            else:
+                # For now, we'll use placeholder values
+                ttm_ebitda = _PLACEHOLDER_TTM_EBITDA
             
             # Calculate EV multiple
-            ev_multiple = enterprise_value / ttm_ebitda if ttm_ebitda > 0 else 0
+            ev_multiple = ESTIMATED_ENTERPRISE_VALUE / ttm_ebitda if ttm_ebitda > 0 else 0
             
             return ev_multiple
         
         except Exception as e:
-            handle_error(f"Failed to calculate Enterprise Value Multiple: {str(e)}", "scaling_metrics")
-            raise RuntimeError(f"Failed to calculate Enterprise Value Multiple: {str(e)}")
\ No newline at end of file
+            handle_error("Failed to calculate Enterprise Value Multiple: %s", "scaling_metrics", e)
+            raise RuntimeError(f"Failed to calculate Enterprise Value Multiple: {str(e)}")
+
+async def refresh_all_scaling_metrics(geography: str, location_ids: List[int] = None,
+                                      cagr_start_date: str = None, cagr_end_date: str = None) -> Dict[str, Any]:
+    """
+    Calculate every scaling metric concurrently.
+    
+    All metrics are awaited together with asyncio.gather inside one metric_batch(),
+    so their queries share execute_sql_batch round-trips and the refresh takes as
+    long as the slowest metric rather than the sum of all of them. A failing metric
+    does not fail the others; its error is reported under "errors".
+    
+    Args:
+        geography: Geographic area for market share.
+        location_ids: Locations to include location ROI for. Defaults to none.
+        cagr_start_date: Start date for revenue CAGR (YYYY-MM-DD). CAGR is only
+                         included when both dates are given.
+        cagr_end_date: End date for revenue CAGR (YYYY-MM-DD).
+        
+    Returns:
+        Dictionary with each metric keyed by name, location ROI keyed by location ID,
+        and the error message of each metric that failed under "errors".
+        
+    Integration:
+        - Add to executive dashboard as the single data source
+        - Use in scheduled KPI snapshots
+    """
+    async with Spinner("All Scaling Metrics"):
+        metrics = {
+            "market_share": calculate_market_share(geography),
+            "pipeline_velocity": calculate_pipeline_velocity(),
+            "insurance_carrier_penetration": calculate_insurance_carrier_penetration(),
+            "revenue_per_employee": calculate_revenue_per_employee(),
+            "manager_span": calculate_manager_span(),
+            "cross_location_efficiency": calculate_cross_location_efficiency(),
+            "digital_lead_conversion_rate": calculate_digital_lead_conversion_rate(),
+            "process_standardization_score": calculate_process_standardization_score(),
+            "ebitda_margin": calculate_ebitda_margin(),
+            "ev_multiple": calculate_ev_multiple()
+        }
+        if cagr_start_date and cagr_end_date:
+            metrics["revenue_cagr"] = calculate_revenue_cagr(cagr_start_date, cagr_end_date)
+        
+        location_ids = location_ids or []
+        
+        with suppress_spinners():
+            async with metric_batch():
+                results = await asyncio.gather(
+                    *metrics.values(),
+                    *(calculate_location_roi(location_id) for location_id in location_ids),
+                    return_exceptions=True
+                )
+        
+        result: Dict[str, Any] = {"location_roi": {}, "errors": {}}
+        for name, value in zip(metrics, results[:len(metrics)]):
+            if isinstance(value, Exception):
+                result["errors"][name] = str(value)
+            elif isinstance(value, DigitalConversion):
+                result[name] = value.to_dict()
+            else:
+                result[name] = value
+        for location_id, value in zip(location_ids, results[len(metrics):]):
+            if isinstance(value, Exception):
+                result["errors"][f"location_roi:{location_id}"] = str(value)
+            else:
+                result["location_roi"][location_id] = value
+        
+        return result
+
+def cache_clear() -> None:
+    """Drop every cached scaling metric, e.g. after a revenue or headcount import"""
+    calculate_market_share.cache_clear()
+    calculate_insurance_carrier_penetration.cache_clear()
+    calculate_revenue_per_employee.cache_clear()
+    calculate_revenue_cagr.cache_clear()
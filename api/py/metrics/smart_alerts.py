@@ -14,14 +14,146 @@ Alerts are categorized into:
 Each function is designed as a placeholder to be expanded with actual business logic.
 """
 
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+import functools
+from typing import Dict, Any, Optional, Tuple
 from datetime import date, datetime
 import numpy as np
 import pandas as pd
 
+# Recommended actions for each alert when it triggers
+_RED_FLAG_ACTIONS = (
+    "Immediate cost reduction",
+    "Seek emergency funding",
+    "Prioritize essential expenses"
+)
+_YELLOW_WARNING_ACTIONS = (
+    "Review marketing strategies",
+    "Analyze customer acquisition channels",
+    "Optimize customer retention"
+)
+_STRATEGY_DRIFT_ACTIONS = (
+    "Conduct strategic review",
+    "Reassess market positioning",
+    "Explore new revenue streams"
+)
+_OPS_BREACH_ACTIONS = (
+    "Implement stricter documentation protocols",
+    "Conduct team training",
+    "Review documentation processes"
+)
+_PAYMENT_ADVISORY_ACTIONS = (
+    "Negotiate payment terms with vendors",
+    "Accelerate accounts receivable collection",
+    "Prioritize critical vendor payments"
+)
+_EMPTY_ACTIONS: Tuple[str, ...] = ()
+
+# Alert thresholds, shared by the scalar trigger_* checks and evaluate_batch
+RED_FLAG_MAX_RUNWAY_DAYS = 5
+RED_FLAG_MIN_UNPAID_PAYROLL = 10000
+YELLOW_WARNING_MIN_CAC_CHANGE = 30
+TARGET_REVENUE_CAGR = 0.15
+OPS_BREACH_MAX_MISSING_DOCS = 0.10
+PAYMENT_ADVISORY_MIN_CASH = 25000
+
+# Monte Carlo draws per collections simulation, and the seed that keeps repeated
+# dashboard renders (and their cached quantiles) stable
+COLLECTIONS_SIMULATION_TRIALS = 100_000
+COLLECTIONS_SIMULATION_SEED = 42
+
+# Quantiles reported when there is no usable collections history
+_DEFAULT_COLLECTION_QUANTILES = (0.75, 0.85, 0.95)
+
+def _beta_moments(collected_ratio: np.ndarray) -> Optional[Tuple[float, float]]:
+    """Method-of-moments Beta(a, b) fit to collected/billed ratios, None if it cannot be fitted"""
+    if collected_ratio.size < 2:
+        return None
+    mean = float(collected_ratio.mean())
+    var = float(collected_ratio.var(ddof=1))
+    if var <= 0 or not 0 < mean < 1:
+        return None
+    common = mean * (1 - mean) / var - 1
+    if common <= 0:
+        return None
+    return mean * common, (1 - mean) * common
+
+@functools.lru_cache(maxsize=32)
+def _beta_quantiles(a: float, b: float, trials: int, seed: int) -> Tuple[float, float, float]:
+    """p10/p50/p90 of a vectorised Beta(a, b) Monte Carlo draw"""
+    samples = np.random.default_rng(seed).beta(a, b, size=trials)
+    p10, p50, p90 = np.quantile(samples, [0.10, 0.50, 0.90])
+    return float(p10), float(p50), float(p90)
+
+@dataclass(slots=True, frozen=True)
+class AlertResult:
+    """Fixed-layout result of one trigger_* check"""
+    triggered: bool
+    code: str
+    severity: str
+    message: str
+    recommended_actions: Tuple[str, ...] = _EMPTY_ACTIONS
+    details: Optional[Dict[str, Any]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the flat dictionary shape returned by the API"""
+        return {
+            "triggered": self.triggered,
+            "code": self.code,
+            "severity": self.severity,
+            **(self.details or {}),
+            "message": self.message,
+            "recommended_actions": list(self.recommended_actions)
+        }
+
+# Results of the checks whose output depends only on whether they triggered. They
+# are frozen, so every call shares one instance; healthy businesses mostly get the
+# NORMAL ones
+_NORMAL_RED_FLAG = AlertResult(
+    triggered=False,
+    code="RED_FLAG_CASH_PAYROLL",
+    severity="NORMAL",
+    message="No immediate risks"
+)
+_RED_FLAG = AlertResult(
+    triggered=True,
+    code="RED_FLAG_CASH_PAYROLL",
+    severity="CRITICAL",
+    message="Immediate cash and payroll intervention required",
+    recommended_actions=_RED_FLAG_ACTIONS
+)
+_NORMAL_YELLOW_WARNING = AlertResult(
+    triggered=False,
+    code="YELLOW_WARNING_CAC_CLV",
+    severity="NORMAL",
+    message="No significant risks"
+)
+_YELLOW_WARNING = AlertResult(
+    triggered=True,
+    code="YELLOW_WARNING_CAC_CLV",
+    severity="WARNING",
+    message="Customer Acquisition Cost rising without CLV improvement",
+    recommended_actions=_YELLOW_WARNING_ACTIONS
+)
+_NORMAL_PAYMENT_ADVISORY = AlertResult(
+    triggered=False,
+    code="PAYMENT_ADVISORY",
+    severity="NORMAL",
+    message="No immediate payment concerns"
+)
+_PAYMENT_ADVISORY = AlertResult(
+    triggered=True,
+    code="PAYMENT_ADVISORY",
+    severity="MEDIUM",
+    message="Potential cash flow constraint requiring payment strategy",
+    recommended_actions=_PAYMENT_ADVISORY_ACTIONS
+)
+
 class SmartAlertsEngine:
+    """Alert checks; the trigger_* methods are plain synchronous threshold tests"""
+    
     @staticmethod
-    async def trigger_red_flag(cash_runway: float, unpaid_payroll: float) -> Dict[str, Any]:
+    def trigger_red_flag(cash_runway: float, unpaid_payroll: float) -> AlertResult:
         """
         Trigger a red flag for critical business health issues
         
@@ -30,24 +162,13 @@ class SmartAlertsEngine:
             unpaid_payroll (float): Total unpaid payroll amount
         
         Returns:
-            Dict with red flag details and recommended actions
+            AlertResult with red flag details and recommended actions
         """
-        is_triggered = cash_runway < 5 and unpaid_payroll > 10000
-        
-        return {
-            "triggered": is_triggered,
-            "code": "RED_FLAG_CASH_PAYROLL",
-            "severity": "CRITICAL" if is_triggered else "NORMAL",
-            "message": "Immediate cash and payroll intervention required" if is_triggered else "No immediate risks",
-            "recommended_actions": [
-                "Immediate cost reduction",
-                "Seek emergency funding",
-                "Prioritize essential expenses"
-            ] if is_triggered else []
-        }
+        is_triggered = cash_runway < RED_FLAG_MAX_RUNWAY_DAYS and unpaid_payroll > RED_FLAG_MIN_UNPAID_PAYROLL
+        return _RED_FLAG if is_triggered else _NORMAL_RED_FLAG
 
     @staticmethod
-    async def trigger_yellow_warning(cac_change: float, clv_status: str) -> Dict[str, Any]:
+    def trigger_yellow_warning(cac_change: float, clv_status: str) -> AlertResult:
         """
         Trigger a yellow warning for potential business risks
         
@@ -56,24 +177,13 @@ class SmartAlertsEngine:
             clv_status (str): Customer Lifetime Value status
         
         Returns:
-            Dict with yellow warning details
+            AlertResult with yellow warning details
         """
-        is_triggered = cac_change > 30 and clv_status == "STABLE"
-        
-        return {
-            "triggered": is_triggered,
-            "code": "YELLOW_WARNING_CAC_CLV",
-            "severity": "WARNING" if is_triggered else "NORMAL",
-            "message": "Customer Acquisition Cost rising without CLV improvement" if is_triggered else "No significant risks",
-            "recommended_actions": [
-                "Review marketing strategies",
-                "Analyze customer acquisition channels",
-                "Optimize customer retention"
-            ] if is_triggered else []
-        }
+        is_triggered = cac_change > YELLOW_WARNING_MIN_CAC_CHANGE and clv_status == "STABLE"
+        return _YELLOW_WARNING if is_triggered else _NORMAL_YELLOW_WARNING
 
     @staticmethod
-    async def trigger_strategy_drift(revenue_cagr: float, target_period: int = 3) -> Dict[str, Any]:
+    def trigger_strategy_drift(revenue_cagr: float, target_period: int = 3) -> AlertResult:
         """
         Detect potential strategic drift based on revenue growth
         
@@ -82,27 +192,22 @@ class SmartAlertsEngine:
             target_period (int): Number of months to assess drift
         
         Returns:
-            Dict with strategy drift details
+            AlertResult with strategy drift details
         """
         # Assuming a hypothetical target CAGR of 15%
-        is_drifting = revenue_cagr < 0.15
+        is_drifting = revenue_cagr < TARGET_REVENUE_CAGR
         
-        return {
-            "triggered": is_drifting,
-            "code": "STRATEGY_DRIFT_REVENUE",
-            "severity": "STRATEGIC" if is_drifting else "NORMAL",
-            "current_cagr": revenue_cagr,
-            "target_cagr": 0.15,
-            "message": f"Revenue growth below strategic target for {target_period} months" if is_drifting else "On track",
-            "recommended_actions": [
-                "Conduct strategic review",
-                "Reassess market positioning",
-                "Explore new revenue streams"
-            ] if is_drifting else []
-        }
+        return AlertResult(
+            triggered=is_drifting,
+            code="STRATEGY_DRIFT_REVENUE",
+            severity="STRATEGIC" if is_drifting else "NORMAL",
+            message=f"Revenue growth below strategic target for {target_period} months" if is_drifting else "On track",
+            recommended_actions=_STRATEGY_DRIFT_ACTIONS if is_drifting else _EMPTY_ACTIONS,
+            details={"current_cagr": revenue_cagr, "target_cagr": TARGET_REVENUE_CAGR}
+        )
 
     @staticmethod
-    async def trigger_ops_breach(missing_docs_percentage: float) -> Dict[str, Any]:
+    def trigger_ops_breach(missing_docs_percentage: float) -> AlertResult:
         """
         Detect operational breaches based on documentation completeness
         
@@ -110,25 +215,21 @@ class SmartAlertsEngine:
             missing_docs_percentage (float): Percentage of jobs with missing documentation
         
         Returns:
-            Dict with operational breach details
+            AlertResult with operational breach details
         """
-        is_breached = missing_docs_percentage > 0.10  # 10% threshold
+        is_breached = missing_docs_percentage > OPS_BREACH_MAX_MISSING_DOCS
         
-        return {
-            "triggered": is_breached,
-            "code": "OPS_BREACH_DOCUMENTATION",
-            "severity": "HIGH" if is_breached else "NORMAL",
-            "missing_docs_percentage": missing_docs_percentage,
-            "message": "Excessive jobs missing critical documentation" if is_breached else "Documentation compliance normal",
-            "recommended_actions": [
-                "Implement stricter documentation protocols",
-                "Conduct team training",
-                "Review documentation processes"
-            ] if is_breached else []
-        }
+        return AlertResult(
+            triggered=is_breached,
+            code="OPS_BREACH_DOCUMENTATION",
+            severity="HIGH" if is_breached else "NORMAL",
+            message="Excessive jobs missing critical documentation" if is_breached else "Documentation compliance normal",
+            recommended_actions=_OPS_BREACH_ACTIONS if is_breached else _EMPTY_ACTIONS,
+            details={"missing_docs_percentage": missing_docs_percentage}
+        )
 
     @staticmethod
-    async def trigger_payment_advisory(accounts_payable: float, accounts_receivable: float, cash_balance: float) -> Dict[str, Any]:
+    def trigger_payment_advisory(accounts_payable: float, accounts_receivable: float, cash_balance: float) -> AlertResult:
         """
         Generate payment advisory based on financial metrics
         
@@ -138,40 +239,80 @@ class SmartAlertsEngine:
             cash_balance (float): Current cash balance
         
         Returns:
-            Dict with payment advisory details
+            AlertResult with payment advisory details
+        """
+        is_advisory = (accounts_payable > accounts_receivable) and (cash_balance < PAYMENT_ADVISORY_MIN_CASH)
+        return _PAYMENT_ADVISORY if is_advisory else _NORMAL_PAYMENT_ADVISORY
+
+    @staticmethod
+    def evaluate_batch(df: pd.DataFrame) -> pd.DataFrame:
         """
-        is_advisory = (accounts_payable > accounts_receivable) and (cash_balance < 25000)
+        Evaluate every trigger_* check across many companies or branches at once
         
-        return {
-            "triggered": is_advisory,
-            "code": "PAYMENT_ADVISORY",
-            "severity": "MEDIUM" if is_advisory else "NORMAL",
-            "message": "Potential cash flow constraint requiring payment strategy" if is_advisory else "No immediate payment concerns",
-            "recommended_actions": [
-                "Negotiate payment terms with vendors",
-                "Accelerate accounts receivable collection",
-                "Prioritize critical vendor payments"
-            ] if is_advisory else []
-        }
+        Each alert is one vectorised comparison per column rather than a Python
+        call per row, using the same thresholds as the scalar checks.
+        
+        Args:
+            df (pd.DataFrame): One row per company with columns cash_runway,
+                unpaid_payroll, cac_change, clv_status, revenue_cagr,
+                missing_docs_percentage, ap, ar and cash
+        
+        Returns:
+            DataFrame on the same index with boolean columns red_flag,
+            yellow_warning, strategy_drift, ops_breach and payment_advisory
+        """
+        clv_status = df["clv_status"]
+        if not isinstance(clv_status.dtype, pd.CategoricalDtype):
+            # Compares category codes instead of Python strings per row
+            clv_status = clv_status.astype("category")
+        
+        return pd.DataFrame({
+            "red_flag": (df["cash_runway"] < RED_FLAG_MAX_RUNWAY_DAYS) & (df["unpaid_payroll"] > RED_FLAG_MIN_UNPAID_PAYROLL),
+            "yellow_warning": (df["cac_change"] > YELLOW_WARNING_MIN_CAC_CHANGE) & (clv_status == "STABLE"),
+            "strategy_drift": df["revenue_cagr"] < TARGET_REVENUE_CAGR,
+            "ops_breach": df["missing_docs_percentage"] > OPS_BREACH_MAX_MISSING_DOCS,
+            "payment_advisory": (df["ap"] > df["ar"]) & (df["cash"] < PAYMENT_ADVISORY_MIN_CASH)
+        }, index=df.index)
 
     @staticmethod
     async def simulate_collections_probability(historical_data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """
         Simulate collections probability using historical data
         
+        Fits a Beta distribution to the collected/billed ratio by method of moments
+        and draws COLLECTIONS_SIMULATION_TRIALS samples in one vectorised call.
+        Quantiles are cached per fitted distribution, so repeated renders over the
+        same history skip the draw. Unlike the trigger_* checks this stays async,
+        as it will load history from the collections store when none is passed.
+        
         Args:
             historical_data (Optional[pd.DataFrame]): Historical collections data
+                with "collected" and "billed" columns
         
         Returns:
             Dict with collections probability simulation
         """
-        # Placeholder for Monte Carlo or probabilistic simulation
+        fitted = None
+        if historical_data is not None and not historical_data.empty:
+            billed = historical_data["billed"].to_numpy(dtype=np.float64)
+            collected = historical_data["collected"].to_numpy(dtype=np.float64)
+            valid = billed > 0
+            ratio = np.clip(collected[valid] / billed[valid], 0.0, 1.0)
+            fitted = _beta_moments(ratio)
+        
+        if fitted is None:
+            p10, p50, p90 = _DEFAULT_COLLECTION_QUANTILES
+        else:
+            p10, p50, p90 = _beta_quantiles(
+                fitted[0], fitted[1], COLLECTIONS_SIMULATION_TRIALS, COLLECTIONS_SIMULATION_SEED
+            )
+        
         return {
             "simulation_type": "Collections Probability",
             "confidence_intervals": {
-                "p10": 0.75,
-                "p50": 0.85,
-                "p90": 0.95
+                "p10": p10,
+                "p50": p50,
+                "p90": p90
             },
             "recommended_actions": [
                 "Monitor collection trends",
@@ -6,12 +6,87 @@ and cash position analysis for the Restoration CRM.
 """
 
 import os
-import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
 
 # Import engines and utils
-from ..utils import handle_error, Spinner, format_currency, safe_divide
+from ..utils import handle_error, maybe_spinner, format_currency, safe_divide, ttl_cache
+from ..metrics._kernels import runway_batch
+
+# A cashflow render reads the current balance several times (directly and through
+# the forecast, waterfall and summary), so balance reads are reused briefly.
+# add_cash_balance_entry clears them
+CASH_CACHE_TTL_SECONDS = 30
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Freeze a module-level array so callers cannot modify the shared buffer"""
+    array.flags.writeable = False
+    return array
+
+# Week indexes and their remainders for the default 8-week forecast, and the
+# day offsets and fluctuation for the default 90-day history, built once so the
+# common render allocates no index arrays
+_DEFAULT_WEEKS = 8
+_I_WEEKS = _read_only(np.arange(_DEFAULT_WEEKS))
+_I_WEEKS_MOD3 = _read_only(_I_WEEKS % 3)
+_I_WEEKS_MOD4 = _read_only(_I_WEEKS % 4)
+
+_DEFAULT_HISTORY_DAYS = 90
+_I_HISTORY_DAYS = _read_only(np.arange(0, _DEFAULT_HISTORY_DAYS, 7)[::-1])
+_I_HISTORY_DAYS_MOD5 = _read_only(_I_HISTORY_DAYS % 5)
+
+def _week_index(weeks: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Week indexes 0..weeks-1 with their remainders mod 3 and mod 4"""
+    if weeks == _DEFAULT_WEEKS:
+        return _I_WEEKS, _I_WEEKS_MOD3, _I_WEEKS_MOD4
+    i = np.arange(weeks)
+    return i, i % 3, i % 4
+
+def _offset_dates(start: datetime, offset_days: np.ndarray) -> List[datetime]:
+    """Add day offsets to a start time in one vector operation"""
+    return (np.datetime64(start, "us") + offset_days.astype("timedelta64[D]")).tolist()
+
+def _forecast_kernel(weeks: int, current_balance: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Weekly sample inflows, outflows, net and running balance for the cash flow forecast"""
+    i, mod3, mod4 = _week_index(weeks)
+    inflows = 15000 + (i * 500) + (mod3 * 2000)
+    outflows = 12000 + (i * 300) + (mod4 * 1500)
+    net = inflows - outflows
+    return inflows, outflows, net, current_balance + np.cumsum(net)
+
+def _waterfall_kernel(n_collections: int, n_expenses: int) -> Tuple[np.ndarray, ...]:
+    """
+    Sample collections and expenses for the cash flow waterfall
+    
+    Returns:
+        Collection amounts, probabilities and due day offsets, then expense
+        amounts and due day offsets
+    """
+    c = np.arange(n_collections)
+    e = np.arange(n_expenses)
+    return (
+        5000 + (c * 1000),
+        0.9 - (c * 0.1),  # Decreasing probability over time
+        (c * 5) + 3,      # Spread throughout the period
+        3000 + (e * 800),
+        (e * 4) + 2
+    )
+
+# The cached loaders below raise on failure rather than returning a fallback, so
+# ttl_cache never stores an error result; the public wrappers catch and fall back
+
+@ttl_cache(CASH_CACHE_TTL_SECONDS)
+def _load_cash_balance() -> float:
+    """Most recent cash balance entry (cached; raises on failure)"""
+    with maybe_spinner("Cash Balance"):
+        # In a real implementation, this would query the database
+        # Always order by date DESC, id DESC to get the most recent entry
+        # For now, we'll just return sample data
+        return 45000.00
 
 def get_current_cash_balance():
     """
@@ -20,58 +95,62 @@ def get_current_cash_balance():
     Returns:
         Float representing the current cash balance
     """
-    with Spinner("Cash Balance"):
-        try:
-            # In a real implementation, this would query the database
-            # Always order by date DESC, id DESC to get the most recent entry
-            # For now, we'll just return sample data
-            return 45000.00
-        except Exception as e:
-            handle_error(f"Failed to get current cash balance: {str(e)}", "cashflow_module")
-            return 0.0
+    try:
+        return _load_cash_balance()
+    except Exception as e:
+        handle_error("Failed to get current cash balance: %s", "cashflow_module", e)
+        return 0.0
 
-def get_cash_balance_history(days: int = 90) -> List[Dict]:
+def _build_history(days: int, now: datetime) -> pd.DataFrame:
+    """Sample weekly cash balances for the last `days` days up to `now`, oldest first"""
+    # Weekly data points, i days ago, oldest first so no sort is needed
+    if days == _DEFAULT_HISTORY_DAYS:
+        i, mod5 = _I_HISTORY_DAYS, _I_HISTORY_DAYS_MOD5
+    else:
+        i = np.arange(0, days, 7)[::-1]
+        mod5 = i % 5
+    
+    # Generate a somewhat realistic balance that trends upward
+    base = 30000
+    growth = 15000 * (1 - (i / days))
+    fluctuation = mod5 * 1000
+    
+    return pd.DataFrame({
+        "date": np.datetime64(now, "us") - i.astype("timedelta64[D]"),
+        "balance": base + growth + fluctuation,
+        "notes": "Historical balance"
+    })
+
+@ttl_cache(CASH_CACHE_TTL_SECONDS, copy_results=True)
+def _load_cash_balance_history(days: int, now: Optional[datetime]) -> pd.DataFrame:
+    """Sample cash balance history (cached per days/now; raises on failure)"""
+    with maybe_spinner("Cash History"):
+        # In a real implementation, this would query the database
+        # Always order by date DESC, id DESC for consistency
+        # For now, we'll just return sample data
+        if now is None:
+            now = datetime.now()
+        
+        return _build_history(days, now)
+
+def get_cash_balance_history(days: int = 90, now: datetime = None) -> pd.DataFrame:
     """
     Get cash balance history for the specified number of days
     
     Args:
         days: Number of days of history to retrieve
+        now: Reference time the history ends at. Defaults to the current time.
+             Leave unset for cache hits, since the cache is keyed on it.
         
     Returns:
-        List of cash balance entries with date and amount
+        DataFrame of cash balance entries in chronological order, with date,
+        balance and notes columns
     """
-    with Spinner("Cash History"):
-        try:
-            # In a real implementation, this would query the database
-            # Always order by date DESC, id DESC for consistency
-            # For now, we'll just return sample data
-            
-            history = []
-            now = datetime.now()
-            
-            # Generate some sample data points
-            for i in range(0, days, 7):  # Weekly data points
-                date = now - timedelta(days=i)
-                
-                # Generate a somewhat realistic balance that trends upward
-                base = 30000
-                growth = 15000 * (1 - (i / days))
-                fluctuation = (i % 5) * 1000
-                
-                balance = base + growth + fluctuation
-                
-                history.append({
-                    "date": date,
-                    "balance": balance,
-                    "notes": "Historical balance"
-                })
-            
-            # Return in chronological order
-            return sorted(history, key=lambda x: x["date"])
-        
-        except Exception as e:
-            handle_error(f"Failed to get cash balance history: {str(e)}", "cashflow_module")
-            return []
+    try:
+        return _load_cash_balance_history(days, now)
+    except Exception as e:
+        handle_error("Failed to get cash balance history: %s", "cashflow_module", e)
+        return pd.DataFrame(columns=["date", "balance", "notes"])
 
 def add_cash_balance_entry(amount: float, date: datetime, notes: str = "") -> Dict:
     """
@@ -87,29 +166,56 @@ def add_cash_balance_entry(amount: float, date: datetime, notes: str = "") -> Di
     """
     try:
         # In a real implementation, this would insert into the database
+        cache_clear()
         return {
             "status": "success",
             "message": "Cash balance entry added successfully",
             "id": 123  # Mock ID
         }
     except Exception as e:
-        handle_error(f"Failed to add cash balance entry: {str(e)}", "cashflow_module")
+        handle_error("Failed to add cash balance entry: %s", "cashflow_module", e)
         return {
             "status": "error",
             "message": f"Failed to add cash balance entry: {str(e)}"
         }
 
-def get_cash_flow_forecast(weeks: int = 8) -> Dict:
+def _build_forecast(weeks: int, now: datetime, current_balance: float) -> List[Dict]:
+    """Sample weekly forecast rows starting at `now` from the current balance"""
+    i = _week_index(weeks)[0]
+    week_starts = _offset_dates(now, i * 7)
+    week_ends = _offset_dates(now, i * 7 + 6)
+    
+    # Generate sample inflows and outflows with net and running balance
+    inflows, outflows, net, balances = _forecast_kernel(weeks, current_balance)
+    
+    return [
+        {
+            "week": f"Week {week + 1}",
+            "week_start": week_start,
+            "week_end": week_end,
+            "inflows": inflow,
+            "outflows": outflow,
+            "net": week_net,
+            "balance": balance
+        }
+        for week, week_start, week_end, inflow, outflow, week_net, balance in zip(
+            range(weeks), week_starts, week_ends,
+            inflows.tolist(), outflows.tolist(), net.tolist(), balances.tolist()
+        )
+    ]
+
+def get_cash_flow_forecast(weeks: int = 8, now: datetime = None) -> Dict:
     """
     Generate a cash flow forecast for the specified number of weeks
     
     Args:
         weeks: Number of weeks to forecast
+        now: Reference time the forecast starts at. Defaults to the current time.
         
     Returns:
         Dictionary with forecast data
     """
-    with Spinner("Cash Flow Forecast"):
+    with maybe_spinner("Cash Flow Forecast"):
         try:
             # Get current cash balance
             current_balance = get_current_cash_balance()
@@ -119,31 +225,9 @@ def get_cash_flow_forecast(weeks: int = 8) -> Dict:
             # For now, we'll just generate sample data
             
             # Generate weekly forecast data
-            forecast = []
-            running_balance = current_balance
-            now = datetime.now()
-            
-            for i in range(weeks):
-                week_start = now + timedelta(weeks=i)
-                week_end = week_start + timedelta(days=6)
-                
-                # Generate some sample inflows and outflows
-                inflows = 15000 + (i * 500) + ((i % 3) * 2000)
-                outflows = 12000 + (i * 300) + ((i % 4) * 1500)
-                
-                # Calculate net and running balance
-                net = inflows - outflows
-                running_balance += net
-                
-                forecast.append({
-                    "week": f"Week {i+1}",
-                    "week_start": week_start,
-                    "week_end": week_end,
-                    "inflows": inflows,
-                    "outflows": outflows,
-                    "net": net,
-                    "balance": running_balance
-                })
+            if now is None:
+                now = datetime.now()
+            forecast = _build_forecast(weeks, now, current_balance)
             
             return {
                 "current_balance": current_balance,
@@ -152,24 +236,25 @@ def get_cash_flow_forecast(weeks: int = 8) -> Dict:
             }
         
         except Exception as e:
-            handle_error(f"Failed to generate cash flow forecast: {str(e)}", "cashflow_module")
+            handle_error("Failed to generate cash flow forecast: %s", "cashflow_module", e)
             return {
                 "current_balance": 0,
                 "forecast": [],
                 "weeks": weeks
             }
 
-def get_cash_flow_waterfall(days: int = 30) -> Dict:
+def get_cash_flow_waterfall(days: int = 30, now: datetime = None) -> Dict:
     """
     Generate a cash flow waterfall for the specified number of days
     
     Args:
         days: Number of days for the waterfall
+        now: Reference time due dates are counted from. Defaults to the current time.
         
     Returns:
         Dictionary with waterfall data
     """
-    with Spinner("Cash Flow Waterfall"):
+    with maybe_spinner("Cash Flow Waterfall"):
         try:
             # Get current cash balance
             current_balance = get_current_cash_balance()
@@ -177,30 +262,45 @@ def get_cash_flow_waterfall(days: int = 30) -> Dict:
             # In a real implementation, this would query pending collections and expenses
             # from the database with consistent date+id ordering by due date
             # For now, we'll just generate sample data
+            if now is None:
+                now = datetime.now()
+            
+            (collection_amounts, collection_probabilities, collection_due_days,
+             expense_amounts, expense_due_days) = _waterfall_kernel(5, 7)
             
             # Generate collections data
-            collections = []
-            for i in range(5):
-                due_day = (i * 5) + 3  # Spread throughout the period
-                collections.append({
-                    "id": i + 1,
-                    "description": f"Collection {i+1}",
-                    "amount": 5000 + (i * 1000),
-                    "due_date": datetime.now() + timedelta(days=due_day),
-                    "probability": 0.9 - (i * 0.1)  # Decreasing probability over time
-                })
+            collection_due_dates = _offset_dates(now, collection_due_days)
+            collections = [
+                {
+                    "id": n + 1,
+                    "description": f"Collection {n+1}",
+                    "amount": amount,
+                    "due_date": due_date,
+                    "probability": probability
+                }
+                for n, amount, due_date, probability in zip(
+                    range(len(collection_amounts)), collection_amounts.tolist(), collection_due_dates,
+                    collection_probabilities.tolist()
+                )
+            ]
             
             # Generate expenses data
-            expenses = []
-            for i in range(7):
-                due_day = (i * 4) + 2  # Spread throughout the period
-                expenses.append({
-                    "id": i + 1,
-                    "description": f"Expense {i+1}",
-                    "amount": 3000 + (i * 800),
-                    "due_date": datetime.now() + timedelta(days=due_day),
-                    "urgency": "high" if i < 2 else ("medium" if i < 5 else "low")
-                })
+            i = np.arange(len(expense_amounts))
+            expense_due_dates = _offset_dates(now, expense_due_days)
+            expense_urgencies = np.where(i < 2, "high", np.where(i < 5, "medium", "low"))
+            expenses = [
+                {
+                    "id": n + 1,
+                    "description": f"Expense {n+1}",
+                    "amount": amount,
+                    "due_date": due_date,
+                    "urgency": urgency
+                }
+                for n, amount, due_date, urgency in zip(
+                    range(len(i)), expense_amounts.tolist(), expense_due_dates,
+                    expense_urgencies.tolist()
+                )
+            ]
             
             # Calculate waterfall points
             waterfall = []
@@ -214,10 +314,7 @@ def get_cash_flow_waterfall(days: int = 30) -> Dict:
             })
             
             # Add expected inflows (collections)
-            total_inflows = 0
-            for collection in collections:
-                expected_value = collection["amount"] * collection["probability"]
-                total_inflows += expected_value
+            total_inflows = float(collection_amounts @ collection_probabilities)
             
             waterfall.append({
                 "name": "Expected Inflows",
@@ -228,7 +325,7 @@ def get_cash_flow_waterfall(days: int = 30) -> Dict:
             running_balance += total_inflows
             
             # Add expected outflows (expenses)
-            total_outflows = sum(expense["amount"] for expense in expenses)
+            total_outflows = expense_amounts.sum().item()
             
             waterfall.append({
                 "name": "Expected Outflows",
@@ -254,7 +351,7 @@ def get_cash_flow_waterfall(days: int = 30) -> Dict:
             }
         
         except Exception as e:
-            handle_error(f"Failed to generate cash flow waterfall: {str(e)}", "cashflow_module")
+            handle_error("Failed to generate cash flow waterfall: %s", "cashflow_module", e)
             return {
                 "current_balance": 0,
                 "waterfall": [],
@@ -267,22 +364,60 @@ def calculate_runway(cash_balance: float, burn_rate: float) -> float:
     """
     Calculate cash runway in weeks
     
+    Arrays of balances and burn rates (per company or scenario) are evaluated in
+    one vectorised pass.
+    
     Args:
         cash_balance: Current cash balance
         burn_rate: Weekly cash burn rate
         
     Returns:
-        Number of weeks of runway
+        Number of weeks of runway, or an array of them for array inputs
     """
     try:
+        if isinstance(cash_balance, np.ndarray) or isinstance(burn_rate, np.ndarray):
+            return runway_batch(cash_balance, burn_rate)
+        
         if burn_rate <= 0:
             return float('inf')  # Infinite runway if burn rate is zero or negative
         
         return cash_balance / burn_rate
     except Exception as e:
-        handle_error(f"Failed to calculate runway: {str(e)}", "cashflow_module")
+        handle_error("Failed to calculate runway: %s", "cashflow_module", e)
         return 0.0
 
+@ttl_cache(CASH_CACHE_TTL_SECONDS, copy_results=True)
+def _load_cash_position_summary() -> Dict:
+    """Cash position summary (cached; raises on failure)"""
+    with maybe_spinner("Cash Position Summary"):
+        # Get current cash balance with proper ordering. Uses the raising loader so
+        # a failed balance read isn't summarised and cached as a zero balance
+        current_balance = _load_cash_balance()
+        
+        # In a real implementation, this would query the database
+        # For now, we'll just return sample data
+        
+        # Calculate cash metrics
+        avg_weekly_burn = 12500
+        runway_weeks = calculate_runway(current_balance, avg_weekly_burn)
+        
+        # Get pending inflows and outflows
+        pending_inflows = 25000
+        pending_outflows = 18000
+        
+        # Calculate projected balance
+        projected_balance = current_balance + pending_inflows - pending_outflows
+        
+        return {
+            "current_balance": current_balance,
+            "avg_weekly_burn": avg_weekly_burn,
+            "runway_weeks": runway_weeks,
+            "pending_inflows": pending_inflows,
+            "pending_outflows": pending_outflows,
+            "projected_balance": projected_balance,
+            "cash_status": "healthy" if runway_weeks > 8 else ("warning" if runway_weeks > 4 else "critical")
+        }
+
 def get_cash_position_summary() -> Dict:
     """
     Get a summary of the current cash position
@@ -290,61 +425,63 @@ def get_cash_position_summary() -> Dict:
     Returns:
         Dictionary with cash position summary data
     """
-    with Spinner("Cash Position Summary"):
-        try:
-            # Get current cash balance with proper ordering
-            current_balance = get_current_cash_balance()
-            
-            # In a real implementation, this would query the database
-            # For now, we'll just return sample data
-            
-            # Calculate cash metrics
-            avg_weekly_burn = 12500
-            runway_weeks = calculate_runway(current_balance, avg_weekly_burn)
-            
-            # Get pending inflows and outflows
-            pending_inflows = 25000
-            pending_outflows = 18000
-            
-            # Calculate projected balance
-            projected_balance = current_balance + pending_inflows - pending_outflows
-            
-            return {
-                "current_balance": current_balance,
-                "avg_weekly_burn": avg_weekly_burn,
-                "runway_weeks": runway_weeks,
-                "pending_inflows": pending_inflows,
-                "pending_outflows": pending_outflows,
-                "projected_balance": projected_balance,
-                "cash_status": "healthy" if runway_weeks > 8 else ("warning" if runway_weeks > 4 else "critical")
-            }
-        
-        except Exception as e:
-            handle_error(f"Failed to get cash position summary: {str(e)}", "cashflow_module")
-            return {}
+    try:
+        return _load_cash_position_summary()
+    except Exception as e:
+        handle_error("Failed to get cash position summary: %s", "cashflow_module", e)
+        return {}
 
 # Main function to render the cashflow module
 def render_cashflow(context=None):
     """Main function to render the cashflow module in a web context"""
     try:
-        # Get cash position summary
-        summary = get_cash_position_summary()
+        # Read the balance once up front so the sections below share the cached value
+        get_current_cash_balance()
         
-        # Get cash flow forecast
-        forecast = get_cash_flow_forecast()
+        # One reference time for the whole render. History keeps its default so it
+        # stays a cache hit across renders
+        now = datetime.now()
         
-        # Get cash flow waterfall
-        waterfall = get_cash_flow_waterfall()
+        # Each section is an independent database read, so fetch them concurrently
+        sections = (
+            ("summary", get_cash_position_summary, {}),
+            ("forecast", get_cash_flow_forecast, {"now": now}),
+            ("waterfall", get_cash_flow_waterfall, {"now": now}),
+            ("history", get_cash_balance_history, {})
+        )
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            futures = {name: executor.submit(section, **kwargs) for name, section, kwargs in sections}
+            result = {name: future.result() for name, future in futures.items()}
         
-        # Get cash balance history
-        history = get_cash_balance_history()
-        
-        return {
-            "summary": summary,
-            "forecast": forecast,
-            "waterfall": waterfall,
-            "history": history
-        }
+        # Records only at the serialization boundary
+        result["history"] = result["history"].to_dict("records")
+        return result
     except Exception as e:
-        handle_error(f"Failed to render cashflow module: {str(e)}", "cashflow_module")
-        return {"error": str(e)}
\ No newline at end of file
+        handle_error("Failed to render cashflow module: %s", "cashflow_module", e)
+        return {"error": str(e)}
+
+def _json_default(value: Any) -> Any:
+    """orjson fallback for the pandas timestamps in the history records"""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def render_cashflow_json(context=None) -> bytes:
+    """
+    Render the cashflow module as a JSON response body
+    
+    Serializes with orjson, which handles the datetimes and NumPy values in the
+    render directly, so a route can return it as
+    ``Response(content=render_cashflow_json(), media_type="application/json")``
+    without re-encoding it through jsonable_encoder.
+    
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    return orjson.dumps(render_cashflow(context), default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def cache_clear() -> None:
+    """Drop cached cash balance reads, e.g. after a new balance entry"""
+    _load_cash_balance.cache_clear()
+    _load_cash_balance_history.cache_clear()
+    _load_cash_position_summary.cache_clear()
@@ -8,18 +8,85 @@ and DSO calculations for the Restoration CRM.
 import os
 import json
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
+import numpy as np
+import pandas as pd
 
 # Import engines and utils
 from ..engines.timeline_ap import get_ap_recommendations
 from ..utils import handle_error, Spinner, format_currency, safe_divide
 
-def get_all_collections(filters=None):
+# Sample collections in columnar form, with dates as day offsets from now
+# (NaN where a collection has not been received yet)
+_SAMPLE_COLLECTIONS = pd.DataFrame({
+    "id": np.array([1, 2, 3, 4, 5], dtype=np.int32),
+    "project_id": np.array([1, 1, 2, 2, 2], dtype=np.int32),
+    "description": ["Initial Payment", "Final Payment", "Initial Payment", "Progress Payment", "Final Payment"],
+    "amount": np.array([6250.00, 6250.00, 9583.33, 9583.33, 9583.34], dtype=np.float64),
+    "expected_offset_days": [-20, 10, -30, -10, 20],
+    "status": pd.Categorical(["received", "pending", "received", "received", "pending"],
+                             categories=["pending", "received"]),
+    "actual_offset_days": [-20, np.nan, -32, -9, np.nan],
+    "confidence_percentage": np.array([100, 90, 100, 100, 75], dtype=np.int8),
+    "project_name": ["Smith Water Damage", "Smith Water Damage", "Doe Fire Damage", "Doe Fire Damage", "Doe Fire Damage"],
+    "customer_name": ["John Smith", "John Smith", "Jane Doe", "Jane Doe", "Jane Doe"]
+})
+
+# Aging buckets and their lower bounds in days past the expected date. Collections
+# not yet due (or due now) fall below the first edge and count as current
+_AGING_BUCKETS = ("current", "1_30", "31_60", "61_90", "90_plus")
+_AGING_EDGES = np.array([0, 31, 61, 91])
+
+# Columns of a collection record, in API order
+_COLLECTION_COLUMNS = (
+    "id", "project_id", "description", "amount", "expected_date", "status",
+    "actual_date", "confidence_percentage", "project_name", "customer_name"
+)
+
+@lru_cache(maxsize=4)
+def _collections_frame(now: datetime) -> pd.DataFrame:
+    """
+    Sample collections as a typed DataFrame with dates resolved against now
+    
+    Memoized, so callers pass a minute-resolution anchor (see _sample_anchor)
+    and must treat the returned frame as read-only.
+    """
+    anchor = pd.Timestamp(now)
+    df = _SAMPLE_COLLECTIONS.assign(
+        expected_date=anchor + pd.to_timedelta(_SAMPLE_COLLECTIONS["expected_offset_days"], unit="D"),
+        actual_date=anchor + pd.to_timedelta(_SAMPLE_COLLECTIONS["actual_offset_days"], unit="D")
+    )
+    return df[list(_COLLECTION_COLUMNS)]
+
+def _to_records(df: pd.DataFrame) -> List[Dict]:
+    """Convert a collections frame to API records, with datetimes and None for missing dates"""
+    columns = []
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if np.issubdtype(values.dtype, np.datetime64):
+            # Microsecond datetime64 converts to datetime objects, and NaT to None
+            values = values.astype("datetime64[us]")
+        columns.append(values.tolist())
+    return [dict(zip(df.columns, row)) for row in zip(*columns)]
+
+def _sample_anchor() -> datetime:
+    """Current time truncated to the minute, the cache key for _collections_frame"""
+    return datetime.now().replace(second=0, microsecond=0)
+
+def _snapshot(collections: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Return the given collections snapshot, or the cached one for this minute"""
+    if collections is not None:
+        return collections
+    return _collections_frame(_sample_anchor())
+
+def get_all_collections(filters=None, collections: Optional[pd.DataFrame] = None):
     """
     Get all collections with optional filtering
     
     Args:
         filters: Optional dict of filter parameters
+        collections: Optional collections snapshot to filter instead of building one
         
     Returns:
         List of collection objects
@@ -29,99 +96,34 @@ def get_all_collections(filters=None):
             # In a real implementation, this would query the database
             # For now, we'll just return sample data
             
-            collections = [
-                {
-                    "id": 1,
-                    "project_id": 1,
-                    "description": "Initial Payment",
-                    "amount": 6250.00,
-                    "expected_date": datetime.now() - timedelta(days=20),
-                    "status": "received",
-                    "actual_date": datetime.now() - timedelta(days=20),
-                    "confidence_percentage": 100,
-                    "project_name": "Smith Water Damage",
-                    "customer_name": "John Smith"
-                },
-                {
-                    "id": 2,
-                    "project_id": 1,
-                    "description": "Final Payment",
-                    "amount": 6250.00,
-                    "expected_date": datetime.now() + timedelta(days=10),
-                    "status": "pending",
-                    "actual_date": None,
-                    "confidence_percentage": 90,
-                    "project_name": "Smith Water Damage",
-                    "customer_name": "John Smith"
-                },
-                {
-                    "id": 3,
-                    "project_id": 2,
-                    "description": "Initial Payment",
-                    "amount": 9583.33,
-                    "expected_date": datetime.now() - timedelta(days=30),
-                    "status": "received",
-                    "actual_date": datetime.now() - timedelta(days=32),
-                    "confidence_percentage": 100,
-                    "project_name": "Doe Fire Damage",
-                    "customer_name": "Jane Doe"
-                },
-                {
-                    "id": 4,
-                    "project_id": 2,
-                    "description": "Progress Payment",
-                    "amount": 9583.33,
-                    "expected_date": datetime.now() - timedelta(days=10),
-                    "status": "received",
-                    "actual_date": datetime.now() - timedelta(days=9),
-                    "confidence_percentage": 100,
-                    "project_name": "Doe Fire Damage",
-                    "customer_name": "Jane Doe"
-                },
-                {
-                    "id": 5,
-                    "project_id": 2,
-                    "description": "Final Payment",
-                    "amount": 9583.34,
-                    "expected_date": datetime.now() + timedelta(days=20),
-                    "status": "pending",
-                    "actual_date": None,
-                    "confidence_percentage": 75,
-                    "project_name": "Doe Fire Damage",
-                    "customer_name": "Jane Doe"
-                }
-            ]
+            df = _snapshot(collections)
             
-            # Apply filters if provided
+            # Apply filters if provided, as one boolean mask over the columns
             if filters:
-                filtered_collections = []
-                for collection in collections:
-                    include = True
-                    
-                    # Filter by status
-                    if 'status' in filters and collection['status'] != filters['status']:
-                        include = False
-                    
-                    # Filter by date range
-                    if 'start_date' in filters and collection['expected_date'] < filters['start_date']:
-                        include = False
-                    if 'end_date' in filters and collection['expected_date'] > filters['end_date']:
-                        include = False
-                    
-                    # Filter by project
-                    if 'project_id' in filters and collection['project_id'] != filters['project_id']:
-                        include = False
-                    
-                    # Filter by confidence
-                    if 'min_confidence' in filters and collection['confidence_percentage'] < filters['min_confidence']:
-                        include = False
-                    
-                    if include:
-                        filtered_collections.append(collection)
+                mask = np.ones(len(df), dtype=bool)
+                
+                # Filter by status (categorical, so this compares category codes)
+                if 'status' in filters:
+                    mask &= (df["status"] == filters['status']).to_numpy()
+                
+                # Filter by date range
+                expected_dates = df["expected_date"].to_numpy()
+                if 'start_date' in filters:
+                    mask &= expected_dates >= np.datetime64(filters['start_date'])
+                if 'end_date' in filters:
+                    mask &= expected_dates <= np.datetime64(filters['end_date'])
                 
-                return filtered_collections
+                # Filter by project
+                if 'project_id' in filters:
+                    mask &= df["project_id"].to_numpy() == filters['project_id']
+                
+                # Filter by confidence
+                if 'min_confidence' in filters:
+                    mask &= df["confidence_percentage"].to_numpy() >= filters['min_confidence']
+                
+                df = df[mask]
             
-            return collections
+            return _to_records(df)
         
         except Exception as e:
             handle_error(f"Failed to get collections: {str(e)}", "collections_module")
@@ -198,16 +200,20 @@ def delete_collection(id):
             "message": f"Failed to delete collection: {str(e)}"
         }
 
-def get_collection_status_summary():
+def get_collection_status_summary(collections: Optional[pd.DataFrame] = None):
     """
     Get summary of collections by status
     
+    Args:
+        collections: Optional collections snapshot shared with other helpers
+        
     Returns:
         Dictionary with counts and amounts by status
     """
     with Spinner("Collection Summary"):
         try:
-            collections = get_all_collections()
+            now = datetime.now()
+            df = _snapshot(collections)
             
             # Initialize summary
             summary = {
@@ -217,23 +223,18 @@ def get_collection_status_summary():
                 "total": {"count": 0, "amount": 0}
             }
             
-            # Calculate summary
-            now = datetime.now()
-            for collection in collections:
-                status = collection["status"]
-                
-                # Check if pending and overdue
-                if status == "pending" and collection["expected_date"] < now:
-                    status = "overdue"
-                
-                # Increment counts and amounts
-                if status in summary:
-                    summary[status]["count"] += 1
-                    summary[status]["amount"] += collection["amount"]
-                
-                # Add to total
-                summary["total"]["count"] += 1
-                summary["total"]["amount"] += collection["amount"]
+            # Reclassify pending collections past their expected date as overdue
+            status = df["status"].to_numpy(dtype=object)
+            overdue = (status == "pending") & (df["expected_date"].to_numpy() < np.datetime64(now))
+            effective_status = np.where(overdue, "overdue", status)
+            
+            # Count and total per status in one groupby
+            grouped = df["amount"].groupby(effective_status).agg(["count", "sum"])
+            for name, count, amount in grouped.itertuples():
+                if name in summary:
+                    summary[name] = {"count": int(count), "amount": float(amount)}
+            
+            summary["total"] = {"count": len(df), "amount": float(df["amount"].sum())}
             
             return summary
         
@@ -241,51 +242,41 @@ def get_collection_status_summary():
             handle_error(f"Failed to get collection status summary: {str(e)}", "collections_module")
             return {}
 
-def get_aging_analysis():
+def get_aging_analysis(collections: Optional[pd.DataFrame] = None):
     """
     Get aging analysis of collections
     
+    Args:
+        collections: Optional collections snapshot shared with other helpers
+        
     Returns:
         Dictionary with aging buckets and amounts
     """
     with Spinner("Aging Analysis"):
         try:
-            collections = get_all_collections({"status": "pending"})
+            now = datetime.now()
+            df = _snapshot(collections)
+            pending = df[(df["status"] == "pending").to_numpy()]
+            amounts = pending["amount"].to_numpy()
+            
+            # Whole days past the expected date, -1 for collections not yet overdue
+            overdue_by = np.datetime64(now) - pending["expected_date"].to_numpy()
+            days_diff = np.where(
+                overdue_by > np.timedelta64(0),
+                overdue_by // np.timedelta64(1, "D"),
+                -1
+            )
+            
+            # Bucket every collection at once, then count and total per bucket
+            bucket_idx = np.digitize(days_diff, _AGING_EDGES)
+            counts = np.bincount(bucket_idx, minlength=len(_AGING_BUCKETS))
+            bucket_amounts = np.bincount(bucket_idx, weights=amounts, minlength=len(_AGING_BUCKETS))
             
-            # Initialize aging buckets
             aging = {
-                "current": {"count": 0, "amount": 0},
-                "1_30": {"count": 0, "amount": 0},
-                "31_60": {"count": 0, "amount": 0},
-                "61_90": {"count": 0, "amount": 0},
-                "90_plus": {"count": 0, "amount": 0},
-                "total": {"count": 0, "amount": 0}
+                bucket: {"count": count, "amount": amount}
+                for bucket, count, amount in zip(_AGING_BUCKETS, counts.tolist(), bucket_amounts.tolist())
             }
-            
-            # Calculate aging
-            now = datetime.now()
-            for collection in collections:
-                expected_date = collection["expected_date"]
-                days_diff = (now - expected_date).days if expected_date < now else -1
-                
-                # Determine bucket
-                bucket = "current"
-                if days_diff >= 0 and days_diff <= 30:
-                    bucket = "1_30"
-                elif days_diff > 30 and days_diff <= 60:
-                    bucket = "31_60"
-                elif days_diff > 60 and days_diff <= 90:
-                    bucket = "61_90"
-                elif days_diff > 90:
-                    bucket = "90_plus"
-                
-                # Increment counts and amounts
-                aging[bucket]["count"] += 1
-                aging[bucket]["amount"] += collection["amount"]
-                
-                # Add to total
-                aging["total"]["count"] += 1
-                aging["total"]["amount"] += collection["amount"]
+            aging["total"] = {"count": len(pending), "amount": float(amounts.sum())}
             
             return aging
         
@@ -293,10 +284,13 @@ def get_aging_analysis():
             handle_error(f"Failed to get aging analysis: {str(e)}", "collections_module")
             return {}
 
-def calculate_days_sales_outstanding():
+def calculate_days_sales_outstanding(collections: Optional[pd.DataFrame] = None):
     """
     Calculate the Days Sales Outstanding (DSO) using real period instead of fixed 30 days
     
+    Args:
+        collections: Optional collections snapshot shared with other helpers
+        
     Returns:
         The DSO value (float)
     """
@@ -308,30 +302,29 @@ def calculate_days_sales_outstanding():
             
             # In a real implementation, this would query the database
             # For now, we'll use our sample data
-            collections = get_all_collections()
+            df = _snapshot(collections)
+            status = df["status"]
+            actual_dates = df["actual_date"].to_numpy()
+            amounts = df["amount"].to_numpy()
             
-            # Filter to received collections within period
-            paid_collections = [c for c in collections if c["status"] == "received" and c["actual_date"] >= start_date]
+            # Received collections within period (NaT actual dates never match)
+            paid_mask = (status == "received").to_numpy() & (actual_dates >= np.datetime64(start_date))
             
-            if not paid_collections:
+            if not paid_mask.any():
                 handle_error("No paid collections found in the last 90 days", "collections_module")
                 return 0
             
             # Calculate the real period by finding earliest and latest payment dates
-            dates = [c["actual_date"] for c in paid_collections]
-            earliest_date = min(dates)
-            latest_date = max(dates)
-            
-            real_period_days = (latest_date - earliest_date).days
+            paid_dates = actual_dates[paid_mask]
+            real_period_days = int((paid_dates.max() - paid_dates.min()) // np.timedelta64(1, "D"))
             if real_period_days <= 0:
                 real_period_days = 1  # Avoid division by zero
             
             # Calculate total revenue in the period
-            total_revenue = sum(c["amount"] for c in paid_collections)
+            total_revenue = float(amounts[paid_mask].sum())
             
             # Get current accounts receivable (pending collections)
-            pending_collections = [c for c in collections if c["status"] == "pending"]
-            accounts_receivable = sum(c["amount"] for c in pending_collections)
+            accounts_receivable = float(amounts[(status == "pending").to_numpy()].sum())
             
             # Calculate average daily revenue based on real period
             daily_revenue = total_revenue / real_period_days
@@ -348,12 +341,13 @@ def calculate_days_sales_outstanding():
             handle_error(f"Failed to calculate DSO: {str(e)}", "collections_module")
             return 0
 
-def get_expected_inflows(days=90):
+def get_expected_inflows(days=90, collections: Optional[pd.DataFrame] = None):
     """
     Get expected cash inflows for the specified number of days
     
     Args:
         days: Number of days to forecast
+        collections: Optional collections snapshot shared with other helpers
         
     Returns:
         List of expected inflows with dates and amounts
@@ -361,7 +355,7 @@ def get_expected_inflows(days=90):
     with Spinner("Expected Inflows"):
         try:
             # Get pending collections
-            collections = get_all_collections({"status": "pending"})
+            collections = get_all_collections({"status": "pending"}, collections)
             
             # Filter to collections within forecast period
             end_date = datetime.now() + timedelta(days=days)
@@ -393,16 +387,20 @@ def get_expected_inflows(days=90):
             handle_error(f"Failed to get expected inflows: {str(e)}", "collections_module")
             return []
 
-def get_collection_metrics():
+def get_collection_metrics(collections: Optional[pd.DataFrame] = None):
     """
     Get collection performance metrics
     
+    Args:
+        collections: Optional collections snapshot shared with other helpers
+        
     Returns:
         Dictionary with collection metrics
     """
     with Spinner("Collection Metrics"):
         try:
-            collections = get_all_collections()
+            snapshot = _snapshot(collections)
+            collections = _to_records(snapshot)
             
             # Filter to received collections
             received = [c for c in collections if c["status"] == "received"]
@@ -436,7 +434,7 @@ def get_collection_metrics():
             on_time_percentage = (on_time_count / len(received)) * 100
             
             # Calculate DSO using real period
-            dso = calculate_days_sales_outstanding()
+            dso = calculate_days_sales_outstanding(snapshot)
             
             # Calculate totals
             total_collected = sum(c["amount"] for c in received)
@@ -458,20 +456,23 @@ def get_collection_metrics():
 def render_collections(context=None):
     """Main function to render the collections module in a web context"""
     try:
+        # Build the collections snapshot once and share it with every helper
+        snapshot = _collections_frame(_sample_anchor())
+        
         # Get collection data
-        collections = get_all_collections()
+        collections = get_all_collections(collections=snapshot)
         
         # Get collection status summary
-        status_summary = get_collection_status_summary()
+        status_summary = get_collection_status_summary(snapshot)
         
         # Get aging analysis
-        aging = get_aging_analysis()
+        aging = get_aging_analysis(snapshot)
         
         # Get collection metrics
-        metrics = get_collection_metrics()
+        metrics = get_collection_metrics(snapshot)
         
         # Get expected inflows
-        inflows = get_expected_inflows()
+        inflows = get_expected_inflows(collections=snapshot)
         
         # Get timeline-based AP recommendations
         # This is a key change - using the new timeline engine instead of weighted-score
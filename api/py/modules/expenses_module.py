@@ -11,9 +11,11 @@ from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 import httpx
 import asyncio
+import numpy as np
 
 # Import utils
-from api.py.utils import handle_error, Spinner, format_currency, safe_divide
+from ..utils import handle_error, Spinner, format_currency, safe_divide
+from ..db.client import get_client
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +23,13 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# Auth headers for every PostgREST request; the shared client sets no defaults
+_HEADERS = {
+    "apikey": SUPABASE_ANON_KEY,
+    "Authorization": f"Bearer {SUPABASE_ANON_KEY}",
+    "Content-Type": "application/json"
+}
+
 async def get_expenses(client: httpx.AsyncClient, filters: Dict = None) -> List[Dict]:
     """
     Get expenses from Supabase with optional filtering
@@ -43,14 +52,19 @@ async def get_expenses(client: httpx.AsyncClient, filters: Dict = None) -> List[
             
         response = await client.get(
             f"{SUPABASE_URL}/rest/v1/expenses",
-            params=query
+            params=query,
+            headers=_HEADERS
         )
         response.raise_for_status()
         expenses = response.json()
         
-        # Ensure vendor info is properly structured
+        # Ensure vendor info is properly structured (vendors is null when there is no vendor)
         for expense in expenses:
-            vendor_info = expense.pop("vendors", {})
+            # PostgREST returns timestamps as ISO strings; parse so due dates compare with datetimes
+            if isinstance(expense.get("due_date"), str):
+                expense["due_date"] = datetime.fromisoformat(expense["due_date"])
+            
+            vendor_info = expense.pop("vendors", None) or {}
             expense["vendor"] = {
                 "id": expense.get("vendor_id"),
                 "name": vendor_info.get("name", "Unknown Vendor"),
@@ -61,7 +75,7 @@ async def get_expenses(client: httpx.AsyncClient, filters: Dict = None) -> List[
         return expenses
         
     except Exception as e:
-        handle_error(f"Error fetching expenses: {str(e)}")
+        handle_error(f"Error fetching expenses: {str(e)}", "expenses_module")
         return []
 
 async def get_vendor_recommendations(client: httpx.AsyncClient) -> List[Dict]:
@@ -76,28 +90,59 @@ async def get_vendor_recommendations(client: httpx.AsyncClient) -> List[Dict]:
     """
     try:
         url = f"{SUPABASE_URL}/rest/v1/rpc/get_vendor_recommendations"
-        headers = {
-            "apikey": SUPABASE_ANON_KEY,
-            "Authorization": f"Bearer {SUPABASE_ANON_KEY}",
-            "Content-Type": "application/json"
-        }
         
-        response = await client.post(url, headers=headers)
+        response = await client.post(url, headers=_HEADERS)
         if response.status_code >= 400:
-            handle_error(f"API error: {response.text}")
+            handle_error(f"API error: {response.text}", "expenses_module")
             return []
             
         recommendations = response.json()
         return recommendations
     except Exception as e:
-        handle_error(f"Error getting vendor recommendations: {str(e)}")
+        handle_error(f"Error getting vendor recommendations: {str(e)}", "expenses_module")
         return []
 
+_URGENCY_CODES = {"high": 3, "medium": 2, "low": 1}
+
+def _priority_kernel(days: np.ndarray, amt: np.ndarray, urg: np.ndarray) -> np.ndarray:
+    """Vectorized priority score over aligned days/amount/urgency arrays"""
+    # Higher score = higher priority
+    return (
+        100.0 / np.maximum(days, 1) +  # Due date factor
+        amt * 0.005 +                  # Amount factor ((amount / 10000) * 50)
+        urg * 25.0                     # Urgency factor
+    )
+
+def calculate_priorities(expenses: List[Dict]) -> np.ndarray:
+    """
+    Calculate payment priority scores for a batch of expenses in one pass
+    
+    Args:
+        expenses: List of expense objects
+        
+    Returns:
+        Array of priority scores rounded to 2 decimals, aligned with expenses
+    """
+    now = datetime.now()
+    days = np.fromiter(
+        (((expense.get("due_date") or now) - now).days for expense in expenses),
+        dtype=np.float64, count=len(expenses)
+    )
+    amt = np.fromiter(
+        (expense.get("amount") or 0 for expense in expenses),
+        dtype=np.float64, count=len(expenses)
+    )
+    urg = np.fromiter(
+        (_URGENCY_CODES.get(expense.get("urgency", "low"), 1) for expense in expenses),
+        dtype=np.float64, count=len(expenses)
+    )
+    return np.round(_priority_kernel(days, amt, urg), 2)
+
 def calculate_priority(expense: Dict) -> float:
-    """Calculate payment priority score"""
+    """Calculate payment priority score (see calculate_priorities for whole lists)"""
     days_until_due = (expense.get("due_date", datetime.now()) - datetime.now()).days
     amount = expense.get("amount", 0)
-    urgency = {"high": 3, "medium": 2, "low": 1}.get(expense.get("urgency", "low"), 1)
+    urgency = _URGENCY_CODES.get(expense.get("urgency", "low"), 1)
     
     # Higher score = higher priority
     priority_score = (
@@ -108,50 +153,57 @@ def calculate_priority(expense: Dict) -> float:
     
     return round(priority_score, 2)
 
-async def get_payment_recommendations() -> List[Dict]:
+async def get_payment_recommendations(client: Optional[httpx.AsyncClient] = None) -> List[Dict]:
     """
     Get payment recommendations using the vendor payment recommendation engine
     
+    Args:
+        client: Optional AsyncClient; defaults to the shared Supabase client
+        
     Returns:
         List of payment recommendations
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            # Use the vendor recommendation function to get recommendations
-            recommendations = await get_vendor_recommendations(client)
-            
-            # Enhance recommendations with additional business context
-            enhanced_recommendations = []
-            for rec in recommendations:
-                # Add any business-specific context or formatting
-                enhanced_rec = {
-                    **rec,
-                    "formatted_amount": format_currency(rec["amount"]),
-                    "days_text": f"{abs(rec['days_until_due'])} days {'overdue' if rec['days_until_due'] < 0 else 'until due'}"
-                }
-                enhanced_recommendations.append(enhanced_rec)
-            
-            return enhanced_recommendations
-        except Exception as e:
-            handle_error(f"Error in payment recommendations: {str(e)}")
-            return []
+    try:
+        if client is None:
+            client = await get_client()
+        
+        # Use the vendor recommendation function to get recommendations
+        recommendations = await get_vendor_recommendations(client)
+        
+        # Enhance recommendations with additional business context
+        enhanced_recommendations = []
+        for rec in recommendations:
+            # Add any business-specific context or formatting
+            enhanced_rec = {
+                **rec,
+                "formatted_amount": format_currency(rec["amount"]),
+                "days_text": f"{abs(rec['days_until_due'])} days {'overdue' if rec['days_until_due'] < 0 else 'until due'}"
+            }
+            enhanced_recommendations.append(enhanced_rec)
+        
+        return enhanced_recommendations
+    except Exception as e:
+        handle_error(f"Error in payment recommendations: {str(e)}", "expenses_module")
+        return []
 
-def get_expense_summary() -> Dict:
+def get_expense_summary(expenses: List[Dict]) -> Dict:
     """
     Get a summary of expenses by category, status, and urgency
     
+    Args:
+        expenses: Expense objects already fetched by get_expenses
+        
     Returns:
         Dictionary with expense summary data
     """
     with Spinner("Expense Summary"):
         try:
-            expenses = get_expenses()
-            
             # Calculate summary metrics
             total_amount = sum(expense["amount"] for expense in expenses)
             pending_amount = sum(expense["amount"] for expense in expenses if expense["status"] == "pending")
             overdue_amount = sum(expense["amount"] for expense in expenses 
-                               if expense["status"] == "pending" and expense["due_date"] < datetime.now())
+                               if expense["status"] == "pending" and expense["due_date"] is not None
+                               and expense["due_date"] < datetime.now())
             
             # Group by category
             categories = {}
@@ -181,7 +233,7 @@ def get_expense_summary() -> Dict:
             handle_error(f"Failed to get expense summary: {str(e)}", "expenses_module")
             return {}
 
-def get_expense_by_vendor(vendor_id: int) -> List[Dict]:
+async def get_expense_by_vendor(vendor_id: int) -> List[Dict]:
     """
     Get expenses for a specific vendor
     
@@ -192,7 +244,8 @@ def get_expense_by_vendor(vendor_id: int) -> List[Dict]:
         List of expense objects
     """
     try:
-        return get_expenses({"vendor_id": vendor_id})
+        client = await get_client()
+        return await get_expenses(client, {"vendor_id": f"eq.{vendor_id}"})
     except Exception as e:
         handle_error(f"Failed to get expenses for vendor {vendor_id}: {str(e)}", "expenses_module")
         return []
@@ -291,19 +344,28 @@ def get_vendor_payment_history(vendor_id: int) -> Dict:
             return {}
 
 # Main function to render the expenses module
-def render_expenses(context=None):
+async def render_expenses(context=None):
     """Main function to render the expenses module in a web context"""
     try:
-        # Get payment recommendations
-        recommendations = get_payment_recommendations()
+        client = await get_client()
+        
+        # Fetch expenses and payment recommendations concurrently over the shared client
+        expenses, recommendations = await asyncio.gather(
+            get_expenses(client),
+            get_payment_recommendations(client)
+        )
+        
+        # Get expense summary from the expenses already fetched
+        summary = get_expense_summary(expenses)
         
-        # Get expense summary
-        summary = get_expense_summary()
+        # Score every expense's payment priority in one vectorized pass
+        for expense, score in zip(expenses, calculate_priorities(expenses).tolist()):
+            expense["priority_score"] = score
         
         return {
             "recommendations": recommendations,
             "summary": summary,
-            "expenses": get_expenses()
+            "expenses": expenses
         }
     except Exception as e:
         handle_error(f"Failed to render expenses module: {str(e)}", "expenses_module")
@@ -4,11 +4,18 @@ Utility functions for Restoration-Intel API Bridge
 This module provides common utility functions used throughout the application.
 """
 
+import os
 import time
 import logging
 import sys
+import asyncio
+import copy
+import functools
+import threading
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Callable, Dict, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -19,14 +26,25 @@ logging.basicConfig(
     ]
 )
 
-def handle_error(msg: str, module: str) -> None:
+def handle_error(msg: str, module: str, *args: Any) -> None:
     """
     Handle and log errors with module context
     
+    The message is only formatted when ERROR logging is enabled, in the same way
+    as ``logging.error("%s", value)``.
+    
+    Usage:
+        handle_error("Failed to calculate EBITDA Margin: %s", "scaling_metrics", e)
+    
     Args:
-        msg: Error message
+        msg: Error message, optionally with %-style placeholders
         module: Module name where the error occurred
+        *args: Values for the placeholders in msg
     """
+    if not logging.getLogger().isEnabledFor(logging.ERROR):
+        return
+    if args:
+        msg = msg % args
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     error_log = f"[{timestamp}] ERROR in {module}: {msg}"
     
@@ -48,6 +66,9 @@ class Spinner:
     Usage:
         with Spinner("module_name"):
             # perform heavy operation
+        
+        async with Spinner("module_name"):
+            # await heavy operation
     """
     
     def __init__(self, module: str):
@@ -78,6 +99,165 @@ class Spinner:
                 # - Track this metric for performance monitoring
                 # - Log to a performance tracking system
                 # - Alert on consistently slow operations
+    
+    async def __aenter__(self) -> 'Spinner':
+        """Start the timer when entering the context from async code"""
+        return self.__enter__()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Report elapsed time when leaving the context from async code"""
+        self.__exit__(exc_type, exc_val, exc_tb)
+
+# Set RESTINTEL_QUIET=1 to silence per-metric spinners even on a terminal
+QUIET = os.getenv("RESTINTEL_QUIET", "").lower() in ("1", "true", "yes")
+
+# True inside suppress_spinners(), including in tasks started there
+_SPINNERS_SUPPRESSED: ContextVar[bool] = ContextVar("spinners_suppressed", default=False)
+
+@contextmanager
+def suppress_spinners():
+    """
+    Silence maybe_spinner for everything run inside the block
+    
+    Use around an asyncio.gather of many metrics, whose individual spinners would
+    only race each other on stdout; the caller keeps its own single Spinner.
+    """
+    token = _SPINNERS_SUPPRESSED.set(True)
+    try:
+        yield
+    finally:
+        _SPINNERS_SUPPRESSED.reset(token)
+
+def maybe_spinner(module: str):
+    """
+    Spinner for interactive runs only
+    
+    Returns a Spinner when stdout is a terminal, RESTINTEL_QUIET is unset and no
+    suppress_spinners() block is active, and a no-op context otherwise, so server
+    processes and concurrently gathered coroutines skip the spinner thread and
+    console output. Works with both ``with`` and ``async with``.
+    
+    Usage:
+        with maybe_spinner("module_name"):
+            # perform heavy operation
+    
+    Args:
+        module: Name of the module using the spinner
+        
+    Returns:
+        Context manager to use in a with statement
+    """
+    if QUIET or _SPINNERS_SUPPRESSED.get() or not sys.stdout.isatty():
+        return nullcontext()
+    return Spinner(module)
+
+# Metric functions only call the live database when this is set; otherwise they
+# return their placeholder values
+USE_REAL_DB = os.getenv("RESTINTEL_USE_DB", "").lower() in ("1", "true", "yes")
+
+def _freeze(value: Any) -> Any:
+    """Turn dict/list/set arguments into hashable equivalents for use in a cache key"""
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+def ttl_cache(seconds: float, maxsize: int = 128, copy_results: bool = False) -> Callable:
+    """
+    Cache function results for a fixed time, keyed on the call arguments
+    
+    Works for both regular and async functions. Dict and list arguments (e.g. SQL
+    params) are frozen into the key. Exceptions are not cached. Call
+    ``.cache_clear()`` on the decorated function to invalidate explicitly, e.g.
+    after a write.
+    
+    For async functions, concurrent misses on the same key are coalesced: the
+    first caller starts the call and later callers await that same task instead
+    of issuing a duplicate query. Sync functions may be called from several
+    threads at once; the cache itself is locked, but concurrent misses each run
+    the function.
+    
+    Usage:
+        @ttl_cache(30)
+        async def _execute_sql(query, params=None):
+            ...
+    
+    Args:
+        seconds: How long a cached result stays valid
+        maxsize: Maximum number of entries; the oldest entry is evicted first
+        copy_results: Hand every caller a deep copy, so mutating a returned dict
+                      or list cannot change the cached entry
+        
+    Returns:
+        Decorator that adds the cache to a function
+    """
+    def decorator(func: Callable) -> Callable:
+        cache: Dict[Any, Tuple[float, Any]] = {}
+        inflight: Dict[Any, asyncio.Task] = {}
+        # Guards the cache dict for sync functions called from worker threads
+        lock = threading.Lock()
+        
+        def make_key(args: tuple, kwargs: dict) -> Any:
+            return (_freeze(args), _freeze(kwargs))
+        
+        def lookup(key: Any) -> Tuple[bool, Any]:
+            entry = cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return True, entry[1]
+            return False, None
+        
+        def store(key: Any, value: Any) -> None:
+            cache.pop(key, None)
+            if len(cache) >= maxsize:
+                cache.pop(next(iter(cache)))
+            cache[key] = (time.monotonic() + seconds, value)
+        
+        def result(value: Any) -> Any:
+            return copy.deepcopy(value) if copy_results else value
+        
+        def finish(key: Any, task: asyncio.Task) -> None:
+            inflight.pop(key, None)
+            if not task.cancelled() and task.exception() is None:
+                store(key, task.result())
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                hit, value = lookup(key)
+                if hit:
+                    return result(value)
+                task = inflight.get(key)
+                if task is None:
+                    task = asyncio.ensure_future(func(*args, **kwargs))
+                    inflight[key] = task
+                    task.add_done_callback(functools.partial(finish, key))
+                # Shielded so one caller being cancelled doesn't fail the others
+                return result(await asyncio.shield(task))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                with lock:
+                    hit, value = lookup(key)
+                if hit:
+                    return result(value)
+                value = func(*args, **kwargs)
+                with lock:
+                    store(key, value)
+                return result(value)
+        
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    
+    return decorator
 
 def safe_divide(numerator: float, denominator: float, default: float = 0.0) -> float:
     """
@@ -0,0 +1,15 @@
+"""
+Shared pytest setup for the API bridge tests
+
+Puts the repository root on sys.path so the package imports as ``api.py``
+(pytest itself owns the top-level ``py`` name), and points the Supabase
+settings at a dummy host so no test talks to a real project.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
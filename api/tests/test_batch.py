@@ -0,0 +1,82 @@
+"""Tests for SQL request batching"""
+
+import asyncio
+
+import pytest
+
+from api.py.db.batch import MetricBatch, SqlBatcher, current_batch
+
+def test_metric_batch_sends_gathered_queries_in_one_flush():
+    flushes = []
+    
+    async def flush(queries):
+        flushes.append(queries)
+        return [f"rows for {query} {params}" for query, params in queries]
+    
+    async def metric(query, params=None):
+        return await current_batch().submit(query, params)
+    
+    async def run():
+        assert current_batch() is None
+        async with MetricBatch(flush):
+            results = await asyncio.gather(metric("q1", {"1": 1}), metric("q2"), metric("q3"))
+        assert current_batch() is None
+        return results
+    
+    results = asyncio.run(run())
+    assert results == ["rows for q1 {'1': 1}", "rows for q2 {}", "rows for q3 {}"]
+    assert flushes == [[("q1", {"1": 1}), ("q2", {}), ("q3", {})]]
+
+def test_metric_batch_propagates_flush_errors_to_every_caller():
+    async def flush(queries):
+        raise RuntimeError("batch RPC failed")
+    
+    async def run():
+        async with MetricBatch(flush) as batch:
+            return await asyncio.gather(
+                batch.batcher.submit("q1"), batch.batcher.submit("q2"), return_exceptions=True
+            )
+    
+    results = asyncio.run(run())
+    assert [str(r) for r in results] == ["batch RPC failed", "batch RPC failed"]
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_metric_batch_flushes_at_max_batch_size():
+    flushes = []
+    
+    async def flush(queries):
+        flushes.append(len(queries))
+        return [query for query, _ in queries]
+    
+    async def run():
+        async with MetricBatch(flush, max_batch_size=2) as batch:
+            return await asyncio.gather(*(batch.batcher.submit(f"q{i}") for i in range(5)))
+    
+    assert asyncio.run(run()) == [f"q{i}" for i in range(5)]
+    assert flushes == [2, 2, 1]
+
+def test_sql_batcher_coalesces_within_window():
+    flushes = []
+    
+    async def flush(queries):
+        flushes.append(len(queries))
+        return [query.upper() for query, _ in queries]
+    
+    async def run():
+        batcher = SqlBatcher(flush, window=0.01)
+        first = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+        second = await batcher.submit("c")
+        return first, second
+    
+    assert asyncio.run(run()) == (["A", "B"], "C")
+    assert flushes == [2, 1]
+
+def test_sql_batcher_error_reaches_caller():
+    async def flush(queries):
+        raise ValueError("bad query")
+    
+    async def run():
+        return await SqlBatcher(flush, window=0).submit("a")
+    
+    with pytest.raises(ValueError, match="bad query"):
+        asyncio.run(run())
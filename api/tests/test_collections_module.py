@@ -0,0 +1,145 @@
+"""Parity tests for the vectorised collections summaries against the record loops they replaced"""
+
+import sys
+import types
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The timeline AP engine is not part of this tree yet; collections only needs the name
+_timeline_ap = types.ModuleType("api.py.engines.timeline_ap")
+_timeline_ap.get_ap_recommendations = lambda: []
+sys.modules.setdefault("api.py.engines.timeline_ap", _timeline_ap)
+
+from api.py.modules import collections_module  # noqa: E402
+
+# (status, amount, expected offset days, actual offset days) relative to now,
+# spread across every aging bucket and the DSO window edge
+_ROWS = [
+    ("received", 6250.00, -20.2, -20.1),
+    ("pending", 6250.00, 10.3, None),
+    ("received", 9583.33, -30.4, -32.6),
+    ("received", 9583.33, -10.7, -9.2),
+    ("pending", 9583.34, 20.1, None),
+    ("pending", 1200.00, -0.4, None),
+    ("pending", 800.00, -15.5, None),
+    ("pending", 2500.00, -45.5, None),
+    ("pending", 3100.00, -75.5, None),
+    ("pending", 4700.00, -120.5, None),
+    ("received", 5000.00, -130.0, -120.0),
+]
+
+def _frame(now: datetime) -> pd.DataFrame:
+    """A collections snapshot shaped like _collections_frame, from _ROWS"""
+    n = len(_ROWS)
+    anchor = pd.Timestamp(now)
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1, dtype=np.int32),
+        "project_id": np.ones(n, dtype=np.int32),
+        "description": ["Payment"] * n,
+        "amount": np.array([row[1] for row in _ROWS], dtype=np.float64),
+        "expected_date": anchor + pd.to_timedelta([row[2] for row in _ROWS], unit="D"),
+        "status": pd.Categorical([row[0] for row in _ROWS], categories=["pending", "received"]),
+        "actual_date": anchor + pd.to_timedelta([np.nan if row[3] is None else row[3] for row in _ROWS], unit="D"),
+        "confidence_percentage": np.full(n, 90, dtype=np.int8),
+        "project_name": ["Smith Water Damage"] * n,
+        "customer_name": ["John Smith"] * n,
+    })[list(collections_module._COLLECTION_COLUMNS)]
+
+@pytest.fixture
+def snapshot():
+    return _frame(datetime.now())
+
+def _loop_status_summary(collections):
+    summary = {name: {"count": 0, "amount": 0} for name in ("received", "pending", "overdue", "total")}
+    now = datetime.now()
+    for collection in collections:
+        status = collection["status"]
+        if status == "pending" and collection["expected_date"] < now:
+            status = "overdue"
+        if status in summary:
+            summary[status]["count"] += 1
+            summary[status]["amount"] += collection["amount"]
+        summary["total"]["count"] += 1
+        summary["total"]["amount"] += collection["amount"]
+    return summary
+
+def _loop_aging(collections):
+    aging = {name: {"count": 0, "amount": 0} for name in ("current", "1_30", "31_60", "61_90", "90_plus", "total")}
+    now = datetime.now()
+    for collection in collections:
+        if collection["status"] != "pending":
+            continue
+        expected_date = collection["expected_date"]
+        days_diff = (now - expected_date).days if expected_date < now else -1
+        bucket = "current"
+        if 0 <= days_diff <= 30:
+            bucket = "1_30"
+        elif 30 < days_diff <= 60:
+            bucket = "31_60"
+        elif 60 < days_diff <= 90:
+            bucket = "61_90"
+        elif days_diff > 90:
+            bucket = "90_plus"
+        aging[bucket]["count"] += 1
+        aging[bucket]["amount"] += collection["amount"]
+        aging["total"]["count"] += 1
+        aging["total"]["amount"] += collection["amount"]
+    return aging
+
+def _loop_dso(collections):
+    start_date = datetime.now() - timedelta(days=90)
+    paid = [c for c in collections if c["status"] == "received" and c["actual_date"] >= start_date]
+    if not paid:
+        return 0
+    dates = [c["actual_date"] for c in paid]
+    real_period_days = (max(dates) - min(dates)).days
+    if real_period_days <= 0:
+        real_period_days = 1
+    daily_revenue = sum(c["amount"] for c in paid) / real_period_days
+    if daily_revenue <= 0:
+        return 0
+    return sum(c["amount"] for c in collections if c["status"] == "pending") / daily_revenue
+
+def _assert_buckets_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, bucket in expected.items():
+        assert actual[name]["count"] == bucket["count"], name
+        assert actual[name]["amount"] == pytest.approx(bucket["amount"]), name
+
+def test_status_summary_matches_loop(snapshot):
+    expected = _loop_status_summary(collections_module._to_records(snapshot))
+    _assert_buckets_equal(collections_module.get_collection_status_summary(snapshot), expected)
+
+def test_aging_matches_loop(snapshot):
+    expected = _loop_aging(collections_module._to_records(snapshot))
+    actual = collections_module.get_aging_analysis(snapshot)
+    _assert_buckets_equal(actual, expected)
+    # Every bucket is exercised by the fixture rows
+    assert all(actual[name]["count"] for name in collections_module._AGING_BUCKETS)
+
+def test_dso_matches_loop(snapshot):
+    expected = _loop_dso(collections_module._to_records(snapshot))
+    assert expected > 0
+    assert collections_module.calculate_days_sales_outstanding(snapshot) == pytest.approx(expected)
+
+def test_dso_without_paid_collections_is_zero(snapshot):
+    pending_only = snapshot[(snapshot["status"] == "pending").to_numpy()]
+    assert collections_module.calculate_days_sales_outstanding(pending_only) == 0
+
+def test_to_records_converts_dates(snapshot):
+    records = collections_module._to_records(snapshot)
+    assert isinstance(records[0]["expected_date"], datetime)
+    assert records[1]["actual_date"] is None
+    assert records[1]["status"] == "pending"
+
+def test_get_all_collections_filters(snapshot):
+    pending = collections_module.get_all_collections({"status": "pending"}, snapshot)
+    assert [c["id"] for c in pending] == [i + 1 for i, row in enumerate(_ROWS) if row[0] == "pending"]
+    
+    now = datetime.now()
+    upcoming = collections_module.get_all_collections({"start_date": now}, snapshot)
+    assert all(c["expected_date"] >= now for c in upcoming)
+    assert len(upcoming) == 2
@@ -0,0 +1,27 @@
+"""Tests for the shared Supabase HTTP client"""
+
+import asyncio
+
+from api.py.db import client as db_client
+
+async def _get_twice():
+    first = await db_client.get_client()
+    second = await db_client.get_client()
+    return first, second
+
+def test_client_is_shared_within_a_loop():
+    first, second = asyncio.run(_get_twice())
+    assert first is second
+
+def test_new_event_loop_gets_a_new_client():
+    first, _ = asyncio.run(_get_twice())
+    second, _ = asyncio.run(_get_twice())
+    assert first is not second
+    
+    async def closed_client_is_replaced():
+        client = await db_client.get_client()
+        await db_client.close_client()
+        return client, await db_client.get_client()
+    
+    closed, replacement = asyncio.run(closed_client_is_replaced())
+    assert closed.is_closed and not replacement.is_closed
@@ -0,0 +1,100 @@
+"""Tests for the expenses module against a faked PostgREST transport"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+
+from api.py.modules import expenses_module
+
+EXPENSE_ROWS = [
+    {
+        "id": 1, "vendor_id": 7, "amount": 1500.0, "due_date": "2020-01-01T00:00:00",
+        "status": "pending", "category": "materials", "urgency": "high",
+        "vendors": {"name": "Quality Materials Inc", "payment_terms": 15, "preferred_payment_method": "ach"}
+    },
+    {
+        "id": 2, "vendor_id": None, "amount": 300.0, "due_date": None,
+        "status": "pending", "category": "labor", "urgency": "low",
+        "vendors": None
+    }
+]
+
+RECOMMENDATIONS = [{"vendor_id": 7, "amount": 1500.0, "days_until_due": -3}]
+
+def _postgrest(request: httpx.Request) -> httpx.Response:
+    """Answer like PostgREST: 401 without the anon key, otherwise canned rows"""
+    if request.headers.get("apikey") != "test-anon-key" or \
+            request.headers.get("authorization") != "Bearer test-anon-key":
+        return httpx.Response(401, json={"message": "No API key found in request"})
+    if request.url.path == "/rest/v1/expenses":
+        return httpx.Response(200, content=json.dumps(EXPENSE_ROWS))
+    if request.url.path == "/rest/v1/rpc/get_vendor_recommendations":
+        return httpx.Response(200, json=RECOMMENDATIONS)
+    return httpx.Response(404)
+
+def _use_fake_client(monkeypatch):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_postgrest))
+    
+    async def get_client():
+        return client
+    
+    monkeypatch.setattr(expenses_module, "get_client", get_client)
+    return client
+
+def test_get_expenses_sends_auth_and_shapes_vendor(monkeypatch):
+    client = _use_fake_client(monkeypatch)
+    expenses = asyncio.run(expenses_module.get_expenses(client))
+    
+    assert [e["id"] for e in expenses] == [1, 2]
+    assert expenses[0]["due_date"] == datetime(2020, 1, 1)
+    assert expenses[0]["vendor"] == {
+        "id": 7, "name": "Quality Materials Inc", "payment_terms": 15, "preferred_payment_method": "ach"
+    }
+    assert expenses[1]["vendor"]["name"] == "Unknown Vendor"
+    assert "vendors" not in expenses[1]
+
+def test_render_expenses(monkeypatch):
+    _use_fake_client(monkeypatch)
+    result = asyncio.run(expenses_module.render_expenses())
+    
+    assert "error" not in result
+    assert len(result["expenses"]) == 2
+    assert result["recommendations"][0]["days_text"] == "3 days overdue"
+    assert result["summary"]["total_amount"] == 1800.0
+    assert result["summary"]["overdue_amount"] == 1500.0
+    first, second = result["expenses"]
+    assert first["priority_score"] == expenses_module.calculate_priority(first)
+    # No due date scores as due today: 100 + 300 * 0.005 + 1 * 25
+    assert second["priority_score"] == 126.5
+
+def test_get_expense_by_vendor_filters_on_vendor(monkeypatch):
+    seen = []
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: seen.append(request) or _postgrest(request)
+    ))
+    
+    async def get_client():
+        return client
+    
+    monkeypatch.setattr(expenses_module, "get_client", get_client)
+    expenses = asyncio.run(expenses_module.get_expense_by_vendor(7))
+    
+    assert len(expenses) == 2
+    assert seen[0].url.params["vendor_id"] == "eq.7"
+
+def test_get_expenses_logs_and_returns_empty_on_http_error():
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+    assert asyncio.run(expenses_module.get_expenses(client)) == []
+
+def test_calculate_priorities_matches_scalar_formula():
+    expenses = [
+        {"due_date": datetime(2020, 1, 1), "amount": 2500.0, "urgency": "high"},
+        {"due_date": datetime(2999, 1, 1), "amount": 100.0, "urgency": "medium"},
+        {"amount": 40000.0},
+        {"due_date": None, "amount": None, "urgency": "unknown"},
+    ]
+    scores = expenses_module.calculate_priorities(expenses).tolist()
+    assert scores[:3] == [expenses_module.calculate_priority(e) for e in expenses[:3]]
+    assert scores[3] == 125.0
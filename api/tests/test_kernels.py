@@ -0,0 +1,70 @@
+"""Tests for the vectorised metric kernels against their scalar formulas"""
+
+import math
+
+import numpy as np
+import pytest
+
+from api.py.metrics import _kernels
+
+def test_clv_batch():
+    cases = [(4500.0, 42.5, 0.15), (1200.0, 30.0, 0.25), (800.0, 50.0, 0.0), (800.0, 50.0, -0.1)]
+    expected = [(rev * margin / 100) / churn if churn > 0 else 0.0 for rev, margin, churn in cases]
+    
+    result = _kernels.clv_batch(*zip(*cases))
+    assert result == pytest.approx(expected)
+
+def test_clv_batch_broadcasts_scalars():
+    result = _kernels.clv_batch(4500.0, 42.5, [0.1, 0.2])
+    assert result == pytest.approx([4500 * 0.425 / 0.1, 4500 * 0.425 / 0.2])
+
+def test_nrr_batch():
+    cases = [(100000.0, 15000.0, 5000.0, 8000.0), (50000.0, 0.0, 0.0, 50000.0), (0.0, 100.0, 0.0, 0.0)]
+    expected = [
+        ((start + exp - con - churn) / start) * 100 if start > 0 else 0.0
+        for start, exp, con, churn in cases
+    ]
+    
+    result = _kernels.nrr_batch(*zip(*cases))
+    assert result == pytest.approx(expected)
+
+def test_utilization_batch():
+    cases = [(32.0, 40.0), (0.0, 40.0), (10.0, 0.0)]
+    expected = [(billable / available) * 100 if available > 0 else 0.0 for billable, available in cases]
+    
+    assert _kernels.utilization_batch(*zip(*cases)) == pytest.approx(expected)
+
+def test_runway_batch():
+    cases = [(45000.0, 12500.0), (45000.0, 0.0), (1000.0, -5.0)]
+    expected = [cash / burn if burn > 0 else math.inf for cash, burn in cases]
+    
+    assert _kernels.runway_batch(*zip(*cases)).tolist() == pytest.approx(expected)
+
+def test_labor_efficiency_batch():
+    cases = [(250000.0, 80000.0, 2000.0), (1000.0, 0.0, 10.0), (1000.0, 500.0, 0.0)]
+    ratios, revenue_per_hour, cost_per_hour = _kernels.labor_efficiency_batch(*zip(*cases))
+    
+    for i, (revenue, cost, hours) in enumerate(cases):
+        rph = revenue / hours if hours > 0 else 0.0
+        cph = cost / hours if hours > 0 else 0.0
+        assert revenue_per_hour[i] == pytest.approx(rph)
+        assert cost_per_hour[i] == pytest.approx(cph)
+        assert ratios[i] == pytest.approx(rph / cph if cph > 0 else 0.0)
+
+def test_span_stats():
+    reports = [3, 5, 8, 4, 12]
+    stats = _kernels.span_stats(reports)
+    
+    mean = sum(reports) / len(reports)
+    assert stats["count"] == 5
+    assert stats["total"] == 32
+    assert stats["mean"] == pytest.approx(mean)
+    assert stats["median"] == 5.0
+    assert stats["p90"] == pytest.approx(float(np.percentile(reports, 90)))
+    assert stats["std"] == pytest.approx(math.sqrt(sum((r - mean) ** 2 for r in reports) / len(reports)))
+    assert stats["max"] == 12
+
+def test_span_stats_empty():
+    assert _kernels.span_stats([]) == {
+        "count": 0, "total": 0, "mean": 0.0, "median": 0.0, "p90": 0.0, "std": 0.0, "max": 0
+    }
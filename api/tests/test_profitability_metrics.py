@@ -0,0 +1,16 @@
+"""Tests for the profitability dashboard refresh"""
+
+import asyncio
+
+import pytest
+
+from api.py.metrics import profitability_metrics
+
+def test_refresh_reports_the_failing_metric_error(monkeypatch):
+    async def failing_turnover():
+        raise ValueError("inventory query failed")
+    
+    monkeypatch.setattr(profitability_metrics, "calculate_inventory_turnover", failing_turnover)
+    
+    with pytest.raises(RuntimeError, match="inventory query failed"):
+        asyncio.run(profitability_metrics.refresh_profitability_dashboard())
@@ -0,0 +1,142 @@
+"""Tests for the ttl_cache decorator"""
+
+import asyncio
+
+import pytest
+
+from api.py import utils
+from api.py.utils import ttl_cache
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+def test_sync_hit_and_expiry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(utils.time, "monotonic", clock)
+    calls = []
+    
+    @ttl_cache(10)
+    def load(key):
+        calls.append(key)
+        return len(calls)
+    
+    assert load("a") == 1
+    assert load("a") == 1
+    assert load("b") == 2
+    assert calls == ["a", "b"]
+    
+    clock.now += 11
+    assert load("a") == 3
+    
+    load.cache_clear()
+    assert load("a") == 4
+
+def test_dict_arguments_are_part_of_the_key():
+    calls = []
+    
+    @ttl_cache(60)
+    def load(query, params=None):
+        calls.append(params)
+        return params
+    
+    load("q", params={"1": 5})
+    load("q", params={"1": 5})
+    load("q", params={"1": 6})
+    assert calls == [{"1": 5}, {"1": 6}]
+
+def test_sync_maxsize_evicts_oldest():
+    calls = []
+    
+    @ttl_cache(60, maxsize=2)
+    def load(key):
+        calls.append(key)
+        return key
+    
+    for key in ("a", "b", "c", "a"):
+        load(key)
+    assert calls == ["a", "b", "c", "a"]
+
+def test_sync_exceptions_are_not_cached():
+    attempts = []
+    
+    @ttl_cache(60)
+    def load():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("transient")
+        return "ok"
+    
+    with pytest.raises(RuntimeError):
+        load()
+    assert load() == "ok"
+    assert load() == "ok"
+    assert len(attempts) == 2
+
+def test_async_exceptions_are_not_cached():
+    attempts = []
+    
+    @ttl_cache(60)
+    async def load():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("transient")
+        return "ok"
+    
+    async def run():
+        with pytest.raises(RuntimeError):
+            await load()
+        return await load(), await load()
+    
+    assert asyncio.run(run()) == ("ok", "ok")
+    assert len(attempts) == 2
+
+def test_async_concurrent_misses_are_coalesced():
+    calls = []
+    
+    @ttl_cache(60)
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+    
+    async def run():
+        return await asyncio.gather(*(load("a") for _ in range(5)), load("b"))
+    
+    results = asyncio.run(run())
+    assert calls == ["a", "b"]
+    assert [r["key"] for r in results] == ["a"] * 5 + ["b"]
+
+def test_copy_results_isolates_callers():
+    @ttl_cache(60, copy_results=True)
+    def load():
+        return {"revenue": 100, "rows": [1, 2]}
+    
+    first = load()
+    first["revenue"] = 0
+    first["rows"].append(3)
+    assert load() == {"revenue": 100, "rows": [1, 2]}
+
+def test_without_copy_results_callers_share_the_entry():
+    @ttl_cache(60)
+    def load():
+        return {"revenue": 100}
+    
+    assert load() is load()
+
+def test_sync_cache_is_safe_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    
+    @ttl_cache(60, maxsize=8)
+    def load(key):
+        return key * 2
+    
+    # Many threads inserting and evicting at once must not corrupt the cache
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(load, [i % 32 for i in range(5000)]))
+    assert results == [(i % 32) * 2 for i in range(5000)]
@@ -0,0 +1,36 @@
+-- Operational rollup: job counts, completed revenue and days-to-complete in a single
+-- pass over projects, overall and per job type. Backs calculate_rpj,
+-- calculate_job_completion_rate and calculate_adc in metrics/operational_metrics.py.
+-- The window is bound as an interval, so the caller's period mapping is the single
+-- source of truth and the function body holds no literal intervals
+CREATE OR REPLACE FUNCTION operational_rollup(window_interval INTERVAL)
+RETURNS JSON AS $$
+DECLARE
+    result JSON;
+BEGIN
+    SELECT json_agg(
+        json_build_object(
+            'job_type', r.job_type,
+            'is_total', r.is_total,
+            'total_jobs', r.total_jobs,
+            'completed_jobs', r.completed_jobs,
+            'completed_revenue', r.completed_revenue,
+            'avg_days_to_complete', r.avg_days_to_complete
+        )
+    ) INTO result
+    FROM (
+        SELECT
+            job_type,
+            GROUPING(job_type) = 1 as is_total,
+            COUNT(*) as total_jobs,
+            COUNT(*) FILTER (WHERE status = 'completed') as completed_jobs,
+            COALESCE(SUM(total_revenue) FILTER (WHERE status = 'completed'), 0) as completed_revenue,
+            AVG(EXTRACT(DAY FROM (updated_at - start_date))) FILTER (WHERE status = 'completed') as avg_days_to_complete
+        FROM projects
+        WHERE created_at >= NOW() - window_interval
+        GROUP BY GROUPING SETS ((), (job_type))
+    ) r;
+
+    RETURN COALESCE(result, '[]'::json);
+END;
+$$ LANGUAGE plpgsql;
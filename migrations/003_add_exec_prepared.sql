@@ -0,0 +1,36 @@
+-- Execute a parameterised query as a named prepared statement so Postgres can reuse
+-- its plan across calls. The statement is prepared once per database session; the
+-- caller names it (a hash of the query text) and always sends the query body, since
+-- pooled sessions may not have seen it yet. params is a JSON object keyed "1", "2", ...
+-- for $1, $2, ...
+CREATE OR REPLACE FUNCTION exec_prepared(statement_name TEXT, query TEXT, params JSONB DEFAULT '{}'::jsonb)
+RETURNS JSON AS $$
+DECLARE
+    result JSON;
+    args TEXT;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_prepared_statements WHERE name = statement_name) THEN
+        EXECUTE format('PREPARE %I AS %s', statement_name, query);
+    END IF;
+
+    SELECT string_agg(quote_nullable(value), ', ' ORDER BY key::INT)
+    INTO args
+    FROM jsonb_each_text(params);
+
+    EXECUTE format(
+        'CREATE TEMP TABLE exec_prepared_result AS EXECUTE %I%s',
+        statement_name,
+        CASE WHEN args IS NULL THEN '' ELSE '(' || args || ')' END
+    );
+
+    SELECT json_agg(r) INTO result FROM exec_prepared_result r;
+    DROP TABLE exec_prepared_result;
+
+    RETURN COALESCE(result, '[]'::json);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Runs arbitrary SQL, so only the server-side service role may call it through
+-- PostgREST (functions are executable by PUBLIC by default)
+REVOKE EXECUTE ON FUNCTION exec_prepared(TEXT, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION exec_prepared(TEXT, TEXT, JSONB) TO service_role;
@@ -0,0 +1,29 @@
+-- Column-major variant of exec_prepared: returns {"column": [values, ...], ...}
+-- instead of an array of row objects, so large results do not repeat every column
+-- name per row and load straight into arrays on the Python side
+CREATE OR REPLACE FUNCTION exec_prepared_columnar(statement_name TEXT, query TEXT, params JSONB DEFAULT '{}'::jsonb)
+RETURNS JSON AS $$
+DECLARE
+    result JSON;
+BEGIN
+    WITH result_rows AS (
+        SELECT r.value as row_data, r.ordinality as ord
+        FROM json_array_elements(exec_prepared(statement_name, query, params)) WITH ORDINALITY r
+    )
+    SELECT json_object_agg(c.key, c.vals) INTO result
+    FROM (
+        SELECT
+            f.key,
+            json_agg(f.value ORDER BY rr.ord) as vals
+        FROM result_rows rr, json_each(rr.row_data) f
+        GROUP BY f.key
+    ) c;
+
+    RETURN COALESCE(result, '{}'::json);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Runs arbitrary SQL, so only the server-side service role may call it through
+-- PostgREST (functions are executable by PUBLIC by default)
+REVOKE EXECUTE ON FUNCTION exec_prepared_columnar(TEXT, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION exec_prepared_columnar(TEXT, TEXT, JSONB) TO service_role;
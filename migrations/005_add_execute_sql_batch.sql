@@ -0,0 +1,27 @@
+-- Run several parameterised queries in one RPC call. queries is a JSON array of
+-- {"query": ..., "params": {"1": ..., "2": ...}} objects; the result is a JSON array
+-- holding one result set (array of rows) per query, in the same order. Each query
+-- goes through exec_prepared so its plan is reused within the session
+CREATE OR REPLACE FUNCTION execute_sql_batch(queries JSONB)
+RETURNS JSON AS $$
+DECLARE
+    result JSON;
+BEGIN
+    SELECT json_agg(
+        exec_prepared(
+            'batch_' || substr(md5(q.value->>'query'), 1, 16),
+            q.value->>'query',
+            COALESCE(q.value->'params', '{}'::jsonb)
+        )
+        ORDER BY q.ordinality
+    ) INTO result
+    FROM jsonb_array_elements(queries) WITH ORDINALITY q;
+
+    RETURN COALESCE(result, '[]'::json);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Runs arbitrary SQL, so only the server-side service role may call it through
+-- PostgREST (functions are executable by PUBLIC by default)
+REVOKE EXECUTE ON FUNCTION execute_sql_batch(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION execute_sql_batch(JSONB) TO service_role;
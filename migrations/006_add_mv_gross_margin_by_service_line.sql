@@ -0,0 +1,26 @@
+-- Gross margin by service line over the last 365 days, precomputed so the dashboard
+-- reads one row per job type instead of scanning every completed project
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_gross_margin_by_service_line AS
+SELECT 
+    job_type as service_line,
+    SUM(total_revenue) as revenue,
+    SUM(total_expenses) as direct_costs,
+    SUM(total_revenue - total_expenses - allocated_lead_cost) as gross_profit,
+    (SUM(total_revenue - total_expenses - allocated_lead_cost) / NULLIF(SUM(total_revenue), 0)) * 100 as gross_margin_pct
+FROM projects
+WHERE status = 'completed'
+AND updated_at >= NOW() - INTERVAL '365 days'
+GROUP BY job_type;
+
+-- A unique index is required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_gross_margin_by_service_line
+    ON mv_gross_margin_by_service_line(service_line);
+
+-- Refresh nightly without blocking readers (requires the pg_cron extension)
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
+SELECT cron.schedule(
+    'refresh_mv_gross_margin_by_service_line',
+    '15 2 * * *',
+    'REFRESH MATERIALIZED VIEW CONCURRENTLY mv_gross_margin_by_service_line'
+);
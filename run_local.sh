@@ -36,10 +36,10 @@ fi
 
 # Start FastAPI server in background
 echo "Starting FastAPI server..."
-cd api/py
-uvicorn app:app --reload --port 8000 &
+cd api
+uvicorn py.app:app --reload --port 8000 &
 FASTAPI_PID=$!
-cd ../..
+cd ..
 
 # Start Next.js development server
 echo "Starting Next.js development server..."